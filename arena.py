@@ -0,0 +1,135 @@
+# --- ARENA MODÜLÜ ---
+# Büyük harita (varsayılan 300x300) ve çok oyunculu (varsayılan 128) klasik mod
+# odası. Kurallar room.Room ile aynıdır; harita boyutuna bağlı işler ölçeklenir:
+# - yem, engel, power-up ve portal sayıları klasik haritaya göre alanla orantılıdır
+# - yılanlar en az yılan başı olan SPAWN_CHUNK'lık karelerden birinde boş hücrelere
+#   doğar, engeller kareler arasında sırayla dağıtılır: spawn tüm alanı taramaz
+# - ilgi alanı (AOI) varsayılan açıktır: oyuncu başına yayın işi pencere içindeki
+#   varlıklarla sınırlıdır (room.Room.area_of_interest, board_grid.ChunkIndex)
+# Tick başına maliyet bütçesi ARENA_TICK_BUDGET_MS'dir ve benchmark.py'nin
+# arena_tick senaryosu ile doğrulanır:
+#
+#   python benchmark.py --only arena --budget
+import os
+
+from common import (
+    ARENA_WIDTH, ARENA_HEIGHT, ARENA_MAX_PLAYERS, BOARD_WIDTH, BOARD_HEIGHT, INITIAL_FOOD_COUNT, POWERUP_TYPES,
+)
+from room import Room, MAX_POWERUPS, send_interval
+
+# İstemci arenada 60x35 hücrelik bir görüş penceresi çizer; yarıçap bunu kapsamalı
+ARENA_AOI_RADIUS = int(os.environ.get("ARENA_AOI_RADIUS", 30))  # hücre
+# Yılanlar normal hızda iki tick'te bir adım atar: oyunculara 10 Hz yeterli, istemci ara kareleri
+# tahmin ve interpolasyonla doldurur. Oyuncular slot'a göre tek/çift tick'lere dağılır.
+ARENA_PLAYER_SEND_RATE = float(os.environ.get("ARENA_PLAYER_SEND_RATE", 10))
+SPAWN_CHUNK = 30  # hücre
+SPAWN_TRIES = 20  # kare içinde boş konum deneme sayısı
+# Klasik haritadaki engel sayıları (Room.place_obstacles); arenada alan oranıyla çarpılır
+OBSTACLE_COUNTS = (("slow", 15), ("enemy", 7), ("hidden_wall", 7))
+PORTAL_MIN_DISTANCE = 8
+# ARENA_MAX_PLAYERS oyuncunun hepsi izlerken bir Room.tick'in (simülasyon + yayın
+# kodlaması) medyan süresi; 20 Hz tick'in (50 ms) geri kalanı ağ ve Time Attack içindir.
+# p99 bu bütçeye değil tek tick süresine (TICK_RATE) göre denetlenir: uç değerler
+# çoğunlukla zamanlayıcı gürültüsüdür, ama bir tick'i taşmamalıdır.
+ARENA_TICK_BUDGET_MS = float(os.environ.get("ARENA_TICK_BUDGET_MS", 20))
+
+
+class ArenaRoom(Room):
+    """Büyük harita, çok oyuncu: alanla ölçeklenen sayılar, kare bazlı spawn, varsayılan ilgi alanı"""
+    max_players = ARENA_MAX_PLAYERS
+    player_send_interval = send_interval(ARENA_PLAYER_SEND_RATE)
+
+    def __init__(self, room_id, width=ARENA_WIDTH, height=ARENA_HEIGHT, seed=None):
+        super().__init__(room_id, width, height, seed)
+        # Klasik haritaya göre alan oranı
+        self.scale = max(1, (width * height) // (BOARD_WIDTH * BOARD_HEIGHT))
+        self.food_count = INITIAL_FOOD_COUNT * self.scale
+        self.max_powerups = MAX_POWERUPS * self.scale
+        self.max_same_powerups = max(2, self.max_powerups // len(POWERUP_TYPES))
+        self.powerup_spawn_attempts = self.scale
+        self.aoi_radius = ARENA_AOI_RADIUS
+        # Doğma kareleri: baş (x, y), gövde (x, y+1), (x, y+2) alan içinde kalır
+        self.spawn_x = (2, max(2, width - 3))
+        self.spawn_y = (0, max(0, height - 3))
+        self.chunk_cols = (self.spawn_x[1] - self.spawn_x[0]) // SPAWN_CHUNK + 1
+        self.chunk_rows = (self.spawn_y[1] - self.spawn_y[0]) // SPAWN_CHUNK + 1
+        # Kare başına yılan başı sayısı, tick başına bir kez sayılır (head_counts_tick)
+        self.head_counts = []
+        self.head_counts_tick = None
+
+    def chunk_bounds(self, index):
+        """Karenin (x0, y0, x1, y1) sınırları"""
+        col, row = index % self.chunk_cols, index // self.chunk_cols
+        x0 = self.spawn_x[0] + col * SPAWN_CHUNK
+        y0 = self.spawn_y[0] + row * SPAWN_CHUNK
+        return x0, y0, min(x0 + SPAWN_CHUNK - 1, self.spawn_x[1]), min(y0 + SPAWN_CHUNK - 1, self.spawn_y[1])
+
+    def chunk_of(self, cell):
+        col = min(max(0, (cell[0] - self.spawn_x[0]) // SPAWN_CHUNK), self.chunk_cols - 1)
+        row = min(max(0, (cell[1] - self.spawn_y[0]) // SPAWN_CHUNK), self.chunk_rows - 1)
+        return row * self.chunk_cols + col
+
+    def spawn_heads(self):
+        """Kare başına yılan başı sayısı; aynı tick'te toplu yeniden doğuşlar tek sayımı paylaşır"""
+        if self.head_counts_tick != self.tick_count:
+            heads = [0] * (self.chunk_cols * self.chunk_rows)
+            for snake in self.game_state["snakes"].values():
+                if len(snake):
+                    heads[self.chunk_of(snake[0])] += 1
+            self.head_counts = heads
+            self.head_counts_tick = self.tick_count
+        return self.head_counts
+
+    def spawn_position(self):
+        """En az yılan başı olan karelerden birinde, gövdesi boş hücrelere düşen konum"""
+        heads = self.spawn_heads()
+        fewest = min(heads)
+        chunk = self.rng.choice([i for i, count in enumerate(heads) if count == fewest])
+        heads[chunk] += 1  # Aynı tick'teki sonraki doğuşlar bu başı görür
+        x0, y0, x1, y1 = self.chunk_bounds(chunk)
+        board = self.board
+        for _ in range(SPAWN_TRIES):
+            x = self.rng.randint(x0, x1)
+            y = self.rng.randint(y0, y1)
+            if board.is_free((x, y)) and board.is_free((x, y + 1)) and board.is_free((x, y + 2)):
+                break
+        # Kare çok doluysa son deneme kullanılır; çarpışma kuralları ilk hamlede geçerli olur
+        return x, y
+
+    def place_obstacles(self):
+        """Engeller karıştırılmış kareler arasında sırayla dağıtılır, her biri tek örneklemeyle"""
+        order = list(range(self.chunk_cols * self.chunk_rows))
+        self.rng.shuffle(order)
+        obstacles = []
+        taken = set()
+        i = 0
+        for obstacle_type, count in OBSTACLE_COUNTS:
+            for _ in range(count * self.scale):
+                x0, y0, x1, y1 = self.chunk_bounds(order[i % len(order)])
+                i += 1
+                pos = (self.rng.randint(x0, x1), self.rng.randint(y0, y1))
+                if pos not in taken:  # Nadir çakışmada engel atlanır
+                    taken.add(pos)
+                    obstacles.append({"pos": pos, "type": obstacle_type})
+        return obstacles
+
+    def place_portals(self):
+        """Alanla orantılı sayıda portal çifti; uçlar boş hücrelerden örneklenir"""
+        portals = []
+        used = set()
+        min_dist = max(PORTAL_MIN_DISTANCE, min(self.width, self.height) // 4)
+        for _ in range(max(1, self.scale // 4)):
+            a = self.board.random_free_cell(self.rng)
+            if a is None:
+                break
+            for _ in range(20):
+                b = self.board.random_free_cell(self.rng)
+                if b is None or abs(b[0] - a[0]) + abs(b[1] - a[1]) >= min_dist:
+                    break
+            if b is None:
+                break
+            if a in used or b in used or a == b:
+                continue
+            used.update((a, b))
+            portals.append((a, b))
+        return portals
@@ -0,0 +1,84 @@
+# --- BACKPRESSURE MODÜLÜ ---
+# Yavaş bağlantılar için "en yeni kazanır" gönderim denetimi.
+# Socket.IO emit'leri bağlantı başına Engine.IO gönderim kuyruğuna eklenir;
+# bağlantı boşalmıyorsa çerçeveler arka arkaya birikir, sunucu belleği büyür
+# ve oyuncu giderek eskiyen state görür. OutboundMonitor her tick bağlantıların
+# kuyruk derinliğini okur; derinliği BACKPRESSURE_MAX_DEPTH'e ulaşan istemci
+# tıkalı sayılır ve GameHost ona yeni çerçeve üretmez. Kuyruk
+# BACKPRESSURE_RESUME_DEPTH'e inince istemci son aldığı state'e göre tek bir
+# delta (Time Attack'ta tam state) ile en yeni duruma atlar: aradaki çerçeveler
+# kuyrukta birikmek yerine bu çerçevede birleşir.
+# Derinlik okunamazsa (queue_depth None döndürür) istemci tıkalı sayılmaz; bu
+# durum bir kez loglanır ve depth_unavailable sayacında görünür.
+import os
+import sys
+
+BACKPRESSURE_MAX_DEPTH = int(os.environ.get("BACKPRESSURE_MAX_DEPTH", 8))  # paket
+BACKPRESSURE_RESUME_DEPTH = int(os.environ.get("BACKPRESSURE_RESUME_DEPTH", 1))  # paket
+
+
+class OutboundMonitor:
+    """Bağlantı başına kuyruk derinliği, tıkanma durumu ve birleştirilen çerçeve sayaçları"""
+    def __init__(self, queue_depth, max_depth=BACKPRESSURE_MAX_DEPTH, resume_depth=BACKPRESSURE_RESUME_DEPTH):
+        self.queue_depth = queue_depth  # sid -> gönderim kuyruğundaki paket sayısı, okunamazsa None
+        self.max_depth = max_depth
+        self.resume_depth = resume_depth
+        # sid: {"depth", "max_depth", "blocked", "stalls": tıkanma sayısı, "coalesced": tıkalıyken atlanan tick}
+        self.clients = {}
+        # Ömür boyu toplamlar (ayrılan bağlantılar dahil) - /metrics sayaçları
+        self.stalls = 0
+        self.coalesced = 0
+        self.depth_unavailable = 0
+
+    def add(self, sid):
+        self.clients.setdefault(sid, {"depth": 0, "max_depth": 0, "blocked": False, "stalls": 0, "coalesced": 0})
+
+    def remove(self, sid):
+        self.clients.pop(sid, None)
+
+    def is_blocked(self, sid):
+        client = self.clients.get(sid)
+        return client is not None and client["blocked"]
+
+    def poll(self):
+        """Derinlikleri oku; tıkanma durumu değişen (sid, tıkalı mı) çiftlerini döndür"""
+        changes = []
+        for sid, client in self.clients.items():
+            depth = self.queue_depth(sid)
+            if depth is None:
+                if not self.depth_unavailable:
+                    print("backpressure: %s için gönderim kuyruğu okunamadı, denetim devre dışı" % sid, file=sys.stderr)
+                self.depth_unavailable += 1
+                depth = 0
+            client["depth"] = depth
+            if depth > client["max_depth"]:
+                client["max_depth"] = depth
+            if client["blocked"]:
+                if depth <= self.resume_depth:
+                    client["blocked"] = False
+                    changes.append((sid, False))
+                else:
+                    client["coalesced"] += 1
+                    self.coalesced += 1
+            elif depth >= self.max_depth:
+                client["blocked"] = True
+                client["stalls"] += 1
+                self.stalls += 1
+                changes.append((sid, True))
+        return changes
+
+    def stats(self):
+        """/metrics göstergeleri: bağlı istemcilerin anlık durumu"""
+        clients = self.clients.values()
+        return {
+            "outbound_blocked_clients": sum(1 for c in clients if c["blocked"]),
+            "outbound_queue_depth_max": max((c["depth"] for c in clients), default=0),
+        }
+
+    def counters(self):
+        """/metrics sayaçları: sadece artan ömür boyu toplamlar"""
+        return {
+            "outbound_stalls": self.stalls,
+            "outbound_coalesced_ticks": self.coalesced,
+            "outbound_depth_unavailable": self.depth_unavailable,
+        }
@@ -0,0 +1,362 @@
+# --- BENCHMARK ---
+# Simülasyon ve yayın sıcak yollarının tekrarlanabilir ölçümü.
+# Her senaryo sabit seed ile kurulur, önce ısınma turu çalışır, sonra
+# --repeat kez --number çağrı ölçülür; çağrı başına medyan/min/stdev
+# mikrosaniye olarak raporlanır. --json ile sonuçlar dosyaya yazılır,
+# --compare ile önceki bir çalıştırmaya oranlanır:
+#
+#   python benchmark.py --json base.json
+#   python benchmark.py --compare base.json
+#
+# Bütçeli senaryolar (BUDGETS) --scale ile kısalmaz ve ayrıca BUDGET_CALLS tek
+# çağrı ile ölçülür: bütçe bu çağrıların medyanına, p99 tick aralığına göre
+# denetlenir; --budget ile aşılırsa çıkış kodu 1 olur.
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import arena
+import replay
+import room as rooms_module
+import time_attack_module
+from common import ARENA_MAX_PLAYERS, BOARD_WIDTH, BOARD_HEIGHT, MAX_PLAYERS, TICK_RATE, create_state_message
+from engine import Engine
+from game_host import GameHost
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+# Senaryo: medyan bütçesi (mikrosaniye); p99 her zaman bir tick aralığına sığmalı
+BUDGETS = {
+    "arena_tick": arena.ARENA_TICK_BUDGET_MS * 1000,
+}
+# Bütçe kontrolündeki tek çağrı sayısı: 5 birkaç ölçümün ortalaması gibi gürültüye
+# açık değildir ve anahtar kare döngüsünün (STATE_KEYFRAME_INTERVAL = 100 tick)
+# tam katı olduğundan iş karışımı her çalıştırmada aynıdır
+BUDGET_CALLS = 1000
+
+
+def measure(func, number, repeat, warmup=1):
+    """func'ı repeat kez number çağrı ölç, çağrı başına saniye listesi döndür"""
+    for _ in range(warmup):
+        for _ in range(number):
+            func()
+    samples = []
+    # timeit gibi: ölçüm sırasında çöp toplayıcı kapalı
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return samples
+
+
+def measure_calls(func, number):
+    """Tek tek çağrı süreleri (saniye, sıralı) - bütçe kontrolünde kuyruk gecikmesi için"""
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    samples = []
+    try:
+        for _ in range(number):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return sorted(samples)
+
+
+def populated_engine(players, seed=1):
+    """players oyunculu, birkaç saniye ısınmış bir motor"""
+    random.seed(seed)
+    engine = Engine(seed=seed)
+    for i in range(players):
+        engine.add_player("p%d" % i)
+    engine.run(40)
+    return engine
+
+
+def keep_alive(room):
+    """Elenen yılanları yeniden doğur ve rastgele yön ver (ölçüm sürekliliği için)"""
+    game_state = room.game_state
+    for cid in list(game_state["snakes"]):
+        if not game_state["active"].get(cid, True):
+            room.restart_player(cid)
+        game_state["directions"][cid] = random.choice(DIRECTIONS)
+
+
+# --- Senaryolar: her biri (kurulum sonrası) ölçülecek fonksiyonu döndürür ---
+def bench_move_snake(players):
+    room = populated_engine(players).room
+
+    def run():
+        keep_alive(room)
+        for cid in list(room.game_state["snakes"]):
+            room.move_snake(cid)
+    return run
+
+
+def bench_random_food(players):
+    room = populated_engine(players).room
+    return room.random_food
+
+
+def bench_random_powerup(players):
+    room = populated_engine(players).room
+    return room.random_powerup
+
+
+def bench_magnet(players):
+    engine = populated_engine(players)
+    room = engine.room
+    for cid in room.game_state["snakes"]:
+        room.effects.add(cid, "magnet", float("inf"))
+
+    def run():
+        keep_alive(room)
+        room.apply_magnets()
+    return run
+
+
+def bench_time_attack_move(games):
+    random.seed(1)
+    time_attack_module.time_attack_games.clear()
+    time_attack_module.time_attack_grids.clear()
+    for i in range(games):
+        time_attack_module.create_time_attack_game("ta%d" % i, "easy", BOARD_WIDTH, BOARD_HEIGHT, seed=i)
+
+    def run():
+        for cid, game_state in time_attack_module.time_attack_games.items():
+            if not game_state["game_active"]:
+                time_attack_module.respawn_time_attack_snake(cid, BOARD_WIDTH, BOARD_HEIGHT)
+            time_attack_module.set_time_attack_direction(cid, random.choice(DIRECTIONS))
+        time_attack_module.time_attack_tick += 1
+        time_attack_module.move_all_time_attack_snakes(BOARD_WIDTH, BOARD_HEIGHT)
+    return run
+
+
+def bench_frame_deepcopy_json(players):
+    """Eski yol: oyuncu başına state'in deepcopy'si + JSON kodlaması"""
+    state = populated_engine(players).room.last_state
+
+    def run():
+        for _ in range(players):
+            create_state_message(copy.deepcopy(state))
+    return run
+
+
+def bench_frame_broadcast(players):
+    """Güncel yol: varyant başına bir kez delta + kodlama, ortak delta tek yayın"""
+    return bench_frame_broadcast_room(populated_engine(players))
+
+
+def bench_frame_broadcast_room(engine):
+    """Motorun oyuncularını izleyici yap, yayın ölçüm fonksiyonunu döndür"""
+    room = engine.room
+    for i, cid in enumerate(list(room.game_state["snakes"])):
+        room.add_viewer("sid%d" % i, cid)
+    # İki ardışık state dönüşümlü yayınlanır: değişmeyen çerçeveler atlandığı için delta boş olmamalı
+    states = [room.last_state, engine.step()["frame"]]
+    room.broadcast_state(room.tick_count, states[0])
+    counter = [room.tick_count]
+
+    def run():
+        counter[0] += 1
+        room.broadcast_state(counter[0], states[counter[0] % 2])
+    return run
+
+
+def bench_frame_broadcast_aoi(players):
+    """İlgi alanı açık: oyuncu başına süzülmüş state, delta ve kodlama"""
+    engine = populated_engine(players)
+    engine.room.aoi_radius = 10
+    return bench_frame_broadcast_room(engine)
+
+
+def bench_full_tick(players):
+    """GameHost.tick: tüm odalar (oda başına MAX_PLAYERS) + yayın kodlaması"""
+    random.seed(1)
+    rooms_module.rooms.clear()
+    time_attack_module.time_attack_games.clear()
+    host = GameHost()
+    for i in range(players):
+        host.handle("join", "sid%d" % i, {"client_id": "p%d" % i})
+    for _ in range(40):
+        host.tick()
+
+    def run():
+        for room in rooms_module.rooms.values():
+            keep_alive(room)
+            for cid in room.game_state["snakes"]:
+                if random.random() < 0.3:
+                    room.enqueue_move(cid, random.choice(DIRECTIONS))
+        host.tick()
+    return run
+
+
+def bench_engine_tick(players, record=False):
+    """Engine.step rastgele girdilerle; record=True ise girdiler ve anahtar kareler kaydedilir"""
+    engine = populated_engine(players)
+    room = engine.room
+    if record:
+        room.recorder = replay.ReplayRecorder(os.devnull, room)
+    players = list(room.game_state["snakes"])
+
+    def run():
+        keep_alive(room)
+        inputs = [(cid, "move", random.choice(DIRECTIONS)) for cid in players if random.random() < 0.3]
+        engine.step(inputs)
+    return run
+
+
+def bench_engine_tick_recorded(players):
+    return bench_engine_tick(players, record=True)
+
+
+def bench_arena_tick(players):
+    """Arena haritası, players oyuncunun hepsi izliyor (yarısı ikili): simülasyon + yayın kodlaması"""
+    random.seed(1)
+    engine = Engine(seed=1, room_class=arena.ArenaRoom)
+    room = engine.room
+    for i in range(players):
+        engine.add_player("p%d" % i)
+        room.add_viewer("sid%d" % i, "p%d" % i, binary=i % 2 == 1)
+    engine.run(40)
+    players = list(room.game_state["snakes"])
+
+    def run():
+        keep_alive(room)
+        inputs = [(cid, "move", random.choice(DIRECTIONS)) for cid in players if random.random() < 0.3]
+        engine.step(inputs)
+    return run
+
+
+def scenarios(large):
+    """(isim, kurulum, parametre, çağrı sayısı)"""
+    cases = [
+        ("move_snake", bench_move_snake, MAX_PLAYERS, 2000),
+        ("random_food", bench_random_food, MAX_PLAYERS, 20000),
+        ("random_powerup", bench_random_powerup, MAX_PLAYERS, 20000),
+        ("magnet", bench_magnet, MAX_PLAYERS, 2000),
+        ("time_attack_move", bench_time_attack_move, 8, 2000),
+        ("frame_deepcopy_json", bench_frame_deepcopy_json, MAX_PLAYERS, 200),
+        ("frame_broadcast", bench_frame_broadcast, MAX_PLAYERS, 1000),
+        ("frame_broadcast_aoi", bench_frame_broadcast_aoi, MAX_PLAYERS, 1000),
+        ("engine_tick", bench_engine_tick, MAX_PLAYERS, 1000),
+        ("engine_tick_recorded", bench_engine_tick_recorded, MAX_PLAYERS, 1000),
+        ("arena_tick", bench_arena_tick, ARENA_MAX_PLAYERS, 400),
+    ]
+    for players in (1, MAX_PLAYERS, large):
+        cases.append(("full_tick_%d" % players, bench_full_tick, players, max(50, 2000 // players)))
+    return cases
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(repeat=5, large=64, only=None, scale=1.0):
+    results = {}
+    for name, setup, param, number in scenarios(large):
+        if only and not any(part in name for part in only):
+            continue
+        func = setup(param)
+        # Bütçeli senaryolar --scale < 1 ile kısaltılmaz: az çağrıyla kapı rastlantıya kalır
+        number = max(number, int(number * scale)) if name in BUDGETS else max(1, int(number * scale))
+        samples = measure(func, number, repeat)
+        results[name] = {
+            "param": param,
+            "number": number,
+            "median_us": statistics.median(samples) * 1e6,
+            "min_us": min(samples) * 1e6,
+            "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+        }
+        if name in BUDGETS:
+            calls = measure_calls(func, BUDGET_CALLS)
+            results[name]["call_median_us"] = statistics.median(calls) * 1e6
+            results[name]["p99_us"] = calls[int(len(calls) * 0.99)] * 1e6
+            results[name]["budget_us"] = BUDGETS[name]
+        print("%-22s %10.1f us  (min %.1f, stdev %.1f)" % (
+            name, results[name]["median_us"], results[name]["min_us"], results[name]["stdev_us"]), file=sys.stderr)
+    return {
+        "meta": {
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def check_budgets(report):
+    """Bütçeli senaryoları kontrol et, aşanların isimlerini döndür"""
+    failed = []
+    for name, result in report["results"].items():
+        if "budget_us" not in result:
+            continue
+        ok = result["call_median_us"] <= result["budget_us"] and result["p99_us"] <= TICK_RATE * 1e6
+        print("%-22s median %.1f / %.1f us, p99 %.1f / %.1f us  %s" % (
+            name, result["call_median_us"], result["budget_us"], result["p99_us"], TICK_RATE * 1e6,
+            "OK" if ok else "BÜTÇE AŞILDI"), file=sys.stderr)
+        if not ok:
+            failed.append(name)
+    return failed
+
+
+def compare(current, baseline):
+    """Medyan oranları (mevcut / taban); >1 yavaşlama"""
+    print("%-22s %12s %12s %8s" % ("benchmark", "base_us", "now_us", "ratio"))
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["median_us"] / base["median_us"] if base["median_us"] else float("inf")
+        print("%-22s %12.1f %12.1f %7.2fx" % (name, base["median_us"], result["median_us"], ratio))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake sunucusu sıcak yol benchmark'ı")
+    parser.add_argument("--repeat", type=int, default=5, help="ölçüm tekrarı (varsayılan 5)")
+    parser.add_argument("--players", type=int, default=64, help="büyük full_tick senaryosundaki oyuncu sayısı")
+    parser.add_argument("--scale", type=float, default=1.0, help="çağrı sayısı çarpanı (hızlı deneme için <1)")
+    parser.add_argument("--only", nargs="*", help="sadece ismi bunları içeren senaryolar")
+    parser.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    parser.add_argument("--compare", help="önceki --json çıktısına oranla")
+    parser.add_argument("--budget", action="store_true", help="bütçeli senaryolar aşılırsa çıkış kodu 1")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.repeat, args.players, args.only, args.scale)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    if args.budget and check_budgets(report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
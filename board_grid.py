@@ -0,0 +1,315 @@
+# --- BOARD GRID MODÜLÜ ---
+# Klasik oyun alanı için artımlı güncellenen doluluk ızgarası.
+# Her hücre için yılan segmenti sayısı, engel türü, yem, iz, portal ve
+# power-up bilgisi tutulur; move_snake içindeki tüm çarpışma testleri
+# listeleri taramak yerine tek bir indeks okumasına dönüşür. Yılan, yem,
+# altın elma, engel, portal ve power-up içermeyen hücreler FreeCellIndex
+# içinde tutulur, böylece spawn işlemleri O(1) örnekleme ile yapılır.
+import random
+from array import array
+
+# Engel türlerinin bytearray içindeki kodları (0 = engel yok)
+OBSTACLE_CODES = {"wall": 1, "slow": 2, "enemy": 3, "hidden_wall": 4}
+OBSTACLE_NAMES = {code: name for name, code in OBSTACLE_CODES.items()}
+
+
+class FreeCellIndex:
+    """O(1) ekleme, silme ve rastgele örnekleme yapan boş hücre kümesi"""
+    def __init__(self, size):
+        self.cells = list(range(size))          # yoğun dizi
+        self.positions = list(range(size))      # hücre -> dizideki konumu, yoksa -1
+
+    def __getstate__(self):
+        # Anlık görüntüde sadece yoğun dizi (sıra örneklemeyi belirler); konumlar ondan kurulur
+        return len(self.positions), array("I", self.cells)
+
+    def __setstate__(self, state):
+        size, cells = state
+        self.cells = list(cells)
+        self.positions = [-1] * size
+        for pos, idx in enumerate(self.cells):
+            self.positions[idx] = pos
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, idx):
+        return self.positions[idx] >= 0
+
+    def add(self, idx):
+        if self.positions[idx] < 0:
+            self.positions[idx] = len(self.cells)
+            self.cells.append(idx)
+
+    def remove(self, idx):
+        pos = self.positions[idx]
+        if pos < 0:
+            return
+        last = self.cells.pop()
+        if last != idx:
+            self.cells[pos] = last
+            self.positions[last] = pos
+        self.positions[idx] = -1
+
+    def sample(self, rng=random):
+        """Rastgele boş hücre indeksi, yoksa -1"""
+        if not self.cells:
+            return -1
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class ChunkIndex:
+    """Öğeleri size x size hücrelik karelere (chunk) kovalayan uzamsal indeks.
+    Pencere sorgusu sadece pencereyle kesişen kareleri tarar; büyük haritada
+    oyuncu başına iş pencere içindeki öğe sayısıyla sınırlı kalır."""
+    def __init__(self, size):
+        self.size = size
+        self.buckets = {}  # (cx, cy): [öğe, ...]
+
+    def key(self, cell):
+        return cell[0] // self.size, cell[1] // self.size
+
+    def add(self, cell, item):
+        self.buckets.setdefault(self.key(cell), []).append(item)
+
+    def query(self, x0, y0, x1, y1):
+        """[x0, x1] x [y0, y1] ile kesişen karelerdeki öğeler (pencere dışındakiler de olabilir)"""
+        size = self.size
+        buckets = self.buckets
+        items = []
+        for cy in range(y0 // size, y1 // size + 1):
+            for cx in range(x0 // size, x1 // size + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    items.extend(bucket)
+        return items
+
+
+class BoardGrid:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.clear()
+
+    def clear(self):
+        """Izgarayı tamamen boşalt"""
+        size = self.width * self.height
+        self.snake_counts = array("H", bytes(2 * size))  # hücredeki toplam yılan segmenti
+        self.owners = {}                                 # owner: {index: segment sayısı}
+        self.obstacles = bytearray(size)                 # engel türü kodu
+        self.food = bytearray(size)                      # hücredeki yem sayısı
+        self.trail_counts = array("H", bytes(2 * size))  # hücredeki iz sayısı
+        self.trails = {}                                 # owner: [cell, ...]
+        self.portals = {}                                # index: çıkış hücresi
+        self.powerups = {}                               # index: power-up sözlüğü
+        self.golden = -1                                 # altın elma hücresi
+        self.blockers = array("H", bytes(2 * size))      # spawn'ı engelleyen varlık sayısı
+        self.free = FreeCellIndex(size)
+
+    def index(self, cell):
+        """Hücre indeksi, alan dışındaysa -1"""
+        x, y = cell
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return -1
+
+    def cell(self, idx):
+        return (idx % self.width, idx // self.width)
+
+    def _block(self, idx):
+        if self.blockers[idx] == 0:
+            self.free.remove(idx)
+        self.blockers[idx] += 1
+
+    def _unblock(self, idx):
+        self.blockers[idx] -= 1
+        if self.blockers[idx] == 0:
+            self.free.add(idx)
+
+    # --- Boş hücreler ---
+    def is_free(self, cell):
+        idx = self.index(cell)
+        return idx >= 0 and self.blockers[idx] == 0
+
+    def random_free_cell(self, rng=random):
+        """Rastgele boş hücre, alan doluysa None"""
+        idx = self.free.sample(rng)
+        if idx < 0:
+            return None
+        return self.cell(idx)
+
+    def free_cells(self):
+        """Tüm boş hücrelerin listesi (sıra garanti edilmez)"""
+        return [self.cell(idx) for idx in self.free.cells]
+
+    # --- Yılanlar ---
+    def add_snake_cell(self, owner, cell):
+        idx = self.index(cell)
+        if idx < 0:
+            return
+        self.snake_counts[idx] += 1
+        self._block(idx)
+        cells = self.owners.setdefault(owner, {})
+        cells[idx] = cells.get(idx, 0) + 1
+
+    def remove_snake_cell(self, owner, cell):
+        idx = self.index(cell)
+        cells = self.owners.get(owner)
+        if idx < 0 or not cells or idx not in cells:
+            return
+        self.snake_counts[idx] -= 1
+        self._unblock(idx)
+        if cells[idx] == 1:
+            del cells[idx]
+        else:
+            cells[idx] -= 1
+
+    def set_snake(self, owner, snake):
+        """Oyuncunun tüm segmentlerini yeniden yaz"""
+        self.remove_snake(owner)
+        for cell in snake:
+            self.add_snake_cell(owner, cell)
+
+    def remove_snake(self, owner):
+        for idx, count in self.owners.pop(owner, {}).items():
+            self.snake_counts[idx] -= count
+            for _ in range(count):
+                self._unblock(idx)
+
+    def has_own_segment(self, owner, cell):
+        idx = self.index(cell)
+        return idx >= 0 and idx in self.owners.get(owner, ())
+
+    def has_other_snake(self, owner, cell):
+        """Hücrede owner dışında bir yılanın segmenti var mı"""
+        idx = self.index(cell)
+        if idx < 0:
+            return False
+        return self.snake_counts[idx] > self.owners.get(owner, {}).get(idx, 0)
+
+    # --- Engeller ve portallar ---
+    def set_obstacles(self, obstacles):
+        for idx, code in enumerate(self.obstacles):
+            if code:
+                self.obstacles[idx] = 0
+                self._unblock(idx)
+        for obs in obstacles:
+            self.add_obstacle(obs)
+
+    def add_obstacle(self, obs):
+        idx = self.index(tuple(obs["pos"]))
+        if idx >= 0 and not self.obstacles[idx]:
+            self.obstacles[idx] = OBSTACLE_CODES[obs["type"]]
+            self._block(idx)
+
+    def obstacle_at(self, cell):
+        """Hücredeki engel türü, yoksa None"""
+        idx = self.index(cell)
+        if idx < 0 or not self.obstacles[idx]:
+            return None
+        return OBSTACLE_NAMES[self.obstacles[idx]]
+
+    def set_portals(self, portals):
+        for idx in self.portals:
+            self._unblock(idx)
+        self.portals = {}
+        for portal_a, portal_b in portals:
+            self.portals[self.index(portal_a)] = portal_b
+            self.portals[self.index(portal_b)] = portal_a
+        for idx in self.portals:
+            self._block(idx)
+
+    def portal_exit(self, cell):
+        """Hücre bir portal ise karşı ucu, değilse None"""
+        idx = self.index(cell)
+        if idx < 0:
+            return None
+        return self.portals.get(idx)
+
+    # --- Yem, power-up ve izler ---
+    def add_food(self, cell):
+        idx = self.index(cell)
+        if idx >= 0:
+            self.food[idx] += 1
+            self._block(idx)
+
+    def remove_food(self, cell):
+        idx = self.index(cell)
+        if idx >= 0 and self.food[idx] > 0:
+            self.food[idx] -= 1
+            self._unblock(idx)
+
+    def set_food(self, foods):
+        for idx, count in enumerate(self.food):
+            for _ in range(count):
+                self._unblock(idx)
+        self.food = bytearray(self.width * self.height)
+        for cell in foods:
+            self.add_food(cell)
+
+    def set_golden(self, cell):
+        """Altın elma hücresini ayarla (None = kaldır)"""
+        if self.golden >= 0:
+            self._unblock(self.golden)
+        self.golden = self.index(cell) if cell is not None else -1
+        if self.golden >= 0:
+            self._block(self.golden)
+
+    def has_food(self, cell):
+        idx = self.index(cell)
+        return idx >= 0 and self.food[idx] > 0
+
+    def food_within(self, cell, radius):
+        """cell'e Manhattan mesafesi radius içinde yem var mı (satır dilimleriyle, yem listesi taranmaz)"""
+        x, y = cell
+        width = self.width
+        food = self.food
+        for ny in range(max(0, y - radius), min(self.height - 1, y + radius) + 1):
+            span = radius - abs(ny - y)
+            row = ny * width
+            if any(food[row + max(0, x - span):row + min(width - 1, x + span) + 1]):
+                return True
+        return False
+
+    def add_powerup(self, powerup):
+        idx = self.index(tuple(powerup["pos"]))
+        if idx >= 0:
+            if idx not in self.powerups:
+                self._block(idx)
+            self.powerups[idx] = powerup
+
+    def remove_powerup(self, powerup):
+        idx = self.index(tuple(powerup["pos"]))
+        if self.powerups.pop(idx, None) is not None:
+            self._unblock(idx)
+
+    def set_powerups(self, powerups):
+        for idx in self.powerups:
+            self._unblock(idx)
+        self.powerups = {}
+        for powerup in powerups:
+            self.add_powerup(powerup)
+
+    def powerup_at(self, cell):
+        idx = self.index(cell)
+        if idx < 0:
+            return None
+        return self.powerups.get(idx)
+
+    def set_trail(self, owner, trail):
+        self.remove_trail(owner)
+        for cell in trail:
+            idx = self.index(cell)
+            if idx >= 0:
+                self.trail_counts[idx] += 1
+        self.trails[owner] = list(trail)
+
+    def remove_trail(self, owner):
+        for cell in self.trails.pop(owner, ()):
+            idx = self.index(cell)
+            if idx >= 0:
+                self.trail_counts[idx] -= 1
+
+    def trail_at(self, cell):
+        idx = self.index(cell)
+        return idx >= 0 and self.trail_counts[idx] > 0
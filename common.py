@@ -1,4 +1,5 @@
 # common.py
+import os
 
 # Message types
 MSG_MOVE = 'move'
@@ -13,6 +14,12 @@ MAX_PLAYERS = 8
 BOARD_WIDTH = 60   # Wider horizontally
 BOARD_HEIGHT = 35  # 700/20 = 35 rows
 START_LENGTH = 3
+
+# Arena modu: büyük harita, çok oyuncu (join'de arena: true). Oyuncu sayısı
+# ikili çerçevedeki 1 baytlık slot numarasına sığmalı (en fazla 255)
+ARENA_WIDTH = int(os.environ.get("ARENA_WIDTH", 300))
+ARENA_HEIGHT = int(os.environ.get("ARENA_HEIGHT", 300))
+ARENA_MAX_PLAYERS = min(255, int(os.environ.get("ARENA_MAX_PLAYERS", 128)))
 TICK_RATE = 0.05   # seconds, 20 FPS
 MAX_SNAKE_LENGTH = 10
 
@@ -140,6 +147,10 @@ def create_state_message(state):
     import json
     return json.dumps(state)
 
+def seconds_to_ticks(seconds):
+    """Saniye cinsinden süreyi simülasyon tick sayısına çevir"""
+    return int(round(seconds / TICK_RATE))
+
 # Engel türleri
 OBSTACLE_TYPES = [
     {"type": "wall", "color": (128, 128, 128)},
@@ -163,6 +174,9 @@ POWERUP_TYPES = [
 # Oyun başında elma sayısı
 INITIAL_FOOD_COUNT = 4
 
+# State delta yayını - her N tick'te bir tam anahtar kare gönderilir
+STATE_KEYFRAME_INTERVAL = 100  # 20 FPS'te 5 saniye
+
 # Time Attack modu sabitleri
 TIME_ATTACK_CONSTANTS = {
     "INITIAL_SNAKE_LENGTH": 3,        # Time Attack'ta başlangıç yılan uzunluğu
@@ -207,6 +221,6 @@ TIME_ATTACK_ALLOWED_POWERUPS = ["shield", "speed", "reverse", "magnet"]
 TIME_ATTACK_STATE_KEYS = [
     "snake", "direction", "food", "golden_food", "obstacles", 
     "powerups", "active_powerups", "score", "time_left", 
-    "difficulty", "start_time", "game_active", "high_score", 
+    "difficulty", "start_tick", "game_active", "high_score", 
     "respawn_count"
 ] 
\ No newline at end of file
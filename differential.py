@@ -0,0 +1,600 @@
+# --- DIFFERENTIAL TEST MODÜLÜ ---
+# Kural uygulamalarını yan yana karşılaştıran fark (differential) testi.
+# Referans motorlar oyun kurallarının düz, liste taramalı halidir (BoardGrid,
+# SnakeBody sayaçları veya zamanlayıcı indeksleri sorgulanmaz); aday motor
+# mevcut (optimize) uygulamadır. Her iki motor aynı seed ve aynı rastgele
+# girdi akışıyla çalıştırılır, çerçeveler tick tick karşılaştırılır. Fark
+# bulunursa girdi akışı farkı koruyan en küçük hale indirgenir ve tekrar
+# çalıştırılabilir bir vaka dosyası yazılır:
+#
+#   python differential.py --seeds 50 --ticks 2000
+#   python differential.py --case vaka.json
+#
+# Kapsam: klasik move_snake (kalkan duvar geçişi, enemy kuyruk kırpma, iz ve
+# yılan çarpışmaları, portal, yem), spawn hücresinin gerçekten boş olması ve
+# Time Attack hareketi. Yeni bir motor --classic / --time-attack ile aday
+# olarak verilebilir (modül:isim).
+import argparse
+import importlib
+import json
+import random
+import sys
+
+import time_attack_module
+from common import BOARD_WIDTH, BOARD_HEIGHT, TIME_ATTACK_CONSTANTS, TIME_ATTACK_ALLOWED_POWERUPS
+from engine import Engine
+from room import Room, MAX_SNAKE_LENGTH
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+# Dar dönüşler (kendi kuyruğuna/gövdesine girme) için saat yönünde sıra
+CLOCKWISE = ("UP", "RIGHT", "DOWN", "LEFT")
+# Girdi akışına "grant" ile doğrudan verilen power-up'lar (kapsamı artırmak için)
+GRANTABLE = ("shield", "speed", "trail", "magnet", "reverse", "invisible")
+# İndirgeme sırasında en fazla bu kadar yeniden çalıştırma yapılır
+MAX_SHRINK_RUNS = 400
+
+
+class ReferenceViolation(Exception):
+    """Referans motorun kural dışı bulduğu durum (ör. dolu hücrede spawn)"""
+
+
+class ReferenceRoom(Room):
+    """Klasik mod kurallarının liste taramalı referansı"""
+
+    def cell_taken(self, cell):
+        """Hücrede yılan, engel, portal, power-up veya altın elma var mı (yemler hariç)"""
+        game_state = self.game_state
+        if any(cell in list(snake) for snake in game_state["snakes"].values()):
+            return True
+        if any(tuple(obs["pos"]) == cell for obs in game_state["obstacles"]):
+            return True
+        if any(cell in (tuple(a), tuple(b)) for a, b in game_state["portals"]):
+            return True
+        if any(tuple(pu["pos"]) == cell for pu in game_state["powerups"]):
+            return True
+        golden = game_state.get("golden_food")
+        return golden is not None and tuple(golden) == cell
+
+    # Spawn seçimi aynı örnekleyiciyi kullanır (rng tüketimi aynı kalmalı), sonuç doğrulanır.
+    # Yemler kontrol edilmez: magnet yemi aynı hücrede yeniden doğurabilir.
+    def random_food(self):
+        pos = super().random_food()
+        if self.cell_taken(pos) and self.board.free.cells:
+            raise ReferenceViolation("dolu hücreye yem: %r" % (pos,))
+        return pos
+
+    def random_powerup(self):
+        powerup = super().random_powerup()
+        if self.cell_taken(powerup["pos"]) and self.board.free.cells:
+            raise ReferenceViolation("dolu hücreye power-up: %r" % (powerup["pos"],))
+        return powerup
+
+    def move_snake(self, client_id):
+        game_state = self.game_state
+        board = self.board
+        shielded = self.has_powerup(client_id, "shield")
+        if not game_state["active"].get(client_id, True):
+            return
+        direction = game_state["directions"].get(client_id)
+        if not direction:
+            return
+        snake = game_state["snakes"].get(client_id)
+        if not snake:
+            self.reset_snake(client_id)
+            snake = game_state["snakes"][client_id]
+        head_x, head_y = snake[0]
+        if direction == "UP":
+            head_y -= 1
+        elif direction == "DOWN":
+            head_y += 1
+        elif direction == "LEFT":
+            head_x -= 1
+        elif direction == "RIGHT":
+            head_x += 1
+        new_head = (head_x, head_y)
+
+        # Kendine çarpma (kuyruk dahil, yılan henüz ilerlemedi)
+        if len(snake) > 1 and new_head in list(snake):
+            if not (shielded or self.is_boost_active(client_id)):
+                self.eliminate_snake(client_id)
+                return
+
+        # Altın elma: yılan büyür, tur burada biter
+        golden = game_state.get("golden_food")
+        if golden and new_head == tuple(golden):
+            snake.push_head(new_head)
+            game_state["golden_food"] = None
+            board.set_golden(None)
+            game_state["scores"][client_id] = game_state["scores"].get(client_id, 0) + 5
+            return
+
+        for pu in game_state["powerups"]:
+            if tuple(pu["pos"]) == new_head:
+                now = self.tick_count
+                self.grant_powerup(client_id, pu["type"], now)
+                if pu["type"] == "freeze":
+                    for other_id in game_state["snakes"]:
+                        if other_id != client_id:
+                            self.grant_powerup(other_id, "frozen", now)
+                if pu["type"] == "giant":
+                    snake.grow(3)
+                game_state["powerups"].remove(pu)
+                board.remove_powerup(pu)
+                break
+
+        for portal_a, portal_b in game_state["portals"]:
+            if new_head == tuple(portal_a):
+                new_head = tuple(portal_b)
+                break
+            if new_head == tuple(portal_b):
+                new_head = tuple(portal_a)
+                break
+
+        shielded = self.has_powerup(client_id, "shield")
+        if not shielded and not self.is_boost_active(client_id):
+            obstacle_type = None
+            for obs in game_state["obstacles"]:
+                if tuple(obs["pos"]) == new_head:
+                    obstacle_type = obs["type"]
+                    break
+            score = game_state["scores"].get(client_id, 0)
+            if obstacle_type == "enemy":
+                # Puan 1 düşer, kuyruk bir kısalır; tek hücrelik yılan elenir
+                if score > 0:
+                    game_state["scores"][client_id] = score - 1
+                if len(snake) > 1:
+                    snake.pop_tail()
+                else:
+                    self.eliminate_snake(client_id)
+                    return
+            elif obstacle_type == "wall":
+                self.eliminate_snake(client_id)
+                return
+            elif obstacle_type == "hidden_wall":
+                game_state["scores"][client_id] = max(0, score - 2)
+                self.eliminate_snake(client_id)
+                return
+
+        # Kalkan veya boost varken duvardan karşı kenara geçilir
+        if not (0 <= new_head[0] < self.width and 0 <= new_head[1] < self.height):
+            if not (shielded or self.is_boost_active(client_id)):
+                self.eliminate_snake(client_id)
+                return
+            new_head = (new_head[0] % self.width, new_head[1] % self.height)
+
+        if not shielded:
+            for other_id, other in game_state["snakes"].items():
+                if other_id != client_id and new_head in list(other):
+                    self.eliminate_snake(client_id)
+                    return
+
+        snake.push_head(new_head)
+        if new_head in game_state["food"]:
+            i = game_state["food"].index(new_head)
+            board.remove_food(new_head)
+            game_state["food"][i] = self.random_food()
+            board.add_food(game_state["food"][i])
+            game_state["scores"][client_id] = game_state["scores"].get(client_id, 0) + 1
+        else:
+            snake.pop_tail()
+        snake.truncate(MAX_SNAKE_LENGTH)
+
+        # İz: kuyruk hücresi eklenir, en fazla 6 hücre
+        if self.has_powerup(client_id, "trail"):
+            trail = (game_state["trails"].get(client_id, []) + [snake[-1]])[-6:]
+            game_state["trails"][client_id] = trail
+            board.set_trail(client_id, trail)
+        elif client_id in game_state["trails"]:
+            del game_state["trails"][client_id]
+            board.remove_trail(client_id)
+
+        if not self.is_boost_active(client_id):
+            head = snake[0]
+            if any(head in trail for trail in game_state["trails"].values()):
+                self.eliminate_snake(client_id)
+
+
+def reference_move_all_time_attack_snakes(board_width, board_height):
+    """Time Attack hareketinin liste taramalı referansı"""
+    tam = time_attack_module
+    tick_count = tam.time_attack_tick
+    for client_id in list(tam.time_attack_games):
+        game_state = tam.time_attack_games[client_id]
+        grid = tam.time_attack_grids[client_id]
+        rng = tam.time_attack_rngs[client_id]
+        if not game_state["game_active"]:
+            continue
+        if not tam.time_attack_effects.has(client_id, "speed") and tick_count % 2 != 0:
+            continue
+        head = game_state["snake"][0]
+        step = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}.get(game_state["direction"])
+        if step is None:
+            continue
+        new_head = (head[0] + step[0], head[1] + step[1])
+
+        shielded = tam.time_attack_effects.has(client_id, "shield")
+        if not (0 <= new_head[0] < board_width and 0 <= new_head[1] < board_height):
+            if not shielded:
+                game_state["game_active"] = False
+                continue
+            new_head = (new_head[0] % board_width, new_head[1] % board_height)
+        # Kuyruk bu hamlede boşalacağı için sayılmaz
+        if new_head in list(game_state["snake"])[:-1] and not shielded:
+            game_state["game_active"] = False
+            continue
+
+        # Gizli duvar ve çalı oyunu bitirir ama hamle yine de tamamlanır (mevcut davranış)
+        if not tam.time_attack_effects.has(client_id, "shield"):
+            for obs in game_state["obstacles"]:
+                if new_head == tuple(obs["pos"]) and obs["type"] in ("hidden_wall", "grass"):
+                    game_state["game_active"] = False
+
+        for portal_a, portal_b in game_state.get("portals") or ():
+            if new_head == portal_a:
+                new_head = portal_b
+                break
+            if new_head == portal_b:
+                new_head = portal_a
+                break
+
+        food_eaten = False
+        if new_head in game_state["food"]:
+            game_state["score"] += 10
+            game_state["time_left"] += TIME_ATTACK_CONSTANTS["FOOD_BONUS_TIME"]
+            game_state["food"].remove(new_head)
+            grid.remove_food(new_head)
+            food_eaten = True
+
+        if game_state["golden_food"] and new_head == game_state["golden_food"]:
+            game_state["score"] += 50
+            game_state["time_left"] += TIME_ATTACK_CONSTANTS["GOLDEN_FOOD_BONUS_TIME"]
+            game_state["golden_food"] = None
+            grid.set_golden(None)
+
+        # Magnet: en yakın yem (eşitlikte listede önce gelen) başa doğru bir adım kayar
+        if tam.time_attack_effects.has(client_id, "magnet") and len(game_state["snake"]) > 0:
+            head = game_state["snake"][0]
+            distance = lambda f: abs(head[0] - f[0]) + abs(head[1] - f[1])
+            closest = min(game_state["food"], key=distance, default=None)
+            if closest and distance(closest) > 1:
+                target = (closest[0] + (closest[0] < head[0]) - (closest[0] > head[0]),
+                          closest[1] + (closest[1] < head[1]) - (closest[1] > head[1]))
+                taken = (
+                    target in list(game_state["snake"]) or target in game_state["food"]
+                    or target == game_state["golden_food"]
+                    or any(tuple(obs["pos"]) == target for obs in game_state["obstacles"])
+                    or any(target in (tuple(a), tuple(b)) for a, b in game_state.get("portals") or ())
+                    or any(tuple(pu["pos"]) == target for pu in game_state["powerups"])
+                )
+                if 0 <= target[0] < board_width and 0 <= target[1] < board_height and not taken:
+                    game_state["food"][game_state["food"].index(closest)] = target
+                    grid.remove_food(closest)
+                    grid.add_food(target)
+
+        for powerup in game_state["powerups"]:
+            if new_head == tuple(powerup["pos"]):
+                game_state["active_powerups"].setdefault(client_id, []).append({"type": powerup["type"], "tick": tick_count})
+                tam.time_attack_effects.add(client_id, powerup["type"], tick_count + tam.POWERUP_DURATION_TICKS)
+                game_state["powerups"].remove(powerup)
+                grid.remove_powerup(powerup)
+                game_state["time_left"] += TIME_ATTACK_CONSTANTS["POWERUP_BONUS_TIME"]
+                break
+
+        game_state["snake"].push_head(new_head)
+        if not food_eaten:
+            game_state["snake"].pop_tail()
+        game_state["snake"].truncate(TIME_ATTACK_CONSTANTS["MAX_SNAKE_LENGTH"])
+
+        # Spawn'lar mevcut uygulamayla aynı rastgele sayıları aynı sırayla çeker
+        if food_eaten and len(game_state["food"]) < tam.TIME_ATTACK_CONFIG["food_count"]:
+            new_food = grid.random_free_cell(rng)
+            if new_food is not None:
+                game_state["food"].append(new_food)
+                grid.add_food(new_food)
+        if rng.random() < tam.TIME_ATTACK_CONFIG["golden_food_chance"] and not game_state["golden_food"]:
+            golden = grid.random_free_cell(rng)
+            if golden is not None:
+                game_state["golden_food"] = golden
+                grid.set_golden(golden)
+        if len(game_state["powerups"]) < tam.TIME_ATTACK_CONFIG["max_powerups"]:
+            if rng.random() < TIME_ATTACK_CONSTANTS["POWERUP_SPAWN_CHANCE"]:
+                ptype = rng.choice(tam.TIME_ATTACK_CONFIG["allowed_powerups"])
+                pos = grid.random_free_cell(rng)
+                if pos is not None:
+                    powerup = {"pos": pos, "type": ptype}
+                    game_state["powerups"].append(powerup)
+                    grid.add_powerup(powerup)
+            else:
+                rng.random()  # mevcut uygulama olasılığı ikinci kez çeker
+
+
+# --- Girdi akışları ---
+def circle_moves(rng, tick, spacing):
+    """tick'ten başlayarak yılanı küçük bir kare çizdiren {tick: yön} komutları"""
+    start = rng.randrange(4)
+    turn = rng.choice((1, -1))
+    return {tick + i * spacing: CLOCKWISE[(start + turn * i) % 4] for i in range(rng.randint(3, 6))}
+
+
+def classic_inputs(seed, ticks, players=4):
+    """Tick başına (client_id, komut[, argüman]) listeleri"""
+    rng = random.Random(seed)
+    names = ["p%d" % i for i in range(players)]
+    present = set(names)
+    circles = {name: {} for name in names}
+    stream = [[(name, "join") for name in names]]
+    for tick in range(1, ticks):
+        commands = []
+        for name in names:
+            if name not in present:
+                if rng.random() < 0.01:
+                    present.add(name)
+                    commands.append((name, "join"))
+                continue
+            if tick in circles[name]:
+                commands.append((name, "move", circles[name].pop(tick)))
+                continue
+            roll = rng.random()
+            if roll < 0.02:
+                circles[name] = circle_moves(rng, tick + 1, 1)
+            elif roll < 0.25:
+                commands.append((name, "move", rng.choice(DIRECTIONS)))
+            elif roll < 0.26:
+                commands.append((name, "boost"))
+            elif roll < 0.27:
+                commands.append((name, "unboost"))
+            elif roll < 0.28:
+                commands.append((name, "restart"))
+            elif roll < 0.29:
+                commands.append((name, "ready"))
+            elif roll < 0.295:
+                commands.append((name, "grant", rng.choice(GRANTABLE)))
+            elif roll < 0.296:
+                present.discard(name)
+                commands.append((name, "leave"))
+        stream.append(commands)
+    return stream
+
+
+def time_attack_inputs(seed, ticks):
+    """Tick başına tek oyunculu Time Attack komutları"""
+    rng = random.Random(seed)
+    circles = {}
+    stream = []
+    for tick in range(ticks):
+        if tick in circles:
+            stream.append([("ta", "move", circles.pop(tick))])
+            continue
+        roll = rng.random()
+        if roll < 0.02:
+            # Hız yoksa yılan iki tick'te bir ilerler
+            circles = circle_moves(rng, tick + 2, 2)
+            stream.append([])
+        elif roll < 0.2:
+            stream.append([("ta", "move", rng.choice(DIRECTIONS))])
+        elif roll < 0.21:
+            stream.append([("ta", "respawn")])
+        elif roll < 0.215:
+            stream.append([("ta", "grant", rng.choice(TIME_ATTACK_ALLOWED_POWERUPS))])
+        elif roll < 0.22:
+            stream.append([("ta", "grow", rng.randint(1, 4))])
+        else:
+            stream.append([])
+    return stream
+
+
+# --- Çalıştırıcılar: tick başına karşılaştırılabilir çerçeve listesi ---
+def frame_text(frame):
+    return json.dumps(frame, sort_keys=True, default=list)
+
+
+def run_classic(room_class, seed, stream):
+    engine = Engine("diff", seed, room_class=room_class)
+    room = engine.room
+    frames = []
+    for commands in stream:
+        try:
+            for command in commands:
+                if command[1] == "grant":
+                    if room.has_player(command[0]):
+                        room.grant_powerup(command[0], command[2], room.tick_count)
+                else:
+                    engine.apply(*command)
+            result = engine.step()
+        except Exception as exc:  # çöken motor da bir farktır
+            frames.append("HATA %s: %s" % (type(exc).__name__, exc))
+            break
+        frames.append(frame_text({"frame": result["frame"], "events": result["events"]}))
+    return frames
+
+
+def reset_time_attack():
+    tam = time_attack_module
+    for client_id in list(tam.time_attack_games):
+        tam.remove_time_attack_game(client_id)
+    tam.time_attack_tick = 0
+
+
+def run_time_attack(move_all, seed, stream):
+    tam = time_attack_module
+    reset_time_attack()
+    tam.create_time_attack_game("ta", "easy", BOARD_WIDTH, BOARD_HEIGHT, seed=seed)
+    frames = []
+    try:
+        for commands in stream:
+            tam.update_all_time_attack_games()
+            tam.clear_expired_time_attack_powerups()
+            for client_id, command, *arg in commands:
+                if command == "move":
+                    tam.set_time_attack_direction(client_id, arg[0])
+                elif command == "respawn":
+                    tam.respawn_time_attack_snake(client_id, BOARD_WIDTH, BOARD_HEIGHT)
+                elif command == "grant":
+                    game_state = tam.time_attack_games[client_id]
+                    game_state["active_powerups"].setdefault(client_id, []).append({"type": arg[0], "tick": tam.time_attack_tick})
+                    tam.time_attack_effects.add(client_id, arg[0], tam.time_attack_tick + tam.POWERUP_DURATION_TICKS)
+                elif command == "grow":
+                    # Yem yemek seyrek olduğundan uzun gövde çarpışmaları için yılan doğrudan uzatılır
+                    tam.time_attack_games[client_id]["snake"].grow(arg[0])
+            try:
+                move_all(BOARD_WIDTH, BOARD_HEIGHT)
+            except Exception as exc:
+                frames.append("HATA %s: %s" % (type(exc).__name__, exc))
+                break
+            game_state = tam.time_attack_games["ta"]
+            frames.append(frame_text(dict(game_state, snake=game_state["snake"].to_list())))
+    finally:
+        reset_time_attack()
+    return frames
+
+
+# --- Karşılaştırma ve indirgeme ---
+def first_divergence(frames_a, frames_b):
+    """İlk farklı tick, fark yoksa None"""
+    for tick, (a, b) in enumerate(zip(frames_a, frames_b)):
+        if a != b:
+            return tick
+    if len(frames_a) != len(frames_b):
+        return min(len(frames_a), len(frames_b))
+    return None
+
+
+def describe(a, b, limit=6):
+    """İki çerçeve metninin farklı alanları"""
+    if a is None or b is None or a.startswith("HATA") or b.startswith("HATA"):
+        return ["referans: %s" % (a or "-")[:200], "aday: %s" % (b or "-")[:200]]
+    lines = []
+
+    def walk(path, x, y):
+        if len(lines) >= limit:
+            return
+        if isinstance(x, dict) and isinstance(y, dict):
+            for key in sorted(set(x) | set(y)):
+                walk(path + "." + key, x.get(key), y.get(key))
+        elif x != y:
+            lines.append("%s: %s != %s" % (path.lstrip("."), json.dumps(x)[:120], json.dumps(y)[:120]))
+    walk("", json.loads(a), json.loads(b))
+    return lines
+
+
+def shrink(diverges, stream):
+    """Farkı koruyan en kısa ve en az komutlu girdi akışı (delta debugging)"""
+    runs = 0
+
+    def check(candidate):
+        nonlocal runs
+        runs += 1
+        return diverges(candidate)
+
+    tick = check(stream)
+    stream = stream[:tick + 1]
+    # Önce tek tek oyuncuları, sonra giderek küçülen komut parçalarını çıkar
+    players = sorted({command[0] for commands in stream for command in commands if command[0] is not None})
+    for player in players:
+        candidate = [[c for c in commands if c[0] != player] for commands in stream]
+        tick = check(candidate) if runs < MAX_SHRINK_RUNS else None
+        if tick is not None:
+            stream = candidate[:tick + 1]
+    flat = [(t, i) for t, commands in enumerate(stream) for i in range(len(commands))]
+    chunk = max(1, len(flat) // 2)
+    while chunk >= 1 and runs < MAX_SHRINK_RUNS:
+        start = 0
+        while start < len(flat) and runs < MAX_SHRINK_RUNS:
+            removed = set(flat[start:start + chunk])
+            candidate = [[c for i, c in enumerate(commands) if (t, i) not in removed] for t, commands in enumerate(stream)]
+            tick = check(candidate)
+            if tick is not None:
+                stream = candidate[:tick + 1]
+                flat = [(t, i) for t, commands in enumerate(stream) for i in range(len(commands))]
+            else:
+                start += chunk
+        chunk //= 2
+    return stream, runs
+
+
+def make_checker(mode, seed, candidate):
+    """Girdi akışı için ilk fark tick'ini (yoksa None) döndüren fonksiyon"""
+    if mode == "classic":
+        def diverges(stream):
+            return first_divergence(run_classic(ReferenceRoom, seed, stream), run_classic(candidate, seed, stream))
+    else:
+        def diverges(stream):
+            return first_divergence(run_time_attack(reference_move_all_time_attack_snakes, seed, stream),
+                                    run_time_attack(candidate, seed, stream))
+    return diverges
+
+
+def run_case(mode, seed, stream, candidate):
+    """Vakayı çalıştır, (fark tick'i, açıklama satırları) döndür"""
+    if mode == "classic":
+        a, b = run_classic(ReferenceRoom, seed, stream), run_classic(candidate, seed, stream)
+    else:
+        a, b = (run_time_attack(reference_move_all_time_attack_snakes, seed, stream),
+                run_time_attack(candidate, seed, stream))
+    tick = first_divergence(a, b)
+    if tick is None:
+        return None, []
+    return tick, describe(a[tick] if tick < len(a) else None, b[tick] if tick < len(b) else None)
+
+
+def load_candidate(spec):
+    """"modül:isim" biçimindeki aday motoru içe aktar"""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Referans ve aday motorların tick tick karşılaştırması")
+    parser.add_argument("--seeds", type=int, default=20, help="denenecek seed sayısı")
+    parser.add_argument("--first-seed", type=int, default=1)
+    parser.add_argument("--ticks", type=int, default=2000, help="seed başına tick")
+    parser.add_argument("--players", type=int, default=4, help="klasik modda oyuncu sayısı")
+    parser.add_argument("--mode", choices=("classic", "time_attack", "all"), default="all")
+    parser.add_argument("--classic", default="room:Room", help="aday klasik oda sınıfı (modül:isim)")
+    parser.add_argument("--time-attack", default="time_attack_module:move_all_time_attack_snakes",
+                        help="aday Time Attack hareket fonksiyonu (modül:isim)")
+    parser.add_argument("--out", default="differential_case.json", help="indirgenmiş vakanın yazılacağı dosya")
+    parser.add_argument("--case", help="kaydedilmiş vakayı yeniden çalıştır")
+    args = parser.parse_args(argv)
+    candidates = {"classic": load_candidate(args.classic), "time_attack": load_candidate(args.time_attack)}
+
+    if args.case:
+        with open(args.case) as f:
+            case = json.load(f)
+        stream = [[tuple(command) for command in commands] for commands in case["inputs"]]
+        tick, lines = run_case(case["mode"], case["seed"], stream, candidates[case["mode"]])
+        if tick is None:
+            print("fark yok")
+            return 0
+        print("tick %d farklı:" % tick)
+        for line in lines:
+            print("  " + line)
+        return 1
+
+    modes = ("classic", "time_attack") if args.mode == "all" else (args.mode,)
+    for mode in modes:
+        for seed in range(args.first_seed, args.first_seed + args.seeds):
+            if mode == "classic":
+                stream = classic_inputs(seed, args.ticks, args.players)
+            else:
+                stream = time_attack_inputs(seed, args.ticks)
+            diverges = make_checker(mode, seed, candidates[mode])
+            if diverges(stream) is None:
+                print("%s seed %d: %d tick aynı" % (mode, seed, args.ticks))
+                continue
+            stream, runs = shrink(diverges, stream)
+            tick, lines = run_case(mode, seed, stream, candidates[mode])
+            commands = sum(len(c) for c in stream)
+            print("%s seed %d: tick %d farklı (%d tick, %d komuta indirgendi, %d çalıştırma)" % (
+                mode, seed, tick, len(stream), commands, runs))
+            for line in lines:
+                print("  " + line)
+            with open(args.out, "w") as f:
+                json.dump({"mode": mode, "seed": seed, "tick": tick, "inputs": stream}, f)
+            print("vaka: %s  (python differential.py --case %s)" % (args.out, args.out))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
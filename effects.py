@@ -0,0 +1,72 @@
+# --- EFFECT SCHEDULER MODÜLÜ ---
+# Power-up, freeze ve boost gibi süreli etkiler için merkezi zamanlayıcı.
+# Bitiş zamanları bir min-heap'te tutulur; advance() her tick'te bir kez
+# çağrılır ve süresi dolan etkileri olay olarak döndürür. Her oyuncunun
+# aktif etkileri bir bit maskesinde tutulduğu için has() tek bir bit
+# testidir ve maske yalnızca advance() ile değişir (tick başına önbellek).
+import heapq
+
+from common import POWERUP_TYPES
+
+# Etki adı -> bit. Power-up'lara ek olarak freeze'in rakiplere uyguladığı
+# 'frozen', boost'un kendisi ve boost cooldown'u da burada zamanlanır.
+EFFECT_NAMES = [p["type"] for p in POWERUP_TYPES] + ["frozen", "boost", "boost_cooldown"]
+EFFECT_BITS = {name: 1 << i for i, name in enumerate(EFFECT_NAMES)}
+
+
+class EffectScheduler:
+    """Oyuncu başına süreli etkileri bitiş zamanına göre yöneten heap"""
+    def __init__(self):
+        self.heap = []       # (bitiş, sıra, oyuncu, etki)
+        self.deadlines = {}  # oyuncu: {etki: bitiş}
+        self.masks = {}      # oyuncu: aktif etki bit maskesi
+        self.counter = 0     # aynı bitişli kayıtlar için sıra
+
+    def add(self, cid, effect, deadline):
+        """Etkiyi deadline'a kadar aktif et, zaten aktifse süreyi uzat"""
+        deadlines = self.deadlines.setdefault(cid, {})
+        if deadlines.get(effect, deadline) > deadline:
+            return
+        deadlines[effect] = deadline
+        self.masks[cid] = self.masks.get(cid, 0) | EFFECT_BITS[effect]
+        self.counter += 1
+        heapq.heappush(self.heap, (deadline, self.counter, cid, effect))
+
+    def cancel(self, cid, effect):
+        """Etkiyi olay üretmeden kaldır (heap kaydı tembel olarak atlanır)"""
+        deadlines = self.deadlines.get(cid)
+        if deadlines and deadlines.pop(effect, None) is not None:
+            self.masks[cid] &= ~EFFECT_BITS[effect]
+
+    def clear_player(self, cid):
+        """Oyuncunun tüm etkilerini kaldır"""
+        self.deadlines.pop(cid, None)
+        self.masks.pop(cid, None)
+
+    def has(self, cid, effect):
+        return bool(self.masks.get(cid, 0) & EFFECT_BITS[effect])
+
+    def deadline(self, cid, effect):
+        """Etkinin bitiş zamanı, aktif değilse None"""
+        return self.deadlines.get(cid, {}).get(effect)
+
+    def time_left(self, cid, effect, now):
+        deadline = self.deadline(cid, effect)
+        if deadline is None:
+            return 0
+        return max(0, deadline - now)
+
+    def advance(self, now):
+        """Süresi dolan etkileri kaldır ve (oyuncu, etki) listesi olarak döndür"""
+        expired = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            deadline, _, cid, effect = heapq.heappop(heap)
+            deadlines = self.deadlines.get(cid)
+            # İptal edilmiş veya uzatılmış etkilerin eski kayıtlarını atla
+            if not deadlines or deadlines.get(effect) != deadline:
+                continue
+            del deadlines[effect]
+            self.masks[cid] &= ~EFFECT_BITS[effect]
+            expired.append((cid, effect))
+        return expired
@@ -0,0 +1,122 @@
+# --- HEADLESS ENGINE MODÜLÜ ---
+# Klasik mod kurallarının ağdan bağımsız, içe aktarılabilir sürücüsü.
+# Kurallar room.Room'da; oda zamanı tick sayacıyla ölçtüğü için step()
+# gerçek zamandan bağımsız olarak istenildiği kadar hızlı çağrılabilir
+# (benchmark, fuzz, bot testleri). Aynı seed ve aynı girdilerle her çalıştırma
+# aynı maçı üretir. İzleyici eklenmedikçe state kodlanmaz.
+from common import TICK_RATE
+from room import Room
+
+# step() komutları: (client_id, komut[, argüman])
+# Sıra replay kayıtlarındaki komut kodlarıdır: yeni komutlar sona eklenir
+COMMANDS = ("join", "leave", "move", "boost", "unboost", "restart", "ready", "easteregg")
+
+
+class Engine:
+    """Tek oda simülasyonu: step(inputs) -> olaylar + state"""
+    def __init__(self, room_id="engine", seed=None, tick_rate=TICK_RATE, width=None, height=None, room_class=Room):
+        self.tick_rate = tick_rate
+        size = {}
+        if width is not None:
+            size["width"] = width
+        if height is not None:
+            size["height"] = height
+        # room_class: farklı bir kural uygulaması (ör. differential.ReferenceRoom)
+        self.room = room_class(room_id, seed=seed, **size)
+        self.previous = None  # olay tespiti için önceki tick'in özeti
+
+    @property
+    def now(self):
+        """Maç başından beri geçen oyun süresi (saniye)"""
+        return self.room.tick_count * self.tick_rate
+
+    def add_player(self, client_id):
+        self.room.add_player(client_id)
+
+    def remove_player(self, client_id):
+        self.room.remove_player(client_id)
+
+    def apply(self, client_id, command, arg=None):
+        """Tek bir oyuncu komutunu uygula"""
+        room = self.room
+        if command == "join":
+            room.add_player(client_id)
+        elif command == "leave":
+            if room.has_player(client_id):
+                room.remove_player(client_id)
+        elif command == "move":
+            room.enqueue_move(client_id, arg)
+        elif command == "boost":
+            room.activate_boost(client_id)
+        elif command == "unboost":
+            room.deactivate_boost(client_id)
+        elif command == "restart":
+            room.restart_player(client_id)
+        elif command == "ready":
+            room.set_ready(client_id)
+        elif command == "easteregg":
+            room.eliminate_all()
+        else:
+            raise ValueError("Bilinmeyen komut: %r" % (command,))
+
+    def step(self, inputs=None, profiler=None):
+        """Komutları uygula, bir tick ilerlet; {"tick", "time", "events", "frame", "messages"} döndür
+
+        inputs: {client_id: yön} veya (client_id, komut[, argüman]) listesi
+        """
+        if isinstance(inputs, dict):
+            inputs = [(client_id, "move", direction) for client_id, direction in inputs.items()]
+        for command in inputs or ():
+            self.apply(*command)
+        tick = self.room.tick_count
+        time = self.now
+        messages = self.room.tick(profiler)
+        frame = self.room.last_state
+        result = {
+            "tick": tick,
+            "time": time,
+            "events": self.detect_events(frame),
+            "frame": frame,
+            "messages": messages,
+        }
+        return result
+
+    def run(self, ticks, inputs_for_tick=None):
+        """ticks adım çalıştır; inputs_for_tick(engine, tick) her adımın komutlarını verir"""
+        results = []
+        for _ in range(ticks):
+            inputs = inputs_for_tick(self, self.room.tick_count) if inputs_for_tick else None
+            results.append(self.step(inputs))
+        return results
+
+    def detect_events(self, frame):
+        """Önceki tick'e göre oyun olayları: elenme, canlanma, puan, tur sonu/başı"""
+        summary = {
+            "active": dict(frame["active"]),
+            "scores": dict(frame["scores"]),
+            "waiting": self.room.waiting_for_restart,
+            "timer": self.room.game_timer,
+        }
+        previous = self.previous
+        self.previous = summary
+        if previous is None:
+            return []
+        events = []
+        for cid, active in summary["active"].items():
+            was_active = previous["active"].get(cid)
+            if was_active and not active and not summary["waiting"]:
+                events.append(("eliminated", cid))
+            elif was_active is False and active:
+                events.append(("respawned", cid))
+        # Herkes önceden hazırsa tur aynı tick içinde bitip yeniden başlayabilir
+        restarted = summary["timer"] != previous["timer"] and previous["timer"] is not None
+        if not restarted:
+            for cid, score in summary["scores"].items():
+                gained = score - previous["scores"].get(cid, 0)
+                if gained:
+                    events.append(("score", cid, gained))
+        if (summary["waiting"] or restarted) and not previous["waiting"]:
+            events.append(("round_over", self.room.last_winner_id))
+        if restarted:
+            events.append(("round_started",))
+        return events
@@ -0,0 +1,292 @@
+# --- GAME HOST MODÜLÜ ---
+# Bir sürecin klasik mod odalarını ve Time Attack oyunlarını yöneten, ağdan
+# bağımsız komut işleyici. server.py gelen Socket.IO event'lerini
+# handle(op, sid, data) ile buraya iletir; her komut ve her tick()
+# gönderilecek mesajların listesini (room.outbound / room.session) döndürür.
+# Tek süreçli modda server.py doğrudan bir GameHost kullanır, çok süreçli
+# modda her worker süreci kendi GameHost'unu çalıştırır (room_worker.py).
+
+import arena
+import metrics
+import replay
+import room as rooms_module
+import time_attack_module
+import wire_format
+from common import BOARD_WIDTH, BOARD_HEIGHT, create_state_message
+from room import ChatLog, outbound, session
+
+
+class GameHost:
+    """Odaları ve Time Attack oturumlarını komutlarla ve tick'lerle ilerletir"""
+    def __init__(self, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        self.width = width
+        self.height = height
+        self.sid_rooms = {}         # sid: Room
+        self.ta_sessions = {}       # sid: client_id (Time Attack)
+        self.binary_sessions = set()  # ikili Time Attack çerçevesi isteyen sid'ler
+        self.blocked_sessions = set()  # gönderim kuyruğu boşalmayan sid'ler (backpressure.py)
+        # Bir odaya girmemiş istemcilerin (Time Attack) ortak sohbeti
+        self.lobby_chat = ChatLog()
+        self.replays = {}  # sid: replay.ReplayPlayer - kayıt izleyen istemciler
+        self.tick_count = 0
+
+    def handle(self, op, sid, data=None):
+        """Komutu işle, gönderilecek mesajları döndür"""
+        handler = getattr(self, "on_" + op, None)
+        if handler is None:
+            return []
+        return handler(sid, data or {}) or []
+
+    # --- Klasik mod ---
+    def on_join(self, sid, data):
+        client_id = data.get("client_id")
+        # İstemci ?room= ile belirli bir odayı isteyebilir, yoksa boş yeri olan ilk odaya girer;
+        # arena: true ise büyük haritalı arena odalarından birine
+        room_class = arena.ArenaRoom if data.get("arena") else rooms_module.Room
+        # Önce eski odadan çıkılır: tek başına olunan oda kapanır, dolu odaya yeniden
+        # girişte kendi yeri boşalmış olur
+        messages = self.leave_room(sid) + self.stop_replay(sid)
+        room = rooms_module.find_room_for(data.get("room"), room_class)
+        if room is None:
+            messages.append(outbound("error", {"message": "Oda dolu!"}, sid))
+            return messages
+        binary = bool(data.get("binary"))
+        # REPLAY_DIR ayarlıysa oda ilk oyuncusuyla birlikte kaydedilmeye başlar
+        if replay.REPLAY_DIR and room.recorder is None:
+            room.recorder = replay.ReplayRecorder.for_room(room)
+        room.add_player(client_id)
+        room.add_viewer(sid, client_id, binary, data.get("send_rate"))
+        room.set_blocked(sid, sid in self.blocked_sessions)
+        self.sid_rooms[sid] = room
+        # İkili çerçeve desteği join sırasında bildirilir
+        channel = room.sio_binary_room if binary else room.sio_json_room
+        messages.append(session(sid, room.room_id, join=(room.sio_room, channel)))
+        messages.append(outbound("room_joined", {"room": room.room_id}, sid))
+        messages.append(outbound("map", room.build_map_message(), sid))
+        return messages
+
+    def leave_room(self, sid):
+        """İstemciyi klasik mod odasından çıkar, boşalan odayı kapat"""
+        room = self.sid_rooms.pop(sid, None)
+        if room is None:
+            return []
+        client_id = room.viewers.get(sid)
+        room.remove_viewer(sid)
+        if client_id and room.has_player(client_id):
+            room.remove_player(client_id)
+        rooms_module.remove_room_if_empty(room)
+        return [session(sid, None, leave=(room.sio_room, room.sio_json_room, room.sio_binary_room))]
+
+    def on_leave(self, sid, data):
+        return self.leave_room(sid)
+
+    def on_move(self, sid, data):
+        room = self.sid_rooms.get(sid)
+        if room is not None:
+            room.enqueue_move(data.get("client_id"), data.get("direction"), data.get("seq"))
+
+    def on_backpressure(self, sid, data):
+        """Gönderim kuyruğu boşalmayan istemciye çerçeve üretimini durdur veya sürdür"""
+        if data.get("blocked"):
+            self.blocked_sessions.add(sid)
+        else:
+            self.blocked_sessions.discard(sid)
+        room = self.viewed_room(sid)
+        if room is not None:
+            room.set_blocked(sid, sid in self.blocked_sessions)
+
+    def viewed_room(self, sid):
+        """İstemcinin state'ini aldığı oda: oynadığı oda veya izlediği kayıt"""
+        room = self.sid_rooms.get(sid)
+        if room is None and sid in self.replays:
+            room = self.replays[sid].room
+        return room
+
+    def on_request_map(self, sid, data):
+        room = self.viewed_room(sid)
+        if room is not None:
+            return [outbound("map", room.build_map_message(), sid)]
+
+    def on_request_keyframe(self, sid, data):
+        room = self.viewed_room(sid)
+        if room is not None:
+            room.request_keyframe(sid)
+
+    def on_restart(self, sid, data):
+        room = self.sid_rooms.get(sid)
+        if room is not None:
+            room.restart_player(data.get("client_id"))
+
+    def on_ready(self, sid, data):
+        room = self.sid_rooms.get(sid)
+        if room is not None:
+            room.set_ready(data.get("client_id"))
+
+    def on_activate_boost(self, sid, data):
+        client_id = data.get("client_id")
+        room = self.sid_rooms.get(sid)
+        if client_id and room is not None and room.has_player(client_id):
+            if room.activate_boost(client_id):
+                return [outbound("boost_activated", {"success": True}, sid)]
+            return [outbound("boost_activated", {"success": False, "message": "Boost kullanılamıyor"}, sid)]
+
+    def on_deactivate_boost(self, sid, data):
+        client_id = data.get("client_id")
+        room = self.sid_rooms.get(sid)
+        if client_id and room is not None and room.has_player(client_id):
+            room.deactivate_boost(client_id)
+            return [outbound("boost_deactivated", {"success": True}, sid)]
+
+    def on_easteregg(self, sid, data):
+        room = self.sid_rooms.get(sid)
+        if room is not None:
+            # Odadaki tüm istemcilere eagle egg gösterme eventi gönder
+            return room.eliminate_all()
+
+    # --- Maç kayıtları ---
+    def on_watch_replay(self, sid, data):
+        """REPLAY_DIR'deki kaydı bu istemciye normal 'state' akışıyla oynat"""
+        reader = replay.open_replay(data.get("name"))
+        if reader is None:
+            return [outbound("error", {"message": "Kayıt bulunamadı!"}, sid)]
+        messages = self.leave_room(sid) + self.stop_replay(sid)
+        player = replay.ReplayPlayer(reader, "replay:%s" % sid)
+        player.seek(data.get("tick") or reader.first_tick)
+        binary = bool(data.get("binary"))
+        player.add_viewer(sid, data.get("client_id"), binary, data.get("send_rate"))
+        player.room.set_blocked(sid, sid in self.blocked_sessions)
+        self.replays[sid] = player
+        room = player.room
+        channel = room.sio_binary_room if binary else room.sio_json_room
+        messages.append(session(sid, None, join=(room.sio_room, channel)))
+        messages.append(outbound("replay_started", {
+            "name": data.get("name"),
+            "tick": player.tick,
+            "first_tick": reader.first_tick,
+            "last_tick": reader.last_tick,
+        }, sid))
+        messages.append(outbound("map", room.build_map_message(), sid))
+        return messages
+
+    def on_replay_control(self, sid, data):
+        """Kayıtta tick'e atla ve/veya duraklat"""
+        player = self.replays.get(sid)
+        if player is None:
+            return
+        if "paused" in data:
+            player.paused = bool(data["paused"])
+        if data.get("tick") is not None:
+            player.seek(data["tick"])
+            player.room.set_blocked(sid, sid in self.blocked_sessions)
+            player.paused = bool(data.get("paused", False))
+            # Geriye atlarken harita sürümü düşebilir: haritayı yeniden gönder
+            return [outbound("map", player.room.build_map_message(), sid)]
+
+    def stop_replay(self, sid):
+        player = self.replays.pop(sid, None)
+        if player is None:
+            return []
+        room = player.room
+        return [session(sid, None, leave=(room.sio_room, room.sio_json_room, room.sio_binary_room))]
+
+    def on_stop_replay(self, sid, data):
+        return self.stop_replay(sid)
+
+    # --- Time Attack ---
+    def on_start_time_attack(self, sid, data):
+        client_id = data.get("client_id")
+        difficulty = data.get("difficulty")
+        time_attack_module.create_time_attack_game(client_id, difficulty, self.width, self.height)
+        self.ta_sessions[sid] = client_id
+        if data.get("binary"):
+            self.binary_sessions.add(sid)
+        else:
+            self.binary_sessions.discard(sid)
+        return [outbound("time_attack_started", {
+            "difficulty": difficulty,
+            "time": time_attack_module.TIME_ATTACK_CONFIG["difficulties"][difficulty]["time"],
+        }, sid)]
+
+    def on_time_attack_move(self, sid, data):
+        time_attack_module.set_time_attack_direction(data.get("client_id"), data.get("direction"))
+
+    def on_time_attack_respawn(self, sid, data):
+        time_attack_module.respawn_time_attack_snake(data.get("client_id"), self.width, self.height)
+
+    # --- Sohbet ---
+    def chat_context(self, sid):
+        """İstemcinin sohbet geçmişi, rengi ve yayın hedefi (oda veya lobi)"""
+        room = self.sid_rooms.get(sid)
+        if room is None:
+            return self.lobby_chat, "#ffffff", sid
+        return room.chat, room.player_color(sid), room.sio_room
+
+    def on_chat(self, sid, data):
+        """Doğrulanmış mesajı kaydet; fısıltı ise sadece gönderen ve alıcıya gönder"""
+        chat, player_color, target_room = self.chat_context(sid)
+        target_sid = data.get("target")
+        message_type = "whisper" if target_sid else "global"
+        success, chat_data = chat.add(sid, data.get("player_name"), player_color, data.get("message"), message_type, target_sid)
+        if not success:
+            return [outbound("chat_error", {"message": chat_data}, sid)]
+        if target_sid:
+            return [outbound("chat_message", chat_data, sid), outbound("chat_message", chat_data, target_sid)]
+        return [outbound("chat_message", chat_data, target_room)]
+
+    def on_chat_history(self, sid, data):
+        chat, _, _ = self.chat_context(sid)
+        return [outbound("chat_history", chat.messages, sid)]
+
+    def on_disconnect(self, sid, data):
+        messages = self.leave_room(sid)
+        client_id = self.ta_sessions.pop(sid, None) or data.get("client_id")
+        if client_id:
+            # Time Attack temizliği
+            time_attack_module.remove_time_attack_game(client_id)
+        self.binary_sessions.discard(sid)
+        self.blocked_sessions.discard(sid)
+        self.lobby_chat.throttle.pop(sid, None)
+        self.replays.pop(sid, None)
+        return messages
+
+    # --- Tick ---
+    def tick(self, profiler=None):
+        """Time Attack oyunlarını ve tüm odaları bir tick ilerlet, mesajları döndür"""
+        mark = profiler.mark if profiler is not None else metrics.skip_mark
+        # Time Attack modülünü güncelle
+        time_attack_module.update_all_time_attack_games()
+        mark("time_attack_update")
+        time_attack_module.clear_expired_time_attack_powerups()
+        mark("expiry")
+
+        # Klasik mod odaları - her oda kendi state'ini kodlayıp mesaj listesi döndürür
+        messages = []
+        for room in list(rooms_module.rooms.values()):
+            messages.extend(room.tick(profiler))
+        # İzlenen kayıtlar da tick başına bir adım ilerler
+        for sid, player in self.replays.items():
+            if player.paused:
+                continue
+            if player.finished:
+                player.paused = True
+                messages.append(outbound("replay_ended", {"tick": player.tick}, sid))
+                continue
+            messages.extend(player.step()["messages"])
+        mark("replay")
+
+        time_attack_module.move_all_time_attack_snakes(self.width, self.height)
+        mark("time_attack_move")
+
+        # Time Attack state'i - kopyalamadan doğrudan kodlanır; tıkalı bağlantı bir sonraki tam state'i bekler
+        for sid, client_id in self.ta_sessions.items():
+            ta_state = time_attack_module.time_attack_games.get(client_id)
+            if ta_state is None or sid in self.blocked_sessions:
+                continue
+            if sid in self.binary_sessions:
+                payload = wire_format.encode_time_attack_state(ta_state, self.width, self.tick_count)
+            else:
+                payload = create_state_message(dict(ta_state, snake=ta_state["snake"].to_list()))
+            messages.append(outbound("time_attack_state", payload, sid))
+        mark("encode")
+        self.tick_count += 1
+        return messages
@@ -0,0 +1,337 @@
+# --- LOAD TEST ---
+# Yerel bir sunucuya karşı betikli Socket.IO oyuncuları çalıştıran yük aracı.
+# Oyuncular join / start_time_attack ile girer, gerçekçi aralıklarla move,
+# activate_boost ve chat_message gönderir. Oyuncu sayısı adım adım artırılır;
+# her adımda state çerçevelerinin varış aralığı sapması (jitter), girdiden
+# çerçeveye gecikme, istemci başına bayt/sn, sunucu CPU'su ve /metrics'teki
+# tick taşmaları ölçülür. Tick taşması başlamadan önceki son adım, çekirdek
+# başına kaldırılabilen oyuncu sayısı olarak raporlanır.
+#
+#   python load_test.py --spawn --max 400 --step 25
+#   python load_test.py --url http://localhost:8000 --server-pid 1234
+#
+# python-socketio istemcisi gerekir (pip install "python-socketio[client]").
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+try:
+    import socketio
+except ImportError:  # isteğe bağlı bağımlılık, sadece bu araç kullanır
+    socketio = None
+
+from common import TICK_RATE
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+OPPOSITE_DIRECTIONS = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+# Oyuncu davranışı: saniyedeki ortalama komut sayıları
+MOVE_RATE = 3.0
+BOOST_RATE = 0.1
+CHAT_RATE = 0.03
+# Uygulanmayan yön komutları bu süreden sonra gecikme ölçümünden düşer
+PENDING_TIMEOUT = 1.0
+# Adım başına izin verilen tick taşma oranı
+OVERRUN_LIMIT = 0.01
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class Bot:
+    """Tek bir betikli oyuncu"""
+    def __init__(self, url, name, mode, rng):
+        self.url = url
+        self.name = name
+        self.mode = mode
+        self.rng = rng
+        self.lock = threading.Lock()
+        self.sio = socketio.Client(reconnection=False)
+        self.direction = "RIGHT" if mode == "time_attack" else "UP"
+        self.pending = None  # (yön, gönderim zamanı)
+        self.last_arrival = None
+        self.reset_stats()
+        event = "time_attack_state" if mode == "time_attack" else "state"
+        self.sio.on(event, self.on_frame)
+        self.sio.on("map", self.on_bytes)
+        self.sio.on("chat_message", self.on_bytes)
+
+    def reset_stats(self):
+        with self.lock:
+            self.intervals = []
+            self.latencies = []
+            self.bytes = 0
+            self.frames = 0
+
+    def start(self):
+        self.sio.connect(self.url, transports=["websocket"])
+        if self.mode == "time_attack":
+            self.sio.emit("start_time_attack", {"client_id": self.name, "difficulty": "easy"})
+        else:
+            self.sio.emit("join", {"client_id": self.name})
+
+    def stop(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+    def on_bytes(self, payload):
+        size = len(payload.encode("utf-8")) if isinstance(payload, str) else len(json.dumps(payload))
+        with self.lock:
+            self.bytes += size
+
+    def on_frame(self, payload):
+        now = time.perf_counter()
+        self.on_bytes(payload)
+        frame = json.loads(payload) if isinstance(payload, str) else payload
+        direction = self.frame_direction(frame)
+        with self.lock:
+            self.frames += 1
+            if self.last_arrival is not None:
+                self.intervals.append(now - self.last_arrival)
+            self.last_arrival = now
+            if direction is not None:
+                self.direction = direction
+                if self.pending and self.pending[0] == direction:
+                    self.latencies.append(now - self.pending[1])
+                    self.pending = None
+
+    def frame_direction(self, frame):
+        """Çerçevedeki kendi yönümüz (yoksa None)"""
+        if self.mode == "time_attack":
+            return frame.get("direction")
+        if frame.get("keyframe"):
+            return frame["state"].get("directions", {}).get(self.name)
+        directions = frame.get("players", {}).get("directions", {})
+        return directions.get("set", {}).get(self.name)
+
+    def act(self, dt, now):
+        """dt saniyelik davranış adımı"""
+        rng = self.rng
+        with self.lock:
+            if self.pending and now - self.pending[1] > PENDING_TIMEOUT:
+                self.pending = None
+            current = self.direction
+        if rng.random() < MOVE_RATE * dt:
+            choices = [d for d in DIRECTIONS if d != current and d != OPPOSITE_DIRECTIONS[current]]
+            direction = rng.choice(choices)
+            with self.lock:
+                if self.pending is None:
+                    self.pending = (direction, time.perf_counter())
+            event = "time_attack_move" if self.mode == "time_attack" else "move"
+            self.sio.emit(event, {"client_id": self.name, "direction": direction})
+        if self.mode != "time_attack" and rng.random() < BOOST_RATE * dt:
+            self.sio.emit("activate_boost", {"client_id": self.name})
+        if rng.random() < CHAT_RATE * dt:
+            self.sio.emit("chat_message", {"player_name": self.name, "message": "selam %d" % rng.randint(0, 999)})
+
+
+def process_tree_cpu(pid):
+    """pid ve alt süreçlerinin toplam CPU süresi (saniye, Linux /proc)"""
+    tick = os.sysconf("SC_CLK_TCK")
+    total = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open("/proc/%s/stat" % entry) as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[1] = ppid, fields[11]/[12] = utime/stime
+        if int(entry) == pid or int(fields[1]) == pid:
+            total += int(fields[11]) + int(fields[12])
+    return total / tick
+
+
+def fetch_metrics(url):
+    with urllib.request.urlopen(url.rstrip("/") + "/metrics?format=json", timeout=5) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def wait_for_server(url, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            fetch_metrics(url)
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+class LoadTest:
+    """Oyuncu sayısını adım adım artırıp her adımı ölçen sürücü"""
+    def __init__(self, url, mode, server_pid=None, seed=1):
+        self.url = url
+        self.mode = mode
+        self.server_pid = server_pid
+        self.rng = random.Random(seed)
+        self.bots = []
+        self.running = False
+        self.driver = None
+
+    def add_bots(self, count):
+        for _ in range(count):
+            index = len(self.bots)
+            mode = self.mode
+            if mode == "mixed":
+                mode = "time_attack" if index % 2 else "classic"
+            bot = Bot(self.url, "bot%d" % index, mode, random.Random(self.rng.random()))
+            bot.start()
+            self.bots.append(bot)
+
+    def drive(self, interval=0.1):
+        """Tüm oyuncuların davranışını tek bir iş parçacığından sür"""
+        last = time.perf_counter()
+        while self.running:
+            time.sleep(interval)
+            now = time.perf_counter()
+            for bot in list(self.bots):
+                try:
+                    bot.act(now - last, now)
+                except Exception:
+                    pass  # bağlantısı kopan oyuncu
+            last = now
+
+    def start(self):
+        self.running = True
+        self.driver = threading.Thread(target=self.drive, daemon=True)
+        self.driver.start()
+
+    def stop(self):
+        self.running = False
+        for bot in self.bots:
+            bot.stop()
+
+    def measure_step(self, hold):
+        """hold saniye ölç, adım özetini döndür"""
+        for bot in self.bots:
+            bot.reset_stats()
+        before = fetch_metrics(self.url)["tick"]
+        cpu_before = process_tree_cpu(self.server_pid) if self.server_pid else None
+        start = time.time()
+        time.sleep(hold)
+        elapsed = time.time() - start
+        after = fetch_metrics(self.url)["tick"]
+        cpu = None
+        if self.server_pid:
+            cpu = (process_tree_cpu(self.server_pid) - cpu_before) / elapsed
+
+        ticks = after["ticks"] - before["ticks"]
+        overruns = after["overruns"] - before["overruns"]
+        skipped = after["skipped"] - before["skipped"]
+        tick_time = after["avg_duration"] * after["ticks"] - before["avg_duration"] * before["ticks"]
+        jitters, intervals, latencies, rates = [], [], [], []
+        for bot in self.bots:
+            with bot.lock:
+                if len(bot.intervals) > 1:
+                    jitters.append(statistics.pstdev(bot.intervals))
+                intervals.extend(bot.intervals)
+                latencies.extend(bot.latencies)
+                rates.append(bot.bytes / elapsed)
+        return {
+            "players": len(self.bots),
+            "ticks": ticks,
+            "overruns": overruns,
+            "skipped": skipped,
+            "overrun_ratio": overruns / ticks if ticks else 1.0,
+            "avg_tick_ms": tick_time / ticks * 1000 if ticks else 0.0,
+            "server_cpu": cpu,
+            "frame_interval_p50_ms": percentile(intervals, 0.5) * 1000,
+            "frame_interval_p99_ms": percentile(intervals, 0.99) * 1000,
+            "frame_jitter_ms": statistics.mean(jitters) * 1000 if jitters else 0.0,
+            "input_latency_p50_ms": percentile(latencies, 0.5) * 1000,
+            "input_latency_p99_ms": percentile(latencies, 0.99) * 1000,
+            "bytes_per_sec_per_client": statistics.mean(rates) if rates else 0.0,
+        }
+
+
+def run(args):
+    server = None
+    url = args.url
+    server_pid = args.server_pid
+    if args.spawn:
+        port = args.port
+        url = "http://127.0.0.1:%d" % port
+        env = dict(os.environ, PORT=str(port))
+        server = subprocess.Popen([sys.executable, "server.py"], env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+        server_pid = server.pid
+    if not wait_for_server(url):
+        raise SystemExit("Sunucuya ulaşılamadı: %s" % url)
+
+    test = LoadTest(url, args.mode, server_pid, args.seed)
+    steps = []
+    best = None
+    try:
+        test.start()
+        target = args.start
+        while target <= args.max:
+            test.add_bots(target - len(test.bots))
+            time.sleep(args.warmup)
+            step = test.measure_step(args.hold)
+            steps.append(step)
+            print("%4d oyuncu: tick %.2f ms, taşma %.1f%%, jitter %.1f ms, gecikme p99 %.0f ms, %.0f B/s/istemci, CPU %s" % (
+                step["players"], step["avg_tick_ms"], step["overrun_ratio"] * 100, step["frame_jitter_ms"],
+                step["input_latency_p99_ms"], step["bytes_per_sec_per_client"],
+                "-" if step["server_cpu"] is None else "%.0f%%" % (step["server_cpu"] * 100)), file=sys.stderr)
+            if step["overrun_ratio"] > OVERRUN_LIMIT or step["skipped"]:
+                break
+            best = step
+            target += args.step
+    finally:
+        test.stop()
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    capacity = None
+    if best is not None:
+        cores = max(1.0, best["server_cpu"]) if best["server_cpu"] is not None else 1.0
+        capacity = {
+            "max_players": best["players"],
+            "cores": cores,
+            "players_per_core": best["players"] / cores,
+        }
+    return {"mode": args.mode, "tick_rate": TICK_RATE, "steps": steps, "capacity": capacity}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simüle Socket.IO oyuncularıyla yük testi")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="server.py'yi kendisi başlat (--port)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-pid", type=int, help="CPU ölçümü için sunucu süreci")
+    parser.add_argument("--mode", choices=("classic", "time_attack", "mixed"), default="classic")
+    parser.add_argument("--start", type=int, default=10, help="ilk adımdaki oyuncu sayısı")
+    parser.add_argument("--step", type=int, default=10, help="adım başına eklenen oyuncu")
+    parser.add_argument("--max", type=int, default=300, help="en fazla oyuncu")
+    parser.add_argument("--warmup", type=float, default=2.0, help="ölçümden önce bekleme (sn)")
+    parser.add_argument("--hold", type=float, default=10.0, help="adım başına ölçüm süresi (sn)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="raporu bu dosyaya yaz")
+    args = parser.parse_args(argv)
+    if socketio is None:
+        raise SystemExit('python-socketio istemcisi gerekli: pip install "python-socketio[client]"')
+
+    report = run(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# --- MESSAGE BUS MODÜLÜ ---
+# Aynı makinede çalışan birden fazla server.py örneğinin varlık (presence),
+# sohbet ve oda yönlendirme bilgisini paylaşması için yayın/abone katmanı.
+# InProcessBus tek örnek içindir ve mesajları aboneye hemen iletir.
+# UnixSocketBus her örneğe ortak bir dizinde bir Unix datagram soketi açar;
+# publish() yerel abonelere hemen, diğer örneklere JSON datagram olarak
+# gider ve karşı tarafta poll() ile (oyun döngüsünde) teslim edilir.
+# SessionDirectory bu veri yolu üzerinde sid -> oyuncu/örnek/oda dizinini
+# tüm örneklerde çoğaltır.
+import json
+import os
+import socket
+import uuid
+
+# "local" (varsayılan) veya "unix:<dizin>"
+MESSAGE_BUS = os.environ.get("MESSAGE_BUS", "local")
+# Datagram başına en büyük mesaj boyutu
+MAX_DATAGRAM = 65536
+
+
+class InProcessBus:
+    """Tek süreçli veri yolu: publish aboneleri doğrudan çağırır"""
+    def __init__(self, instance_id=None):
+        self.instance_id = instance_id or uuid.uuid4().hex[:8]
+        self.handlers = {}  # kanal: [callback(message, sender)]
+
+    def subscribe(self, channel, callback):
+        self.handlers.setdefault(channel, []).append(callback)
+
+    def publish(self, channel, message):
+        self.deliver(channel, message, self.instance_id)
+
+    def deliver(self, channel, message, sender):
+        for callback in self.handlers.get(channel, ()):
+            callback(message, sender)
+
+    def poll(self):
+        """Diğer örneklerden gelen mesajları teslim et (tek süreçte yok)"""
+        return 0
+
+    def close(self):
+        pass
+
+
+class UnixSocketBus(InProcessBus):
+    """Ortak dizindeki Unix datagram soketleri üzerinden örnekler arası veri yolu"""
+    def __init__(self, directory, instance_id=None):
+        super().__init__(instance_id)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, self.instance_id + ".sock")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+        self.dead_peers = []  # ulaşılamayan örnekler (SessionDirectory temizler)
+
+    def peers(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".sock") and name != self.instance_id + ".sock":
+                yield name[:-5], os.path.join(self.directory, name)
+
+    def publish(self, channel, message):
+        self.deliver(channel, message, self.instance_id)
+        packet = json.dumps([channel, self.instance_id, message]).encode("utf-8")
+        for peer, path in list(self.peers()):
+            try:
+                self.sock.sendto(packet, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Çöken örneğin soket dosyası kalmış: kaldır
+                self.remove_peer(peer, path)
+            except BlockingIOError:
+                pass  # alıcının kuyruğu dolu, mesaj düşer
+
+    def remove_peer(self, peer, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        self.dead_peers.append(peer)
+
+    def poll(self):
+        """Bekleyen datagramları abonelere teslim et, teslim edilen sayıyı döndür"""
+        count = 0
+        while True:
+            try:
+                packet = self.sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                break
+            channel, sender, message = json.loads(packet.decode("utf-8"))
+            self.deliver(channel, message, sender)
+            count += 1
+        while self.dead_peers:
+            self.deliver("peer_down", None, self.dead_peers.pop())
+        return count
+
+    def close(self):
+        # Diğer örnekler bu örneğin oturumlarını dizinden düşürsün
+        self.publish("peer_down", None)
+        self.sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def create_bus(spec=MESSAGE_BUS, instance_id=None):
+    """MESSAGE_BUS ayarına göre veri yolu oluştur"""
+    if spec.startswith("unix:"):
+        return UnixSocketBus(spec[len("unix:"):], instance_id)
+    return InProcessBus(instance_id)
+
+
+class SessionDirectory:
+    """Tüm örneklerdeki bağlı istemcilerin çoğaltılmış dizini"""
+    def __init__(self, bus):
+        self.bus = bus
+        self.instance_id = bus.instance_id
+        self.sessions = {}  # sid: {"client_id", "instance", "room"}
+        bus.subscribe("presence", self._on_presence)
+        bus.subscribe("hello", self._on_hello)
+        bus.subscribe("peer_down", self._on_peer_down)
+        # Yeni örnek: diğerlerinden mevcut oturumları iste
+        bus.publish("hello", None)
+
+    def register(self, sid, client_id, room=None):
+        self._announce(sid, {"client_id": client_id, "instance": self.instance_id, "room": room})
+
+    def set_room(self, sid, room):
+        entry = self.sessions.get(sid)
+        if entry is not None and entry["instance"] == self.instance_id and entry["room"] != room:
+            self._announce(sid, dict(entry, room=room))
+
+    def unregister(self, sid):
+        if sid in self.sessions:
+            self._announce(sid, None)
+
+    def is_local(self, sid):
+        entry = self.sessions.get(sid)
+        return entry is None or entry["instance"] == self.instance_id
+
+    def find_by_name(self, client_id):
+        """İsim ile oyuncu socket ID'sini bul (tüm örneklerde)"""
+        for sid, entry in self.sessions.items():
+            if entry["client_id"] == client_id:
+                return sid
+        return None
+
+    def name_in_room(self, client_id, exclude_sid=None):
+        """Oyuncu adı herhangi bir örnekte bir odada kullanılıyor mu"""
+        for sid, entry in self.sessions.items():
+            if sid != exclude_sid and entry["client_id"] == client_id and entry["room"] is not None:
+                return True
+        return False
+
+    def room_instance(self, room_id):
+        """Odayı barındıran örnek; yerelde oyuncusu varsa bu örnek, hiç yoksa None"""
+        if room_id is None:
+            return None
+        owner = None
+        for entry in self.sessions.values():
+            if entry["room"] == room_id:
+                if entry["instance"] == self.instance_id:
+                    return self.instance_id
+                owner = entry["instance"]
+        return owner
+
+    def _announce(self, sid, entry):
+        self.bus.publish("presence", {"sid": sid, "entry": entry})
+
+    def _on_presence(self, message, sender):
+        if message["entry"] is None:
+            self.sessions.pop(message["sid"], None)
+        else:
+            self.sessions[message["sid"]] = message["entry"]
+
+    def _on_hello(self, message, sender):
+        if sender == self.instance_id:
+            return
+        for sid, entry in list(self.sessions.items()):
+            if entry["instance"] == self.instance_id:
+                self._announce(sid, entry)
+
+    def _on_peer_down(self, message, sender):
+        for sid, entry in list(self.sessions.items()):
+            if entry["instance"] == sender:
+                del self.sessions[sid]
@@ -0,0 +1,152 @@
+# --- METRICS MODÜLÜ ---
+# Oyun döngüsünün faz bazlı süre ölçümü ve yayın istatistikleri.
+# TickProfiler her tick'i mark() çağrılarıyla fazlara böler; her faz için
+# hem ömür boyu (Prometheus histogram) hem de son N tick'lik kayan pencere
+# (p50/p99/max) tutulur. Event başına gönderilen bayt ve mesaj sayıları
+# kodlanmış yükün uzunluğundan sayılır; önceden kodlanmamış (dict/list)
+# seyrek eventler Socket.IO gibi JSON'a çevrilerek ölçülür.
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Histogram kova üst sınırları (saniye) - 50 ms tick bütçesi etrafında
+PHASE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, float("inf"))
+# Kayan pencere uzunluğu (tick) - 20 FPS'te 60 saniye
+PHASE_WINDOW = 1200
+
+# game_loop fazları, çalışma sırasıyla
+TICK_PHASES = (
+    "time_attack_update", "expiry", "input", "spawn", "classic_move",
+    "magnet", "state_build", "encode", "replay", "time_attack_move", "emit",
+)
+
+
+def skip_mark(phase):
+    """Profiler verilmediğinde kullanılan boş mark"""
+    pass
+
+
+class RollingHistogram:
+    """Ömür boyu kova sayıları + son PHASE_WINDOW örneğin kayan penceresi"""
+    def __init__(self, window=PHASE_WINDOW, buckets=PHASE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)  # ömür boyu, kova başına
+        self.count = 0
+        self.sum = 0.0
+        self.window = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.window.append(value)
+
+    def window_stats(self):
+        """Kayan pencere için p50/p99/max (saniye)"""
+        if not self.window:
+            return {"count": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        ordered = sorted(self.window)
+        n = len(ordered)
+        return {
+            "count": n,
+            "p50": ordered[(n - 1) // 2],
+            "p99": ordered[min(n - 1, int(n * 0.99))],
+            "max": ordered[-1],
+        }
+
+
+class TickProfiler:
+    """Tick'i fazlara bölen ve faz sürelerini histogramlara yazan profiler"""
+    def __init__(self, phases=TICK_PHASES, clock=time.perf_counter):
+        self.clock = clock
+        self.phases = {name: RollingHistogram() for name in phases}
+        self.last = 0.0
+
+    def start_tick(self):
+        self.last = self.clock()
+
+    def mark(self, phase):
+        """Son mark'tan bu yana geçen süreyi phase'e yaz"""
+        now = self.clock()
+        self.phases[phase].observe(now - self.last)
+        self.last = now
+
+
+class EmitStats:
+    """Event türü başına gönderilen mesaj ve bayt sayaçları"""
+    def __init__(self):
+        self.messages = {}
+        self.bytes = {}
+
+    def record(self, event, payload, recipients=1):
+        """Payload'ın gönderimini say; str/bytes dışındaki yükler JSON boyutuyla ölçülür"""
+        if isinstance(payload, str):
+            size = len(payload.encode("utf-8"))
+        elif isinstance(payload, (bytes, bytearray)):
+            size = len(payload)
+        else:
+            size = len(json.dumps(payload).encode("utf-8"))
+        self.messages[event] = self.messages.get(event, 0) + recipients
+        self.bytes[event] = self.bytes.get(event, 0) + size * recipients
+
+
+def _labels(**labels):
+    return "{" + ",".join('%s="%s"' % (key, value) for key, value in labels.items()) + "}"
+
+
+def render_prometheus(profiler, emit_stats, gauges, tick_stats, counters):
+    """Prometheus metin formatı (text/plain; version=0.0.4)"""
+    lines = [
+        "# HELP snake_tick_phase_seconds game_loop faz süreleri",
+        "# TYPE snake_tick_phase_seconds histogram",
+    ]
+    for phase, hist in profiler.phases.items():
+        cumulative = 0
+        for bound, count in zip(hist.buckets, hist.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append("snake_tick_phase_seconds_bucket%s %d" % (_labels(phase=phase, le=le), cumulative))
+        lines.append("snake_tick_phase_seconds_sum%s %r" % (_labels(phase=phase), hist.sum))
+        lines.append("snake_tick_phase_seconds_count%s %d" % (_labels(phase=phase), hist.count))
+    lines.append("# HELP snake_tick_phase_window_seconds Son %d tick içindeki faz süreleri" % PHASE_WINDOW)
+    lines.append("# TYPE snake_tick_phase_window_seconds gauge")
+    for phase, hist in profiler.phases.items():
+        stats = hist.window_stats()
+        for stat in ("p50", "p99", "max"):
+            lines.append("snake_tick_phase_window_seconds%s %r" % (_labels(phase=phase, stat=stat), stats[stat]))
+    lines.append("# TYPE snake_emit_messages_total counter")
+    for event, count in sorted(emit_stats.messages.items()):
+        lines.append("snake_emit_messages_total%s %d" % (_labels(event=event), count))
+    lines.append("# TYPE snake_emit_bytes_total counter")
+    for event, count in sorted(emit_stats.bytes.items()):
+        lines.append("snake_emit_bytes_total%s %d" % (_labels(event=event), count))
+    for name, value in gauges.items():
+        lines.append("# TYPE snake_%s gauge" % name)
+        lines.append("snake_%s %r" % (name, value))
+    for name, value in counters.items():
+        lines.append("# TYPE snake_%s_total counter" % name)
+        lines.append("snake_%s_total %r" % (name, value))
+    for name, value in tick_stats.items():
+        kind = "counter" if isinstance(value, int) else "gauge"
+        suffix = "_total" if kind == "counter" else "_seconds"
+        lines.append("# TYPE snake_tick_%s%s %s" % (name, suffix, kind))
+        lines.append("snake_tick_%s%s %r" % (name, suffix, value))
+    return "\n".join(lines) + "\n"
+
+
+def render_json(profiler, emit_stats, gauges, tick_stats, counters):
+    """/metrics?format=json için sözlük"""
+    return {
+        "phases": {
+            phase: dict(hist.window_stats(), total_count=hist.count, total_sum=hist.sum)
+            for phase, hist in profiler.phases.items()
+        },
+        "emit": {
+            event: {"messages": emit_stats.messages[event], "bytes": emit_stats.bytes[event]}
+            for event in emit_stats.messages
+        },
+        "gauges": gauges,
+        "counters": counters,
+        "tick": tick_stats,
+    }
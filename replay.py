@@ -0,0 +1,346 @@
+# --- REPLAY MODÜLÜ ---
+# Klasik mod maçlarının kaydı ve yeniden oynatılması. Oda deterministik
+# olduğu için (seed'li rng, tick cinsinden süreler) kayıt sadece seed'i,
+# haritayı ve her tick'te uygulanan girdileri tutar; birkaç saniyede bir
+# odanın anlık görüntüsü (anahtar kare) yazılır, böylece okuyucu herhangi bir
+# tick'e en yakın anahtar kareden birkaç tick simüle ederek atlayabilir.
+# REPLAY_DIR ayarlıysa GameHost her odayı kaydeder. Oynatma aynı 'state' ve
+# 'map' event'leriyle gider, web_client.html ?replay=<dosya>&tick=<n> ile izler.
+#
+# Dosya: MAGIC, sürüm, JSON başlık; ardından (tür, tick, uzunluk) başlıklı
+# kayıtlar. Oyuncu adları ve girdi argümanları bir kez STRING kaydıyla
+# tanımlanır, INPUT kayıtları bunlara indeksle başvurur (girdi başına 5 bayt).
+# Anahtar kareler pickle kullanır: sadece kendi sunucumuzun kayıtlarını açın.
+#
+#   python replay.py kayit.replay --verify --profile
+import argparse
+import json
+import os
+import pickle
+import re
+import struct
+import sys
+import time
+import zlib
+
+import metrics
+from common import TICK_RATE, create_state_message, seconds_to_ticks
+from engine import COMMANDS, Engine
+
+# Kayıt dizini; boşsa kayıt kapalı
+REPLAY_DIR = os.environ.get("REPLAY_DIR", "")
+# Anahtar kare aralığı (tick) - 5 saniye
+REPLAY_KEYFRAME_INTERVAL = seconds_to_ticks(float(os.environ.get("REPLAY_KEYFRAME_SECONDS", 5)))
+REPLAY_SUFFIX = ".replay"
+
+MAGIC = b"SNKR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBI")      # magic, sürüm, JSON başlık uzunluğu
+RECORD = struct.Struct("<BII")       # tür, tick, yük uzunluğu
+INPUT = struct.Struct("<BHH")        # komut, oyuncu string'i, argüman string'i
+NO_STRING = 0xFFFF
+
+# Kayıt türleri
+REC_STRING = 1    # yük: UTF-8 metin, indeksi tanım sırasıdır
+REC_INPUT = 2     # yük: INPUT dizisi; tick'in simülasyonundan önce uygulanır
+REC_MAP = 3       # yük: zlib(JSON 'map' mesajı)
+REC_KEYFRAME = 4  # yük: zlib(pickle Room); tick = anahtar kareden sonraki ilk simüle edilecek tick
+REC_END = 5       # yük yok; tick = kaydın son tick'i
+
+COMMAND_CODES = {command: code for code, command in enumerate(COMMANDS)}
+
+
+def safe_name(text):
+    """Dosya adında kullanılabilir oda kimliği"""
+    return re.sub(r"[^A-Za-z0-9_-]", "_", str(text))[:40]
+
+
+def snapshot_room(room):
+    # Hızlı sıkıştırma: anahtar kare tick içinde yazılır (~1 ms, 5 saniyede bir)
+    return zlib.compress(pickle.dumps(room, pickle.HIGHEST_PROTOCOL), 1)
+
+
+def restore_room(blob):
+    return pickle.loads(zlib.decompress(blob))
+
+
+class ReplayRecorder:
+    """Bir odanın girdilerini, haritasını ve anahtar karelerini dosyaya ekler"""
+    def __init__(self, path, room, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.strings = {}  # metin: indeks
+        self.pending = bytearray()  # bu tick'in INPUT kayıtları
+        self.pending_tick = room.tick_count
+        self.map_version = None
+        self.file = open(path, "wb")
+        header = json.dumps({
+            "room_id": room.room_id,
+            "seed": room.seed,
+            "width": room.width,
+            "height": room.height,
+            "tick_rate": TICK_RATE,
+            "keyframe_interval": self.keyframe_interval,
+            "start_tick": room.tick_count,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }).encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(header)) + header)
+        # Kayıt maçın ortasında başlasa bile ilk anahtar kareden oynatılabilir
+        self.write_map(room)
+        self.write(REC_KEYFRAME, room.tick_count, snapshot_room(room))
+
+    @classmethod
+    def for_room(cls, room, directory=None):
+        """REPLAY_DIR altında zaman damgalı dosyaya kaydeden kayıtçı"""
+        directory = directory or REPLAY_DIR
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, "%s-%s" % (time.strftime("%Y%m%d-%H%M%S"), safe_name(room.room_id)))
+        path = base + REPLAY_SUFFIX
+        counter = 1
+        while os.path.exists(path):
+            # Aynı saniyede yeniden açılan oda
+            counter += 1
+            path = "%s-%d%s" % (base, counter, REPLAY_SUFFIX)
+        return cls(path, room)
+
+    def write(self, kind, tick, payload=b""):
+        self.file.write(RECORD.pack(kind, tick, len(payload)))
+        self.file.write(payload)
+
+    def string_index(self, text):
+        if text is None:
+            return NO_STRING
+        text = str(text)
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+            self.write(REC_STRING, self.pending_tick, text.encode("utf-8"))
+        return index
+
+    def input(self, tick, client_id, command, arg=None):
+        """Room.record_input: tick'in simülasyonundan önce uygulanan girdi"""
+        if tick != self.pending_tick:
+            self.flush_inputs()
+            self.pending_tick = tick
+        self.pending += INPUT.pack(COMMAND_CODES[command], self.string_index(client_id), self.string_index(arg))
+
+    def flush_inputs(self):
+        if self.pending:
+            self.write(REC_INPUT, self.pending_tick, bytes(self.pending))
+            self.pending.clear()
+
+    def write_map(self, room):
+        self.map_version = room.map_version
+        self.write(REC_MAP, room.tick_count, zlib.compress(create_state_message(room.build_map_message()).encode("utf-8")))
+
+    def end_tick(self, room):
+        """Room.tick sonunda: girdileri yaz, harita değiştiyse ve anahtar kare zamanıysa kaydet"""
+        self.flush_inputs()
+        self.pending_tick = room.tick_count
+        if room.map_version != self.map_version:
+            self.write_map(room)
+        if room.tick_count % self.keyframe_interval == 0:
+            self.write(REC_KEYFRAME, room.tick_count, snapshot_room(room))
+            self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush_inputs()
+        self.write(REC_END, self.pending_tick)
+        self.file.close()
+
+
+class ReplayReader:
+    """Kayıt dosyasını belleğe okur: başlık, tick başına girdiler, haritalar, anahtar kareler"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, header_size = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Geçersiz replay dosyası: %s" % path)
+        offset = HEADER.size
+        self.header = json.loads(data[offset:offset + header_size].decode("utf-8"))
+        offset += header_size
+        self.size = len(data)
+        self.strings = []
+        self.inputs = {}     # tick: [(client_id, komut, argüman)]
+        self.maps = []       # [(tick, map mesajı)]
+        self.keyframes = {}  # tick: anahtar kare yükü
+        self.input_count = 0
+        self.last_tick = self.header["start_tick"]
+        self.complete = False
+        while offset + RECORD.size <= len(data):
+            kind, tick, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if offset + length > len(data):
+                break  # yazılırken kesilmiş son kayıt
+            payload = data[offset:offset + length]
+            offset += length
+            if kind == REC_STRING:
+                self.strings.append(payload.decode("utf-8"))
+            elif kind == REC_INPUT:
+                commands = self.inputs.setdefault(tick, [])
+                for code, cid, arg in INPUT.iter_unpack(payload):
+                    commands.append((self.string(cid), COMMANDS[code], self.string(arg)))
+                self.input_count += len(payload) // INPUT.size
+                tick += 1
+            elif kind == REC_MAP:
+                self.maps.append((tick, json.loads(zlib.decompress(payload).decode("utf-8"))))
+            elif kind == REC_KEYFRAME:
+                self.keyframes[tick] = payload
+            elif kind == REC_END:
+                self.complete = True
+            self.last_tick = max(self.last_tick, tick)
+        self.keyframe_ticks = sorted(self.keyframes)
+
+    def string(self, index):
+        return None if index == NO_STRING else self.strings[index]
+
+    @property
+    def first_tick(self):
+        return self.keyframe_ticks[0]
+
+    def keyframe_before(self, tick):
+        """tick'e eşit veya ondan önceki en yakın anahtar kare: (tick, Room)"""
+        best = self.keyframe_ticks[0]
+        for keyframe_tick in self.keyframe_ticks:
+            if keyframe_tick > tick:
+                break
+            best = keyframe_tick
+        return best, restore_room(self.keyframes[best])
+
+
+def state_digest(room):
+    """Karşılaştırma için odanın simülasyon durumu özeti"""
+    return create_state_message(room.build_state(room.tick_count, None)), room.rng.getstate()
+
+
+class ReplayPlayer:
+    """Kaydı bir Engine üzerinde yeniden simüle eder; izleyicilere normal 'state' akışı gider"""
+    def __init__(self, reader, room_id=None):
+        self.reader = reader
+        self.room_id = room_id or "replay:%s" % safe_name(reader.header["room_id"])
+        self.viewers = {}  # sid: (client_id, binary, send_rate)
+        self.paused = False
+        self.engine = Engine(self.room_id, reader.header["seed"], width=reader.header["width"], height=reader.header["height"])
+        self.loaded = False  # engine.room henüz bir anahtar kareden yüklenmedi
+        self.seek(reader.first_tick)
+
+    @property
+    def room(self):
+        return self.engine.room
+
+    @property
+    def tick(self):
+        return self.engine.room.tick_count
+
+    @property
+    def finished(self):
+        return self.tick >= self.reader.last_tick
+
+    def add_viewer(self, sid, client_id=None, binary=False, send_rate=None):
+        self.viewers[sid] = (client_id, binary, send_rate)
+        self.room.add_viewer(sid, client_id, binary, send_rate)
+
+    def remove_viewer(self, sid):
+        self.viewers.pop(sid, None)
+        self.room.remove_viewer(sid)
+
+    def seek(self, tick):
+        """tick'e atla: en yakın anahtar kareyi yükle, kalan tick'leri yayınsız simüle et"""
+        tick = max(self.reader.first_tick, min(tick, self.reader.last_tick))
+        keyframe_tick, room = self.reader.keyframe_before(tick)
+        # İleri atlarken anahtar kare mevcut konumdan daha yakın değilse kaldığı yerden devam eder
+        if not (self.loaded and keyframe_tick <= self.tick <= tick):
+            room.set_room_id(self.room_id)
+            self.engine.room = room
+            self.loaded = True
+        self.engine.previous = None
+        for sid in self.viewers:
+            self.room.remove_viewer(sid)
+        while self.tick < tick:
+            self.step()
+        # İzleyiciler bir sonraki tick'te anahtar kare alır
+        for sid, viewer in self.viewers.items():
+            self.room.add_viewer(sid, *viewer)
+        return self.tick
+
+    def step(self, profiler=None):
+        """Kayıtlı girdileri uygulayıp bir tick ilerlet (Engine.step sonucu)"""
+        return self.engine.step(self.reader.inputs.get(self.tick, ()), profiler)
+
+    def verify(self):
+        """Baştan sona simüle et; anahtar karelerle uyuşmayan ilk tick'i döndür (yoksa None)"""
+        self.seek(self.reader.first_tick)
+        for keyframe_tick in self.reader.keyframe_ticks[1:]:
+            while self.tick < keyframe_tick:
+                self.step()
+            _, recorded = self.reader.keyframe_before(keyframe_tick)
+            if state_digest(recorded) != state_digest(self.room):
+                return keyframe_tick
+        return None
+
+
+def list_replays(directory=None):
+    directory = directory or REPLAY_DIR
+    if not directory or not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.endswith(REPLAY_SUFFIX))
+
+
+def open_replay(name, directory=None):
+    """REPLAY_DIR içindeki kaydı aç; dizin dışına çıkan isimleri reddet"""
+    directory = directory or REPLAY_DIR
+    if not directory or not name or os.path.basename(name) != name or not name.endswith(REPLAY_SUFFIX):
+        return None
+    path = os.path.join(directory, name)
+    if not os.path.isfile(path):
+        return None
+    return ReplayReader(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake maç kaydı bilgisi, doğrulama ve profil")
+    parser.add_argument("path", help=".replay dosyası")
+    parser.add_argument("--seek", type=int, help="bu tick'e atla ve state'i yazdır")
+    parser.add_argument("--verify", action="store_true", help="yeniden simülasyonu anahtar karelerle karşılaştır")
+    parser.add_argument("--profile", action="store_true", help="maçı baştan oynatıp faz sürelerini ölç")
+    args = parser.parse_args(argv)
+
+    reader = ReplayReader(args.path)
+    ticks = reader.last_tick - reader.first_tick
+    print("oda %s, seed %s, %dx%d" % (reader.header["room_id"], reader.header["seed"], reader.header["width"], reader.header["height"]))
+    print("tick %d..%d (%d), %d girdi, %d harita, %d anahtar kare, %d bayt (%.1f bayt/tick)%s" % (
+        reader.first_tick, reader.last_tick, ticks, reader.input_count, len(reader.maps), len(reader.keyframes),
+        reader.size, reader.size / max(1, ticks), "" if reader.complete else ", kesik"))
+    player = ReplayPlayer(reader)
+    if args.verify:
+        mismatch = player.verify()
+        if mismatch is not None:
+            print("UYUŞMAZLIK: tick %d anahtar karesi yeniden simülasyonla aynı değil" % mismatch)
+            return 1
+        print("doğrulandı: tüm anahtar kareler yeniden simülasyonla aynı")
+    if args.profile:
+        profiler = metrics.TickProfiler()
+        player.seek(reader.first_tick)
+        start = time.perf_counter()
+        while not player.finished:
+            profiler.start_tick()
+            player.step(profiler)
+        elapsed = time.perf_counter() - start
+        print("%d tick %.2f s (%.0f tick/s)" % (ticks, elapsed, ticks / elapsed if elapsed else 0.0))
+        for phase, hist in profiler.phases.items():
+            if hist.count:
+                stats = hist.window_stats()
+                print("  %-14s ort %8.1f us  p99 %8.1f us" % (phase, hist.sum / hist.count * 1e6, stats["p99"] * 1e6))
+    if args.seek is not None:
+        player.seek(args.seek)
+        player.step()
+        print(create_state_message(player.room.last_state))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
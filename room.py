@@ -0,0 +1,1307 @@
+# --- ROOM MODÜLÜ ---
+# Klasik mod maçlarının oda (room) soyutlaması. Her oda kendi game_state'ini,
+# doluluk ızgarasını, etki zamanlayıcısını, süresini, kazananını, hazır
+# bayraklarını, sohbetini ve Socket.IO odalarını taşır. Oda ağ katmanını
+# bilmez: tick() ve olay metodları gönderilecek mesajları liste olarak
+# döndürür, server.py bunları socketio.emit ile iletir.
+import math
+import os
+import random
+import time
+
+from common import (
+    MAX_PLAYERS, BOARD_WIDTH, BOARD_HEIGHT, POWERUP_TYPES, INITIAL_FOOD_COUNT,
+    STATE_KEYFRAME_INTERVAL, TICK_RATE, create_state_message, get_snake_color_info, seconds_to_ticks,
+)
+import metrics
+import state_delta
+import wire_format
+from board_grid import BoardGrid, ChunkIndex
+from snake_body import SnakeBody
+from effects import EffectScheduler
+
+# --- Oyun sabitleri ---
+# Oda içindeki tüm süreler tick cinsindendir; zaman odanın tick sayacıdır
+GAME_DURATION = seconds_to_ticks(120)  # tick (2 dakika)
+# Klasik mod için altın elma çıkma olasılığı (varsayılan %0.5)
+GOLDEN_FOOD_CHANCE_CLASSIC = 0.003
+POWERUP_SPAWN_CHANCE = 0.05  # Geçici olarak artırıldı test için
+MAX_POWERUPS = 4
+MAX_SNAKE_LENGTH = 10
+MAX_BUFFER_SIZE = 3  # Her oyuncu için maksimum 3 komut sakla
+MAX_CHAT_MESSAGES = 50
+CHAT_THROTTLE_TIME = 1.0  # saniye
+
+# --- Power-up süreleri ---
+POWERUP_DURATIONS = {ptype: seconds_to_ticks(seconds) for ptype, seconds in {
+    "speed": 10, "shield": 10, "invisible": 10, "reverse": 5, "freeze": 5, "giant": 10, "trail": 10, "magnet": 10,
+}.items()}  # tick
+DEFAULT_POWERUP_DURATION = seconds_to_ticks(10)
+POWERUP_EFFECTS = list(POWERUP_DURATIONS) + ["frozen"]
+
+# --- Boost sistemi ---
+BOOST_DURATION = seconds_to_ticks(6.0)  # Boost toplam kullanılabilir süresi (tick)
+BOOST_COOLDOWN = seconds_to_ticks(30.0)  # Boost cooldown süresi (tick)
+
+# --- Gönderim hızı ---
+# Simülasyon her tick çalışır; state çerçeveleri istemci başına ayrı hızla ve sadece
+# değişiklik varsa gönderilir. Hızlar Hz cinsinden, join'de istemci kendi hızını isteyebilir.
+PLAYER_SEND_RATE = float(os.environ.get("PLAYER_SEND_RATE", 1 / TICK_RATE))
+SPECTATOR_SEND_RATE = float(os.environ.get("SPECTATOR_SEND_RATE", 10))
+
+
+def send_interval(rate):
+    """Hz cinsinden gönderim hızını tick aralığına çevir (en az 1)"""
+    return max(1, int(round(1 / (rate * TICK_RATE)))) if rate and rate > 0 else 1
+
+
+PLAYER_SEND_INTERVAL = send_interval(PLAYER_SEND_RATE)
+SPECTATOR_SEND_INTERVAL = send_interval(SPECTATOR_SEND_RATE)
+
+# --- İlgi alanı (area of interest) ---
+# AOI_RADIUS > 0 ise her oyuncu başının etrafındaki (2R+1)x(2R+1) pencerede tam ayrıntı alır;
+# pencere dışındaki yılanlar sadece AOI_DOT_CELLS hücrelik kaba ızgaradaki noktalarıyla (snake_dots,
+# tüm oyuncular için ortak) görünür, pencere dışındaki yem, power-up ve izler hiç gönderilmez.
+# İzleyiciler tüm alanı görür.
+AOI_RADIUS = int(os.environ.get("AOI_RADIUS", 0))  # hücre, 0 = kapalı
+AOI_DOT_CELLS = 5
+# Pencere içindeki oyuncularla sınırlanan oyuncu bazlı alanlar (skorlar tüm oyuncular için gider)
+AOI_PLAYER_FIELDS = ("snakes", "directions", "active", "active_powerups", "boost_system", "boost_info",
+                     "powerup_timers", "input_acks", "magnet_effects")
+
+# Statik harita/oyuncu listesi kanalı - engeller, portallar ve renkler her tick
+# gönderilmez, sadece değiştiğinde 'map' eventi ile yayınlanır
+MAP_FIELDS = ("obstacles", "portals", "colors", "color_info")
+# Anlık görüntüye girmeyen, simülasyonu etkilemeyen Room alanları
+TRANSIENT_FIELDS = ("chat", "viewers", "binary_viewers", "client_sync", "send_intervals", "blocked", "last_state",
+                    "recorder", "input_acks")
+
+OPPOSITE_DIRECTIONS = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+
+
+def new_game_state():
+    """Boş klasik mod state'i"""
+    return {
+        "snakes": {},
+        "directions": {},
+        "food": [(5, 5 + i*2) for i in range(INITIAL_FOOD_COUNT)],
+        "golden_food": None,
+        "active": {},
+        "colors": {},
+        "color_info": {},  # Her oyuncu için renk bilgisi
+        "obstacles": [],
+        "scores": {},
+        "portals": [],
+        "powerups": [],
+        "active_powerups": {},
+        "trails": {},  # İz bırakıcı power-up için: {client_id: [(x, y), ...]}
+        "boost_system": {},  # Boost sistemi: {client_id: {"active": bool, "start_tick": int, "cooldown_end": int}}
+    }
+
+
+def snapshot(value):
+    """State için deepcopy'nin hızlı karşılığı: dict ve list'ler kopyalanır, tuple ve skalerler paylaşılır"""
+    if isinstance(value, dict):
+        return {key: snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [snapshot(item) for item in value]
+    return value
+
+
+def outbound(event, data, to, skip_sid=None, recipients=1):
+    """server.py'nin socketio.emit ile göndereceği mesaj"""
+    return {"event": event, "data": data, "to": to, "skip_sid": skip_sid, "recipients": recipients}
+
+
+def session(sid, room_id, join=(), leave=()):
+    """İstemcinin oda üyeliği değişti: server.py Socket.IO odalarına katar/çıkarır"""
+    return {"event": None, "data": None, "to": sid, "room": room_id, "join": list(join), "leave": list(leave)}
+
+
+def sio_room_names(room_id):
+    """Odanın Socket.IO odaları: tüm üyeler, JSON state alanlar, ikili state alanlar"""
+    sio_room = "room:%s" % room_id
+    return sio_room, sio_room + ":json", sio_room + ":bin"
+
+
+class ChatLog:
+    """Spam korumalı, son MAX_CHAT_MESSAGES mesajı tutan sohbet geçmişi"""
+    def __init__(self):
+        self.messages = []
+        self.throttle = {}  # {sid: last_message_time}
+
+    def add(self, sid, player_name, player_color, message, message_type="global", target_player=None):
+        """Chat mesajı ekle ve spam koruması uygula"""
+        current_time = time.time()
+
+        # Spam koruması
+        if sid in self.throttle:
+            if current_time - self.throttle[sid] < CHAT_THROTTLE_TIME:
+                return False, "Çok hızlı mesaj gönderiyorsunuz!"
+
+        self.throttle[sid] = current_time
+
+        chat_data = {
+            "sender_id": sid,
+            "sender_name": player_name,
+            "sender_color": player_color,
+            "message": message,
+            "type": message_type,
+            "timestamp": current_time
+        }
+
+        if message_type == "whisper" and target_player:
+            chat_data["target_player"] = target_player
+
+        self.messages.append(chat_data)
+
+        # Maksimum mesaj sayısını kontrol et
+        if len(self.messages) > MAX_CHAT_MESSAGES:
+            self.messages.pop(0)
+
+        return True, chat_data
+
+    def clear(self):
+        """Chat mesajlarını temizle"""
+        self.messages.clear()
+
+
+class Room:
+    # Oda boyutuna bağlı sınırlar; arena.ArenaRoom büyük harita için ölçekler
+    max_players = MAX_PLAYERS
+    food_count = INITIAL_FOOD_COUNT
+    max_powerups = MAX_POWERUPS
+    max_same_powerups = 2  # aynı türden en fazla bu kadar power-up haritada durur
+    powerup_spawn_attempts = 1  # tick başına power-up çıkma denemesi
+    player_send_interval = PLAYER_SEND_INTERVAL
+
+    def __init__(self, room_id, width=BOARD_WIDTH, height=BOARD_HEIGHT, seed=None):
+        self.width = width
+        self.height = height
+        # Maçın tüm rastgeleliği bu seed'den gelir; seed + girdi kaydı maçı belirler
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.set_room_id(room_id)
+
+        self.game_state = new_game_state()
+        # Çarpışma testleri için artımlı güncellenen doluluk ızgarası - game_state ile senkron tutulur
+        self.board = BoardGrid(width, height)
+        # Süreli etkiler (power-up, frozen, boost); maske tick başına güncellenir
+        self.effects = EffectScheduler()
+        self.map_version = 0
+        self.map_dirty = False
+        # İkili formatta oyuncu isimleri yerine küçük slot numaraları gönderilir
+        self.player_slots = {}  # client_id: slot
+
+        self.game_timer = None
+        self.game_started = False
+        self.waiting_for_restart = False
+        self.winner_id = None
+        self.last_winner_id = None  # reset_game'den sonra da okunabilen son tur kazananı
+        self.tick_count = 0
+        # Hareket buffer sistemi - her oyuncu için son hareket komutlarını sakla
+        self.move_buffers = {}  # client_id: [move_commands]
+        # İstemci tahmini için: oyuncunun işlenen son 'move' sıra numarası (state'te input_acks)
+        self.input_acks = {}  # client_id: seq
+
+        self.chat = ChatLog()
+
+        # Yayın durumu
+        self.viewers = {}  # sid: client_id - bu odanın state'ini alanlar
+        self.binary_viewers = set()  # ikili çerçeve isteyen sid'ler
+        # sid: {"tick", "state": son gönderilen tick ve state (delta tabanı), "variant", "keyframe": son anahtar kare tick'i}
+        self.client_sync = {}
+        self.send_intervals = {}  # sid: istemcinin istediği gönderim aralığı (tick)
+        self.blocked = set()  # bağlantısı boşalmayan sid'ler: çerçeve üretilmez (backpressure.py)
+        self.aoi_radius = AOI_RADIUS
+        self.last_state = None  # son tick'te oluşturulan state
+        # Uygulanan girdileri kaydeden replay.ReplayRecorder (isteğe bağlı)
+        self.recorder = None
+
+    def set_room_id(self, room_id):
+        self.room_id = room_id
+        self.sio_room, self.sio_json_room, self.sio_binary_room = sio_room_names(room_id)
+
+    # --- Anlık görüntü (replay anahtar kareleri) ---
+    def __getstate__(self):
+        # Simülasyon durumu; izleyiciler, yayın geçmişi, sohbet ve kayıtçı hariç
+        state = self.__dict__.copy()
+        for key in TRANSIENT_FIELDS:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.chat = ChatLog()
+        self.viewers = {}
+        self.binary_viewers = set()
+        self.client_sync = {}
+        self.send_intervals = {}
+        self.blocked = set()
+        self.last_state = None
+        self.recorder = None
+        self.input_acks = {}
+
+    def record_input(self, client_id, command, arg=None):
+        """Oyuncu girdisini (engine.COMMANDS adıyla) kayıtçıya ilet"""
+        if self.recorder is not None:
+            self.recorder.input(self.tick_count, client_id, command, arg)
+
+    # --- Üyelik ---
+    def is_full(self):
+        return len(self.game_state["snakes"]) >= self.max_players
+
+    def is_empty(self):
+        return not self.game_state["snakes"] and not self.viewers
+
+    def has_player(self, client_id):
+        return client_id in self.game_state["snakes"]
+
+    def add_player(self, client_id):
+        """Oyuncuyu odaya al, ilk oyuncuda süreyi başlat"""
+        self.record_input(client_id, "join")
+        self.reset_snake(client_id)
+        # İlk oyuncu klasik moda girince süreyi başlat (sonraki oyuncularda sıfırlama yapma)
+        if self.game_timer is None:
+            self.reset_game()
+
+    def add_viewer(self, sid, client_id, binary=False, send_rate=None):
+        self.viewers[sid] = client_id
+        self.client_sync.pop(sid, None)  # Katılınca tam anahtar kare gönder
+        if send_rate:
+            self.send_intervals[sid] = send_interval(send_rate)
+        else:
+            self.send_intervals.pop(sid, None)
+        if binary:
+            self.binary_viewers.add(sid)
+        else:
+            self.binary_viewers.discard(sid)
+
+    def remove_viewer(self, sid):
+        self.viewers.pop(sid, None)
+        self.binary_viewers.discard(sid)
+        self.client_sync.pop(sid, None)
+        self.send_intervals.pop(sid, None)
+        self.blocked.discard(sid)
+        self.chat.throttle.pop(sid, None)
+
+    def set_blocked(self, sid, blocked):
+        """Bağlantı tıkalıyken sid'e çerçeve gönderme; açılınca son aldığı state'ten tek delta gider"""
+        if blocked and sid in self.viewers:
+            self.blocked.add(sid)
+        else:
+            self.blocked.discard(sid)
+
+    def request_keyframe(self, sid):
+        # Delta zinciri koptuysa bir sonraki tick'te tam anahtar kare gönder
+        self.client_sync.pop(sid, None)
+
+    def remove_player(self, client_id):
+        """Oyuncuyu ve tüm oyun içi izlerini kaldır"""
+        self.record_input(client_id, "leave")
+        game_state = self.game_state
+        game_state["snakes"].pop(client_id, None)
+        game_state["trails"].pop(client_id, None)
+        self.input_acks.pop(client_id, None)
+        self.board.remove_snake(client_id)
+        self.board.remove_trail(client_id)
+        game_state["directions"].pop(client_id, None)
+        game_state["active"].pop(client_id, None)
+        game_state["colors"].pop(client_id, None)
+        game_state["color_info"].pop(client_id, None)
+        game_state["scores"].pop(client_id, None)
+        game_state["active_powerups"].pop(client_id, None)
+        game_state["boost_system"].pop(client_id, None)
+        game_state.get("ready", {}).pop(client_id, None)
+        self.player_slots.pop(client_id, None)
+        self.effects.clear_player(client_id)
+        self.move_buffers.pop(client_id, None)
+        self.mark_map_changed()
+
+    # --- Harita kanalı ---
+    def assign_player_slot(self, client_id):
+        """Oyuncuya boştaki en küçük slot numarasını ver"""
+        if client_id not in self.player_slots:
+            used = set(self.player_slots.values())
+            self.player_slots[client_id] = next(slot for slot in range(256) if slot not in used)
+        return self.player_slots[client_id]
+
+    def mark_map_changed(self):
+        """Harita veya oyuncu listesi değişti, sonraki tick'te 'map' eventi gönder"""
+        self.map_version += 1
+        self.map_dirty = True
+
+    def build_map_message(self):
+        """Versiyonlu harita/oyuncu listesi mesajı"""
+        message = {"version": self.map_version, "slots": self.player_slots, "aoi_radius": self.aoi_radius,
+                   "width": self.width, "height": self.height}
+        for key in MAP_FIELDS:
+            message[key] = self.game_state[key]
+        return message
+
+    # --- Spawn ---
+    def random_powerup(self):
+        """Boş bir hücrede rastgele türde power-up oluştur"""
+        pos = self.board.random_free_cell(self.rng)
+        if pos is None:
+            return {"pos": (0, 0), "type": "speed"}
+        ptype = self.rng.choice(POWERUP_TYPES)
+        return {"pos": pos, "type": ptype["type"]}
+
+    def random_food(self):
+        """Yılan, yem, altın elma, engel, portal ve power-up olmayan rastgele hücre"""
+        pos = self.board.random_free_cell(self.rng)
+        if pos is None:
+            return (0, 0)
+        return pos
+
+    def get_all_empty_cells(self):
+        empty = self.board.free_cells()
+        self.rng.shuffle(empty)
+        return empty
+
+    def place_obstacles(self):
+        obstacles = []
+        empty = [(x, y) for x in range(self.width) for y in range(self.height)]
+        self.rng.shuffle(empty)
+        idx = 0
+        for _ in range(15):  # Çimen (slow) - sayıyı artırdık
+            pos = empty[idx]; idx += 1
+            obstacles.append({"pos": pos, "type": "slow"})
+        for _ in range(7):  # Enemy (enemy)
+            pos = empty[idx]; idx += 1
+            obstacles.append({"pos": pos, "type": "enemy"})
+        for _ in range(7):  # Gizli duvar
+            pos = empty[idx]; idx += 1
+            obstacles.append({"pos": pos, "type": "hidden_wall"})
+        return obstacles
+
+    def place_portals(self):
+        empty = self.get_all_empty_cells()
+        if len(empty) < 2:
+            return []
+        min_dist = 8  # Minimum Manhattan mesafesi
+        tries = 20
+        for _ in range(tries):
+            a = self.rng.choice(empty)
+            far_cells = [cell for cell in empty if abs(cell[0]-a[0]) + abs(cell[1]-a[1]) >= min_dist]
+            if far_cells:
+                b = self.rng.choice(far_cells)
+                return [(a, b)]
+        # Eğer yeterince uzak hücre bulunamazsa, en uzak olanı seç
+        a = self.rng.choice(empty)
+        b = max(empty, key=lambda cell: abs(cell[0]-a[0]) + abs(cell[1]-a[1]))
+        return [(a, b)]
+
+    def spawn_position(self):
+        """Yeni yılanın baş hücresi; gövde aşağı doğru uzanır"""
+        x = self.rng.randint(2, self.width-3)
+        y = self.rng.randint(6, self.height-1)  # Y koordinatı 6 ve üzeri, ilk 5 satırda doğmaz
+        return x, y
+
+    def reset_snake(self, client_id):
+        game_state = self.game_state
+        # Maksimum oyuncu kontrolü
+        if len(game_state["snakes"]) >= self.max_players and client_id not in game_state["snakes"]:
+            return  # Yeni oyuncu kabul etme
+        if client_id not in game_state["snakes"]:
+            self.assign_player_slot(client_id)
+            self.mark_map_changed()  # Yeni oyuncu oyuncu listesine eklendi
+        x, y = self.spawn_position()
+        cells = [(x, y)]
+        for i in range(1, 3): # START_LENGTH yerine 3 kullanıldı
+            cells.append((x, y+i))
+        # Gövde odanın ızgarasına bağlı, her hareket board'a otomatik yansır
+        game_state["snakes"][client_id] = SnakeBody(cells, client_id, self.board)
+        game_state["directions"][client_id] = "UP"
+        game_state["active"][client_id] = True
+
+        # Gelişmiş renk sistemi - her oyuncuya özel renk bilgisi
+        color_info = get_snake_color_info(client_id)
+        game_state["colors"][client_id] = color_info["color"]
+        game_state["color_info"][client_id] = color_info  # Renk bilgilerini de sakla
+
+        if client_id not in game_state["scores"]:
+            game_state["scores"][client_id] = 0
+        if client_id not in game_state["active_powerups"]:
+            game_state["active_powerups"][client_id] = []
+        # Boost sistemi başlatma
+        if client_id not in game_state["boost_system"]:
+            game_state["boost_system"][client_id] = {
+                "active": False,
+                "start_tick": 0,
+                "cooldown_end": 0,
+                "space_pressed": False,
+                "remaining_ticks": BOOST_DURATION
+            }
+        if len(game_state["snakes"]) == 1:
+            game_state["obstacles"] = self.place_obstacles()  # Sadece ilk oyuncu girince engelleri yerleştir
+            # Engeller tahtaya portallardan önce işlenir: portallar engelli hücrelere düşmez
+            self.board.set_obstacles(game_state["obstacles"])
+            game_state["portals"] = self.place_portals()      # Sadece ilk oyuncu girince portalları yerleştir
+            self.board.set_portals(game_state["portals"])
+
+    # --- Power-up'lar ---
+    def spawn_powerups(self):
+        """Sınır dolmadıysa şansa bağlı yeni power-up çıkar"""
+        powerups = self.game_state["powerups"]
+        for _ in range(self.powerup_spawn_attempts):
+            if len(powerups) < self.max_powerups and self.rng.random() < POWERUP_SPAWN_CHANCE:
+                pu = self.random_powerup()
+                same_type_count = sum(1 for p in powerups if p["type"] == pu["type"])
+                if same_type_count < self.max_same_powerups:
+                    powerups.append(pu)
+                    self.board.add_powerup(pu)
+
+    def has_powerup(self, cid, ptype):
+        return self.effects.has(cid, ptype)
+
+    def grant_powerup(self, cid, ptype, now):
+        """Power-up'ı oyuncuya ver ve bitişini zamanlayıcıya ekle"""
+        self.game_state["active_powerups"].setdefault(cid, []).append({"type": ptype, "tick": now})
+        self.effects.add(cid, ptype, now + POWERUP_DURATIONS.get(ptype, DEFAULT_POWERUP_DURATION))
+
+    def clear_player_powerups(self, cid):
+        """Oyuncunun power-up etkilerini kaldır (boost durumu korunur)"""
+        self.game_state["active_powerups"].pop(cid, None)
+        for effect in POWERUP_EFFECTS:
+            self.effects.cancel(cid, effect)
+
+    def get_powerup_timeleft(self, cid, ptype, now=None):
+        return self.effects.time_left(cid, ptype, self.tick_count if now is None else now)
+
+    def clear_expired_powerups(self, now):
+        """Süresi dolan etkileri işle (power-up'lar ve boost)"""
+        game_state = self.game_state
+        for cid, ptype in self.effects.advance(now):
+            if ptype == "boost":
+                self.expire_boost(cid, now)
+                continue
+            if ptype == "boost_cooldown":
+                self.refill_boost(cid)
+                continue
+            if cid in game_state["active_powerups"]:
+                game_state["active_powerups"][cid] = [p for p in game_state["active_powerups"][cid] if p["type"] != ptype]
+            # Eğer biten power-up trail ise izleri de sil
+            if ptype == "trail" and cid in game_state["trails"]:
+                del game_state["trails"][cid]
+                self.board.remove_trail(cid)
+
+    # --- Boost sistemi ---
+    def activate_boost(self, client_id):
+        """Boost'u aktifleştir"""
+        self.record_input(client_id, "boost")
+        now = self.tick_count
+        boost_system = self.game_state["boost_system"]
+        if client_id not in boost_system:
+            boost_system[client_id] = {
+                "active": False,
+                "start_tick": 0,
+                "cooldown_end": 0,
+                "space_pressed": False,
+                "remaining_ticks": BOOST_DURATION
+            }
+        boost_data = boost_system[client_id]
+        boost_data["space_pressed"] = True
+        # Eğer cooldown'daysa, işlem yapma
+        if now < boost_data["cooldown_end"]:
+            return False
+        # Eğer boost süresi bittiyse, işlem yapma
+        if boost_data.get("remaining_ticks", BOOST_DURATION) <= 0:
+            return False
+        # Eğer boost zaten aktifse, sadece space_pressed'i güncelle
+        if boost_data["active"]:
+            return True
+        # Boost'u aktifleştir - kalan süre bitince zamanlayıcı expire_boost'u tetikler
+        boost_data["active"] = True
+        boost_data["start_tick"] = now
+        boost_data["last_tick"] = now
+        self.effects.add(client_id, "boost", now + boost_data.get("remaining_ticks", BOOST_DURATION))
+        return True
+
+    def deactivate_boost(self, client_id):
+        """Boost'u deaktifleştir (space tuşu bırakıldığında)"""
+        self.record_input(client_id, "unboost")
+        if client_id not in self.game_state["boost_system"]:
+            return
+        boost_data = self.game_state["boost_system"][client_id]
+        boost_data["space_pressed"] = False
+        # Boost aktifse, kalan süreyi güncelle ve boost'u durdur
+        if boost_data["active"]:
+            now = self.tick_count
+            elapsed = now - boost_data.get("last_tick", now)
+            boost_data["remaining_ticks"] = max(0, boost_data.get("remaining_ticks", BOOST_DURATION) - elapsed)
+            boost_data["active"] = False
+            boost_data["last_tick"] = now
+            self.effects.cancel(client_id, "boost")
+            if boost_data["remaining_ticks"] <= 0:
+                self.start_boost_cooldown(client_id, now)
+
+    def start_boost_cooldown(self, client_id, now):
+        boost_data = self.game_state["boost_system"][client_id]
+        boost_data["cooldown_end"] = now + BOOST_COOLDOWN
+        self.effects.add(client_id, "boost_cooldown", boost_data["cooldown_end"])
+
+    def expire_boost(self, client_id, now):
+        """Boost süresi zamanlayıcıda doldu: durdur ve cooldown başlat"""
+        boost_data = self.game_state["boost_system"].get(client_id)
+        if not boost_data:
+            return
+        boost_data["remaining_ticks"] = 0
+        boost_data["active"] = False
+        boost_data["last_tick"] = now
+        self.start_boost_cooldown(client_id, now)
+
+    def refill_boost(self, client_id):
+        """Cooldown bitti, kalan süre 0 ise boost'u tekrar doldur"""
+        boost_data = self.game_state["boost_system"].get(client_id)
+        if boost_data and boost_data["remaining_ticks"] <= 0:
+            boost_data["remaining_ticks"] = BOOST_DURATION
+
+    def is_boost_active(self, client_id):
+        """Boost aktif mi kontrol et"""
+        return self.effects.has(client_id, "boost")
+
+    def get_boost_info(self, client_id, now=None):
+        """Boost bilgilerini döndür"""
+        if client_id not in self.game_state["boost_system"]:
+            return {"active": False, "progress": 0, "cooldown_progress": 0}
+        boost_data = self.game_state["boost_system"][client_id]
+        if now is None:
+            now = self.tick_count
+        remaining = boost_data.get("remaining_ticks", BOOST_DURATION)
+        if boost_data["active"]:
+            # Aktif boost'un kalan süresi her tick yazılmaz, burada hesaplanır
+            remaining -= now - boost_data.get("last_tick", now)
+        # Boost aktifse veya space basılıysa kalan süre oranını göster
+        if remaining > 0:
+            progress = remaining / BOOST_DURATION
+        else:
+            progress = 0
+        # Cooldown'daysa cooldown_progress'u hesapla
+        if now < boost_data["cooldown_end"]:
+            cooldown_elapsed = now - (boost_data["cooldown_end"] - BOOST_COOLDOWN)
+            cooldown_progress = min(1.0, cooldown_elapsed / BOOST_COOLDOWN)
+        else:
+            cooldown_progress = 1.0
+        # Çubuklar için %1 çözünürlük yeterli; her tick değişmediği için boş çerçeveler atlanabilir
+        return {
+            "active": boost_data["active"],
+            "progress": round(progress, 2),
+            "cooldown_progress": round(cooldown_progress, 2)
+        }
+
+    # --- Maç akışı ---
+    def eliminate_snake(self, client_id):
+        self.game_state["active"][client_id] = False
+        # Elenince power-up'ları temizle
+        self.clear_player_powerups(client_id)
+        # Skoru sıfırlama kaldırıldı
+        # Yılanı haritada tutmaya devam edelim ama hareket etmesin
+
+    def restart_player(self, client_id):
+        self.record_input(client_id, "restart")
+        self.reset_snake(client_id)
+        # Oyun durumunu hemen güncelle
+        if client_id in self.game_state["active"]:
+            self.game_state["active"][client_id] = True
+
+    def set_ready(self, client_id):
+        self.record_input(client_id, "ready")
+        self.game_state.setdefault("ready", {})[client_id] = True
+
+    def all_players_ready(self):
+        # Tüm aktif olmayan oyuncular hazır komutu gönderdiyse True döner
+        game_state = self.game_state
+        if not game_state["snakes"]:
+            return False
+        for cid in game_state["snakes"]:
+            if not game_state["active"].get(cid, True):
+                if not game_state.get("ready", {}).get(cid, False):
+                    return False
+        return True
+
+    def reset_game(self):
+        game_state = self.game_state
+        # Tüm oyuncuları yeniden başlat
+        for cid in list(game_state["snakes"].keys()):
+            self.reset_snake(cid)
+            game_state["scores"][cid] = 0  # Skorları burada sıfırla
+        # --- YEMLERİ RASTGELE YERLEŞTİR ---
+        game_state["food"] = []
+        self.board.set_food([])
+        for _ in range(self.food_count):
+            pos = self.random_food()
+            game_state["food"].append(pos)
+            self.board.add_food(pos)
+        game_state["ready"] = {}
+        self.mark_map_changed()
+        self.game_timer = self.tick_count
+        self.waiting_for_restart = False
+        self.winner_id = None
+        # Chat mesajlarını temizle
+        self.chat.clear()
+
+    def player_color(self, sid):
+        """Sohbet için oyuncu rengi - socket ID'den client ID'ye çevir"""
+        client_id = self.viewers.get(sid)
+        return self.game_state["colors"].get(client_id, "#ffffff") if client_id else "#ffffff"
+
+    def eliminate_all(self):
+        """Easter egg: tüm oyuncuları ele"""
+        self.record_input(None, "easteregg")
+        for cid in list(self.game_state["snakes"].keys()):
+            self.eliminate_snake(cid)
+        return [outbound('show_eagle_egg', None, self.sio_room, recipients=len(self.viewers))]
+
+    def enqueue_move(self, client_id, direction, seq=None):
+        self.record_input(client_id, "move", direction)
+        buffer = self.move_buffers.setdefault(client_id, [])
+        # Buffer'a komut ekle (seq: istemcinin sıra numarası, işlenince onaylanır)
+        buffer.append({"client_id": client_id, "direction": direction, "seq": seq})
+        # Buffer boyutunu sınırla
+        if len(buffer) > MAX_BUFFER_SIZE:
+            self.move_buffers[client_id] = buffer[-MAX_BUFFER_SIZE:]
+
+    def drain_inputs(self):
+        """Her oyuncu için buffer'dan bir komut al ve yönü güncelle"""
+        game_state = self.game_state
+        for client_id in list(self.move_buffers.keys()):
+            if not self.move_buffers.get(client_id):
+                continue
+
+            # Buffer'dan bir komut al
+            msg = self.move_buffers[client_id].pop(0)
+            direction = msg["direction"]
+            # Reddedilen komut da onaylanır: istemci tahmininden düşer, sunucu yönü geçerli olur
+            if msg.get("seq") is not None:
+                self.input_acks[client_id] = msg["seq"]
+
+            # Reverse power-up kontrolü
+            if self.has_powerup(client_id, "reverse"):
+                direction = OPPOSITE_DIRECTIONS.get(direction, direction)
+
+            # Ters yön kontrolü - yılanın mevcut yönü ile yeni yön ters mi?
+            current_dir = game_state["directions"].get(client_id)
+            if current_dir and OPPOSITE_DIRECTIONS.get(current_dir) == direction:
+                continue
+
+            # Kendine çarpma kontrolü - yeni yön yılanın kendi vücuduna çarpar mı?
+            snake = game_state["snakes"].get(client_id)
+            if snake and len(snake) > 1:
+                head_x, head_y = snake[0]
+                if direction == "UP":
+                    new_head = (head_x, head_y - 1)
+                elif direction == "DOWN":
+                    new_head = (head_x, head_y + 1)
+                elif direction == "LEFT":
+                    new_head = (head_x - 1, head_y)
+                elif direction == "RIGHT":
+                    new_head = (head_x + 1, head_y)
+
+                # Yeni baş pozisyonu yılanın mevcut vücuduyla çakışıyor mu?
+                if self.board.has_own_segment(client_id, new_head):
+                    continue  # Bu hareketi atla, yılan kendine çarpar
+
+            # Yönü güncelle
+            if client_id in game_state["snakes"]:
+                game_state["directions"][client_id] = direction
+            else:
+                self.reset_snake(client_id)
+
+    # --- Zırh etkisi: move_snake içinde çarpışma kontrolünde uygula ---
+    def move_snake(self, client_id):
+        game_state = self.game_state
+        board = self.board
+        shielded = self.has_powerup(client_id, "shield")
+        if not game_state["active"].get(client_id, True):
+            return
+        direction = game_state["directions"].get(client_id)
+        if not direction:
+            return  # Direction gelmeden yılanı hareket ettirme
+        snake = game_state["snakes"].get(client_id)
+        if not snake:
+            self.reset_snake(client_id)
+            snake = game_state["snakes"][client_id]
+        head_x, head_y = snake[0]
+        if direction == "UP":
+            head_y -= 1
+        elif direction == "DOWN":
+            head_y += 1
+        elif direction == "LEFT":
+            head_x -= 1
+        elif direction == "RIGHT":
+            head_x += 1
+        new_head = (head_x, head_y)
+
+        # --- Kendine çarpma kontrolü - YENİ BAŞ POZİSYONU HESAPLANDIKTAN SONRA, VÜCUDA EKLENMEDEN ÖNCE ---
+        # Yeni baş pozisyonu yılanın mevcut vücuduyla çakışıyor mu kontrol et (baş yeni hücreye eşit olamaz)
+        if len(snake) > 1 and board.has_own_segment(client_id, new_head):
+            if shielded or self.is_boost_active(client_id):
+                # Shield veya boost aktifken kendine çarpmadan geç, shield'i kaldırma
+                pass
+            else:
+                self.eliminate_snake(client_id)
+                return
+
+        # --- Altın elma kontrolü ---
+        if game_state.get("golden_food") and new_head == tuple(game_state["golden_food"]):
+            snake.push_head(new_head)
+            game_state["golden_food"] = None
+            board.set_golden(None)
+            game_state["scores"][client_id] = game_state["scores"].get(client_id, 0) + 5
+            return
+        # --- POWER-UP KONTROLÜ ---
+        # Magnet etkisi artık burada uygulanmıyor, sadece power-up'ı sil
+        pu = board.powerup_at(new_head)
+        if pu is not None:
+            now = self.tick_count
+            self.grant_powerup(client_id, pu["type"], now)
+            # Freeze ve giant etkileri burada kalacak
+            if pu["type"] == "freeze":
+                for other_id in game_state["snakes"]:
+                    if other_id != client_id:
+                        self.grant_powerup(other_id, "frozen", now)
+            if pu["type"] == "giant":
+                game_state["snakes"][client_id].grow(3) # START_LENGTH yerine 3 kullanıldı
+            game_state["powerups"].remove(pu)
+            board.remove_powerup(pu)
+        # --- PORTAL KONTROLÜ ---
+        portal_exit = board.portal_exit(new_head)
+        if portal_exit is not None:
+            new_head = portal_exit
+        # Engel kontrolü
+        shielded = self.has_powerup(client_id, "shield")
+        if not shielded and not self.is_boost_active(client_id):
+            obstacle_type = board.obstacle_at(new_head)
+            if obstacle_type == "slow":
+                # Çalı engelleri sadece yavaşlatma yapar, elenme yapmaz
+                pass
+            elif obstacle_type == "enemy":
+                # Enemy engeli puan eksiltir
+                current_score = game_state["scores"].get(client_id, 0)
+                if current_score > 0:
+                    game_state["scores"][client_id] = current_score - 1
+                if len(snake) > 1:
+                    snake.pop_tail()
+                else:
+                    self.eliminate_snake(client_id)
+                    return
+            elif obstacle_type == "wall":
+                self.eliminate_snake(client_id)
+                return
+            elif obstacle_type == "hidden_wall":
+                # Gizli duvarlar elenme yapar ve puan eksiltir
+                current_score = game_state["scores"].get(client_id, 0)
+                if current_score >= 2:
+                    game_state["scores"][client_id] = current_score - 2
+                elif current_score == 1:
+                    game_state["scores"][client_id] = 0
+                # Puan 0 ise değişiklik yapılmaz
+                self.eliminate_snake(client_id)
+                return
+        # Çarpışma kontrolü (zırh etkisi ve duvardan geçiş)
+        shielded = self.has_powerup(client_id, "shield")
+        out_of_bounds = not (0 <= new_head[0] < self.width and 0 <= new_head[1] < self.height)
+        if out_of_bounds:
+            if shielded or self.is_boost_active(client_id):
+                # Shield veya boost aktifken duvardan geç, shield'i kaldırma
+                nx, ny = new_head
+                if nx < 0:
+                    nx = self.width - 1
+                elif nx >= self.width:
+                    nx = 0
+                if ny < 0:
+                    ny = self.height - 1
+                elif ny >= self.height:
+                    ny = 0
+                new_head = (nx, ny)
+            else:
+                self.eliminate_snake(client_id)
+                return
+        # Shield aktifken diğer yılandan geç, shield'i kaldırma
+        if not shielded and board.has_other_snake(client_id, new_head):
+            self.eliminate_snake(client_id)
+            return
+        # --- Hareketli yem kontrolü ---
+        # Büyüme kontrolü
+        snake.push_head(new_head)
+        if board.has_food(new_head):
+            i = game_state["food"].index(new_head)
+            board.remove_food(new_head)
+            game_state["food"][i] = self.random_food()
+            board.add_food(game_state["food"][i])
+            game_state["scores"][client_id] = game_state["scores"].get(client_id, 0) + 1
+        else:
+            snake.pop_tail()
+
+        # Uzunluk sınırı uygula
+        snake.truncate(MAX_SNAKE_LENGTH)
+        # --- TRAIL POWER-UP GÜNCELLEME ---
+        # Eğer oyuncuda trail power-up varsa, iz güncelle
+        if self.has_powerup(client_id, "trail"):
+            trail = game_state["trails"].setdefault(client_id, [])
+            # Yılanın son bloğu iz olarak eklenir
+            if len(snake) > 0:
+                trail.append(snake[-1])
+            # İz uzunluğu 6'yı geçmesin
+            if len(trail) > 6:
+                trail = trail[-6:]
+            game_state["trails"][client_id] = trail
+            board.set_trail(client_id, trail)
+        else:
+            # Power-up yoksa izleri temizle
+            if client_id in game_state["trails"]:
+                del game_state["trails"][client_id]
+                board.remove_trail(client_id)
+        # --- İZ ÇARPIŞMA KONTROLÜ ---
+        # Kendi izine veya başkasının izine çarparsa elenir
+        head = snake[0]
+        if not self.is_boost_active(client_id):
+            if board.trail_at(head):
+                self.eliminate_snake(client_id)
+                return
+
+    def apply_magnets(self):
+        """Magnet power-up aktifse, yılanın başının 5 kare yakınındaki yemleri çekip yesin"""
+        game_state = self.game_state
+        board = self.board
+        magnet_effects = {}  # Magnet efektleri için
+
+        # Mevcut magnet efektlerini güncelle
+        if "magnet_effects" in game_state:
+            for cid, effect in game_state["magnet_effects"].items():
+                if self.has_powerup(cid, "magnet") and len(game_state["snakes"].get(cid, [])) > 0:
+                    # Progress değerlerini artır
+                    updated_foods = []
+                    for food_effect in effect.get("attracted_foods", []):
+                        new_progress = food_effect.get("progress", 0) + 0.1  # Her frame'de %10 artır
+                        if new_progress < 1.0:
+                            updated_foods.append({
+                                "start_pos": food_effect["start_pos"],
+                                "end_pos": food_effect["end_pos"],
+                                "progress": new_progress
+                            })
+
+                    if updated_foods:
+                        magnet_effects[cid] = {
+                            "head_pos": game_state["snakes"][cid][0],
+                            "attracted_foods": updated_foods
+                        }
+
+        # Yeni magnet efektleri ekle
+        for cid, snake in game_state["snakes"].items():
+            if self.has_powerup(cid, "magnet") and len(snake) > 0:
+                head = snake[0]
+                # Yakında yem yoksa yem listesi taranmaz (arenada yüzlerce yem olur); efekt yukarıda güncellendi
+                if not board.food_within(head, 5):
+                    continue
+                new_foods = []
+                foods_eaten = 0  # Yenen yem sayısını takip et
+
+                # Eğer bu oyuncu için zaten magnet efekti varsa, yeni yemler ekle
+                if cid in magnet_effects:
+                    attracted_foods = magnet_effects[cid]["attracted_foods"]
+                else:
+                    attracted_foods = []
+
+                for fx, fy in game_state["food"]:
+                    dist = abs(fx - head[0]) + abs(fy - head[1])
+                    if dist <= 5:  # 5 kare mesafede
+                        # Bu yem zaten çekiliyor mu kontrol et
+                        already_attracted = False
+                        for existing_food in attracted_foods:
+                            if existing_food["start_pos"] == [fx, fy]:
+                                already_attracted = True
+                                break
+
+                        if not already_attracted:
+                            # Yeni çekilen yem için efekt ekle
+                            attracted_foods.append({
+                                "start_pos": [fx, fy],
+                                "end_pos": head,
+                                "progress": 0.0
+                            })
+
+                        # Yemi yedik, yeni yem oluştur
+                        board.remove_food((fx, fy))
+                        new_food = self.random_food()
+                        if new_food:
+                            new_foods.append(new_food)
+                            board.add_food(new_food)
+                        # Yılanın boyunu artır (yemi yediği için)
+                        if len(snake) > 0:
+                            snake.grow(1)  # Kuyruğu uzat
+                            foods_eaten += 1  # Yenen yem sayısını artır
+                    else:
+                        new_foods.append((fx, fy))
+
+                # Magnet efekti verilerini kaydet
+                if attracted_foods:
+                    magnet_effects[cid] = {
+                        "head_pos": head,
+                        "attracted_foods": attracted_foods
+                    }
+
+                # Yenen yem sayısı kadar puan ekle
+                if foods_eaten > 0:
+                    game_state["scores"][cid] = game_state["scores"].get(cid, 0) + foods_eaten
+                game_state["food"] = new_foods
+        # Altın elma için magnet etkisi yok!
+        return magnet_effects
+
+    def tick(self, profiler=None):
+        """Odanın bir simülasyon adımı; gönderilecek mesajları döndürür"""
+        now = self.tick_count
+        mark = profiler.mark if profiler is not None else metrics.skip_mark
+        game_state = self.game_state
+        self.clear_expired_powerups(now)  # Power-up ve boost bitişleri zamanlayıcıdan gelir
+        mark("expiry")
+        if not self.game_started and self.game_timer is None and len(game_state["snakes"]) > 0:
+            self.reset_game()
+            self.game_started = True
+        if self.game_timer is None:
+            self.game_started = False
+        if not self.waiting_for_restart and self.game_timer is not None and now - self.game_timer >= GAME_DURATION:
+            # Süre bitti, kazananı belirle
+            max_score = -1
+            self.winner_id = None
+            for cid, score in game_state["scores"].items():
+                if score > max_score:
+                    max_score = score
+                    self.winner_id = cid
+            self.last_winner_id = self.winner_id
+            self.waiting_for_restart = True
+            # Tüm oyuncuları pasif yap
+            for cid in game_state["snakes"]:
+                game_state["active"][cid] = False
+        # Oyuncular hazırsa oyunu tekrar başlat
+        if self.waiting_for_restart and self.all_players_ready():
+            self.reset_game()
+        # Normal oyun akışı
+        if not self.waiting_for_restart:
+            self.drain_inputs()
+            mark("input")
+            self.spawn_powerups()
+            if game_state["golden_food"] is None and self.rng.random() < GOLDEN_FOOD_CHANCE_CLASSIC:
+                game_state["golden_food"] = self.random_food()
+                self.board.set_golden(game_state["golden_food"])
+            mark("spawn")
+            for client_id in list(game_state["snakes"].keys()):
+                if self.has_powerup(client_id, "frozen"):
+                    continue
+                # Boost aktifse veya speed power-up varsa her tick'te hareket et
+                if self.is_boost_active(client_id) or self.has_powerup(client_id, "speed"):
+                    self.move_snake(client_id)
+                else:
+                    if self.tick_count % 2 == 0:
+                        self.move_snake(client_id)
+            mark("classic_move")
+
+        magnet_effects = self.apply_magnets()
+        mark("magnet")
+
+        # State tick başına bir kez oluşturulur ve varyant başına bir kez kodlanır
+        state = self.build_state(now, magnet_effects)
+        self.last_state = state
+        mark("state_build")
+        messages = []
+        # Harita değiştiyse odadaki herkese bir kez yayınla
+        if self.map_dirty:
+            self.map_dirty = False
+            messages.append(outbound('map', create_state_message(self.build_map_message()),
+                                     self.sio_room, recipients=len(self.viewers)))
+        # İzleyici yoksa kodlama yapılmaz; ilk izleyici zaten anahtar kare alır
+        if self.viewers:
+            messages.extend(self.broadcast_state(self.tick_count, state))
+        mark("encode")  # make_delta + istemci başına JSON/ikili kodlama
+        self.tick_count += 1
+        if self.recorder is not None:
+            self.recorder.end_tick(self)
+        return messages
+
+    # --- State yayını ---
+    def build_state(self, now, magnet_effects):
+        """Tick başına bir kez paylaşılan state'i oluştur"""
+        game_state = self.game_state
+        # Statik harita alanları 'map' eventi ile gider
+        state = snapshot({k: v for k, v in game_state.items() if k not in MAP_FIELDS and k != "snakes"})
+        state["snakes"] = {cid: snake.to_list() for cid, snake in game_state["snakes"].items()}
+        state["map_version"] = self.map_version
+        state["input_acks"] = dict(self.input_acks)
+        # Geri sayım süresi her zaman set edilmeli
+        if self.game_timer is not None and not self.waiting_for_restart:
+            state["time_left"] = max(0, int((GAME_DURATION - (now - self.game_timer)) * TICK_RATE))
+        else:
+            state["time_left"] = 0
+        state["winner_id"] = self.winner_id
+        state["waiting_for_restart"] = self.waiting_for_restart
+        state["powerup_timers"] = {}
+        state["boost_info"] = {}
+        for cid in state["snakes"].keys():
+            timers = {}
+            for ptype in ["speed","shield","invisible","reverse"]:
+                tleft = self.get_powerup_timeleft(cid, ptype, now)
+                if tleft > 0:
+                    # İstemciye tam saniye: saniyede bir değişir, boş çerçeveler atlanabilir
+                    timers[ptype] = math.ceil(tleft * TICK_RATE)
+            if timers:
+                state["powerup_timers"][cid] = timers
+            # Boost bilgilerini ekle
+            state["boost_info"][cid] = self.get_boost_info(cid, now)
+        # Magnet efektlerini ekle
+        if magnet_effects:
+            state["magnet_effects"] = snapshot(magnet_effects)
+        if self.aoi_radius > 0:
+            state["snake_dots"] = self.build_snake_dots(state["snakes"])
+        # Değişmeyen alanlar önceki tick'in nesneleriyle paylaşılır: delta üretimi bunları kimlikten atlar
+        previous = self.last_state
+        if previous is not None:
+            for key, value in state.items():
+                old = previous.get(key)
+                if old is not None and old == value:
+                    state[key] = old
+        return state
+
+    def build_snake_dots(self, snakes):
+        """İlgi alanı dışı için kaba yılan konumları (AOI_DOT_CELLS ızgarası); görünmez yılanlar hariç"""
+        dots = {}
+        for cid, cells in snakes.items():
+            if cells and not self.has_powerup(cid, "invisible"):
+                x, y = cells[0]
+                dots[cid] = (x - x % AOI_DOT_CELLS + AOI_DOT_CELLS // 2, y - y % AOI_DOT_CELLS + AOI_DOT_CELLS // 2)
+        return dots
+
+    def build_visibility_variants(self, state):
+        """Görünmez yılanları gizleyen ortak state ve görünmez oyuncuların kendi varyantları"""
+        invisible = [cid for cid in state["snakes"] if self.has_powerup(cid, "invisible")]
+        if not invisible:
+            return {None: state}
+        common = dict(state)
+        common["snakes"] = dict(state["snakes"])
+        for cid in invisible:
+            common["snakes"][cid] = []
+        variants = {None: common}
+        # Görünmez oyuncu kendi yılanını görmeye devam eder
+        for cid in invisible:
+            own = dict(common)
+            own["snakes"] = dict(common["snakes"])
+            own["snakes"][cid] = state["snakes"][cid]
+            variants[cid] = own
+        return variants
+
+    def send_interval_for(self, sid, client_id):
+        """İstemcinin gönderim aralığı (tick): isteği yoksa oyuncu veya izleyici varsayılanı"""
+        interval = self.send_intervals.get(sid)
+        if interval is None:
+            interval = self.player_send_interval if client_id in self.game_state["snakes"] else SPECTATOR_SEND_INTERVAL
+        return interval
+
+    def build_aoi_index(self, state):
+        """Tick başına bir kez: yılanlar, yemler ve power-up'lar için uzamsal indeks"""
+        size = max(AOI_DOT_CELLS, self.aoi_radius)
+        snakes = ChunkIndex(size)
+        for cid, cells in state["snakes"].items():
+            for key in {snakes.key(cell) for cell in cells}:
+                snakes.buckets.setdefault(key, []).append(cid)
+        food = ChunkIndex(size)
+        for cell in state["food"]:
+            food.add(cell, cell)
+        powerups = ChunkIndex(size)
+        for pu in state["powerups"]:
+            powerups.add(pu["pos"], pu)
+        return snakes, food, powerups
+
+    def keyframe_phase(self, client_id):
+        """Oyuncuya özel varyantın anahtar kare kayması (tick): slot'lar aralığa eşit dağılır"""
+        slot = self.player_slots.get(client_id, 0)
+        return slot * STATE_KEYFRAME_INTERVAL // self.max_players % STATE_KEYFRAME_INTERVAL
+
+    def area_of_interest(self, state, client_id, index):
+        """Oyuncunun başı etrafındaki pencereye göre süzülmüş state (görünürlük varyantından)"""
+        own = self.game_state["snakes"].get(client_id)
+        if not own:
+            return state
+        head_x, head_y = own[0]
+        radius = self.aoi_radius
+        x0, y0, x1, y1 = head_x - radius, head_y - radius, head_x + radius, head_y + radius
+
+        def inside(cell):
+            return x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1
+
+        snake_index, food_index, powerup_index = index
+        snakes = state["snakes"]
+        visible = {client_id}
+        for cid in snake_index.query(x0, y0, x1, y1):
+            if cid in visible or cid not in snakes:
+                continue
+            # Aday yılanların çoğunda baş içeride: gövde sadece gerekirse taranır
+            if inside(snakes[cid][0]) or any(inside(cell) for cell in snakes[cid]):
+                visible.add(cid)
+        view = dict(state)
+        # Pencere dışındaki oyuncuların alanları hiç gönderilmez; konumları ortak snake_dots'ta
+        for key in AOI_PLAYER_FIELDS:
+            values = state.get(key)
+            if values is not None:
+                view[key] = {cid: values[cid] for cid in visible if cid in values}
+        view["food"] = [cell for cell in food_index.query(x0, y0, x1, y1)
+                        if x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1]
+        view["powerups"] = [pu for pu in powerup_index.query(x0, y0, x1, y1) if inside(pu["pos"])]
+        if state.get("golden_food") is not None and not inside(state["golden_food"]):
+            view["golden_food"] = None
+        view["trails"] = {}
+        for cid, trail in state["trails"].items():
+            cells = [cell for cell in trail if inside(cell)]
+            if cells:
+                view["trails"][cid] = cells
+        return view
+
+    def build_viewer_variants(self, state, client_ids=None):
+        """Görünürlük varyantları; ilgi alanı açıksa oyuncular (client_ids: sadece bunlar) kendi penceresini alır"""
+        variants = self.build_visibility_variants(state)
+        if self.aoi_radius > 0:
+            index = None
+            for client_id in set(self.viewers.values()) if client_ids is None else client_ids:
+                if client_id in self.game_state["snakes"]:
+                    if index is None:
+                        index = self.build_aoi_index(variants[None])
+                    variants[client_id] = self.area_of_interest(variants.get(client_id, variants[None]), client_id, index)
+        return variants
+
+    def broadcast_state(self, tick, state):
+        """Sırası gelen izleyicilere değişen state'i gönder; çerçeveler (varyant, taban) başına bir kez kodlanır"""
+        # Sırası gelen izleyiciler; ilgi alanı pencereleri sadece onlar için kurulur
+        due = []
+        for sid, client_id in list(self.viewers.items()):
+            if sid in self.blocked:
+                continue  # bağlantı boşalmıyor: değişiklikler açılınca tek deltada birleşir
+            sync = self.client_sync.get(sid)
+            if sync is not None:
+                interval = self.send_interval_for(sid, client_id)
+                if tick - sync["tick"] < interval:
+                    continue  # gönderim sırası gelmedi
+                # Kendi penceresini alan oyuncular slot'a göre farklı tick'lere dağılır: tick başına iş sınırlı
+                if (interval > 1 and self.aoi_radius > 0 and client_id in self.game_state["snakes"]
+                        and (tick + self.player_slots.get(client_id, 0)) % interval):
+                    continue
+            due.append((sid, client_id, sync))
+        if not due:
+            return []
+        variants = self.build_viewer_variants(state, {client_id for _, client_id, _ in due})
+        # İstemci interpolasyonu için tick'in gönderildiği sunucu zamanı (ms)
+        ts = int(time.time() * 1000)
+        frames = {}
+        encoded = {}
+
+        # base: istemcinin son aldığı (tick, state); None = anahtar kare
+        def frame_for(variant, base):
+            key = (variant, base[0] if base else None)
+            if key not in frames:
+                if base is None:
+                    frames[key] = state_delta.make_keyframe(tick, variants[variant], ts)
+                else:
+                    frames[key] = state_delta.make_delta(tick, base[0], base[1], variants[variant], ts)
+            return frames[key]
+
+        def encode(variant, base, binary):
+            key = (variant, base[0] if base else None, binary)
+            if key not in encoded:
+                frame = frame_for(variant, base)
+                if binary:
+                    encoded[key] = wire_format.encode_state_frame(frame, self.player_slots, self.width, self.height)
+                else:
+                    encoded[key] = create_state_message(frame)
+            return encoded[key]
+
+        groups = {}  # (varyant, taban tick'i, ikili): (taban, [sid]) - aynı çerçeveyi alanlar
+        for sid, client_id, sync in due:
+            binary = sid in self.binary_viewers
+            variant = client_id if client_id in variants else None
+            # Ortak varyantın anahtar kareleri tüm istemciler için aynı sınırda, ortak kodlamayla gider;
+            # oyuncuya özel varyantlarınki slot'a göre kaydırılır, aynı tick'te yığılmaz
+            phase = 0 if variant is None else self.keyframe_phase(client_id)
+            keyframe = (sync is None or sync["variant"] != variant
+                        or (sync["keyframe"] + phase) // STATE_KEYFRAME_INTERVAL != (tick + phase) // STATE_KEYFRAME_INTERVAL)
+            base = None if keyframe else (sync["tick"], sync["state"])
+            if base is not None and state_delta.is_empty(frame_for(variant, base)):
+                continue  # değişiklik yok: çerçeve atlanır, taban aynı kalır
+            self.client_sync[sid] = {"tick": tick, "state": variants[variant], "variant": variant,
+                                     "keyframe": tick if keyframe else sync["keyframe"]}
+            group = groups.setdefault((variant, base[0] if base else None, binary), (base, []))
+            group[1].append(sid)
+
+        messages = []
+        # Her kodlamada en kalabalık ortak delta grubu tek bir oda yayını ile gider
+        shared = {}
+        for (variant, base_tick, binary), (base, sids) in groups.items():
+            if variant is None and base is not None and len(sids) > len(shared.get(binary, ((), ()))[1]):
+                shared[binary] = ((variant, base_tick, binary), sids)
+        for key, (base, sids) in groups.items():
+            binary = key[2]
+            if binary in shared and shared[binary][0] == key:
+                continue
+            for sid in sids:
+                messages.append(outbound('state', encode(key[0], base, binary), sid))
+        for binary, (key, sids) in shared.items():
+            room = self.sio_binary_room if binary else self.sio_json_room
+            members = set(sids)
+            skip = [sid for sid in self.viewers if (sid in self.binary_viewers) == binary and sid not in members]
+            messages.append(outbound('state', encode(key[0], groups[key][0], binary), room,
+                                     skip_sid=skip, recipients=len(sids)))
+        return messages
+
+
+# --- Oda kayıt defteri ---
+rooms = {}  # room_id: Room
+_room_counter = 0
+_room_id_step = 1
+
+
+def configure_room_ids(worker_index, worker_count):
+    """Çok süreçli modda bu sürecin otomatik oda numaraları worker_count'a bölümünden worker_index kalanını verir"""
+    global _room_counter, _room_id_step
+    _room_id_step = worker_count
+    _room_counter = (worker_index or worker_count) - worker_count
+
+
+def create_room(room_id=None, room_class=Room):
+    """Yeni oda oluştur (room_id verilmezse otomatik numara; room_class: ör. arena.ArenaRoom)"""
+    global _room_counter
+    if room_id is None:
+        while True:
+            _room_counter += _room_id_step
+            room_id = str(_room_counter)
+            if room_id not in rooms:
+                break
+    room = room_class(room_id)
+    rooms[room_id] = room
+    return room
+
+
+def find_room_for(requested_id=None, room_class=Room):
+    """İstenen odayı (yoksa oluşturarak) veya room_class türünde boş yeri olan ilk odayı döndür"""
+    if requested_id:
+        room = rooms.get(requested_id) or create_room(requested_id, room_class)
+        return None if room.is_full() else room
+    for room in rooms.values():
+        if type(room) is room_class and not room.is_full():
+            return room
+    return create_room(room_class=room_class)
+
+
+def find_player_room(client_id):
+    for room in rooms.values():
+        if room.has_player(client_id):
+            return room
+    return None
+
+
+def remove_room_if_empty(room):
+    """Son oyuncu ve izleyici ayrılınca odayı kapat"""
+    if room.is_empty() and rooms.get(room.room_id) is room:
+        del rooms[room.room_id]
+        if room.recorder is not None:
+            room.recorder.close()
+            room.recorder = None
+        return True
+    return False
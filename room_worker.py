@@ -0,0 +1,137 @@
+# --- ROOM WORKER MODÜLÜ ---
+# Çok süreçli mod: ön süreç (server.py) Socket.IO bağlantılarını tutar,
+# odalar ve Time Attack oyunları ise yerel worker süreçlerinde simüle edilir.
+# Her worker kendi GameHost'unu ve TickClock'unu çalıştırır; ön süreçten
+# pipe üzerinden (op, sid, data) komutları alır ve her tick'te önceden
+# kodlanmış mesaj listesini geri gönderir, ön süreç sadece yayını yapar.
+# Oda numaraları worker sayısına göre bölüştürülür (room.configure_room_ids),
+# böylece bir oda numarası her zaman aynı worker'a yönlendirilir.
+# Bir komut veya tick hata verirse worker sadece onu atlar; worker süreci yine de
+# ölürse ön süreç onu yeniden başlatır ve bağlı istemcilere yeniden katılmalarını söyler.
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import zlib
+
+import room as rooms_module
+from game_host import GameHost
+from room import outbound, session, sio_room_names
+from tick_clock import TickClock
+
+# Worker sayısı; 0 ise her şey ön süreçte çalışır
+ROOM_WORKERS = int(os.environ.get("ROOM_WORKERS", "0"))
+
+
+def worker_main(conn, worker_index, worker_count, tick_rate):
+    """Worker süreci: komutları uygula, tick'le, mesajları ön sürece gönder"""
+    rooms_module.configure_room_ids(worker_index, worker_count)
+    host = GameHost()
+    clock = TickClock(tick_rate)
+    while True:
+        clock.begin_tick()
+        messages = []
+        while conn.poll():
+            command = conn.recv()
+            if command is None:
+                return
+            # Hatalı istemci girdisi tüm worker'ı (ve odalarını) düşürmemeli: komut atlanır
+            try:
+                messages.extend(host.handle(*command))
+            except Exception:
+                print("worker %d: %s komutu atlandı" % (worker_index, command[0]), file=sys.stderr)
+                traceback.print_exc()
+        try:
+            messages.extend(host.tick())
+        except Exception:
+            print("worker %d: tick %d atlandı" % (worker_index, host.tick_count), file=sys.stderr)
+            traceback.print_exc()
+        if messages:
+            conn.send(messages)
+        time.sleep(clock.end_tick())
+
+
+class WorkerPool:
+    """Ön süreç tarafı: worker'ları başlatır, komutları yönlendirir, mesajları toplar"""
+    def __init__(self, count, tick_rate):
+        # eventlet'in yamaladığı ön süreç fork edilmez, worker'lar temiz başlar
+        self.context = multiprocessing.get_context("spawn")
+        self.tick_rate = tick_rate
+        self.connections = [None] * count
+        self.processes = [None] * count
+        for index in range(count):
+            self.start_worker(index)
+        self.sid_workers = {}  # sid: worker index
+        self.load = [0] * count  # worker başına bağlı sid sayısı
+
+    def start_worker(self, index):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=worker_main, daemon=True,
+                                       args=(child_conn, index, len(self.connections), self.tick_rate))
+        process.start()
+        self.connections[index] = parent_conn
+        self.processes[index] = process
+
+    def restart_worker(self, index, sid_rooms):
+        """Ölen worker'ı yeniden başlat; odaları kayboldu, bağlı sid'leri odalardan çıkar"""
+        print("worker %d düştü, yeniden başlatılıyor" % index, file=sys.stderr)
+        self.connections[index].close()
+        self.processes[index].join(timeout=0)
+        self.start_worker(index)
+        messages = []
+        for sid in [sid for sid, worker in self.sid_workers.items() if worker == index]:
+            self.release(sid)
+            room_id = sid_rooms.get(sid)
+            if room_id is not None:
+                messages.append(session(sid, None, leave=sio_room_names(room_id)))
+            messages.append(outbound("error", {"message": "Oda kapandı, lütfen yeniden katılın!"}, sid))
+        return messages
+
+    def worker_for_room(self, room_id):
+        """Oda numarasının worker'ı (otomatik numaralar configure_room_ids ile uyumlu)"""
+        if room_id.isdigit():
+            return int(room_id) % len(self.connections)
+        return zlib.crc32(room_id.encode("utf-8")) % len(self.connections)
+
+    def assign(self, sid, room_id=None):
+        """sid'i bir worker'a bağla: istenen odanın worker'ı veya en az yüklü worker"""
+        self.release(sid)
+        if room_id:
+            index = self.worker_for_room(room_id)
+        else:
+            index = self.load.index(min(self.load))
+        self.sid_workers[sid] = index
+        self.load[index] += 1
+        return index
+
+    def release(self, sid):
+        index = self.sid_workers.pop(sid, None)
+        if index is not None:
+            self.load[index] -= 1
+        return index
+
+    def send(self, sid, op, data=None):
+        """Komutu sid'in worker'ına ilet (bağlı değilse ilk worker)"""
+        try:
+            self.connections[self.sid_workers.get(sid, 0)].send((op, sid, data))
+        except OSError:
+            pass  # Worker ölmüş: bir sonraki poll onu yeniden başlatır
+
+    def poll(self, sid_rooms):
+        """Worker'lardan gelen mesaj listelerini sırayla döndür (sid_rooms: sid -> oda numarası)"""
+        for index in range(len(self.connections)):
+            try:
+                while self.connections[index].poll():
+                    yield self.connections[index].recv()
+            except (EOFError, OSError):
+                yield self.restart_worker(index, sid_rooms)
+
+    def stop(self):
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
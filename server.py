@@ -1,1311 +1,114 @@
 # --- En üstteki importlar ---
-import random
+import atexit
 import time
-import copy
 import os
-from flask import Flask, send_from_directory, request
-from flask_socketio import SocketIO, emit, disconnect
-from common import MSG_MOVE, MSG_STATE, MSG_RESTART, create_state_message, MAX_PLAYERS, get_snake_color, get_snake_color_info, OBSTACLE_TYPES, POWERUP_TYPES, INITIAL_FOOD_COUNT
+from flask import Flask, send_from_directory, request, Response, jsonify
+from flask_socketio import SocketIO, emit, disconnect, join_room, leave_room
+import backpressure
+import metrics
+from common import BOARD_WIDTH, BOARD_HEIGHT, TICK_RATE
+import message_bus
+from game_host import GameHost
+from room import OPPOSITE_DIRECTIONS
+from room_worker import ROOM_WORKERS, WorkerPool
+from tick_clock import TickClock
 
 # Time Attack modülünü import et
 import time_attack_module
 
-BOARD_WIDTH = 60   # Enine daha geniş
-BOARD_HEIGHT = 35 # 700/20 = 35 satır
-TICK_RATE = 0.05  # saniye, 30 FPS
-
-
-def random_powerup(snakes, foods, obstacles, portals, powerups):
-    occupied = set()
-    for snake in snakes.values():
-        occupied.update(snake)
-    occupied.update(foods)
-    for obs in obstacles:
-        occupied.add(tuple(obs["pos"]))
-    for portal in portals:
-        occupied.add(portal[0])
-        occupied.add(portal[1])
-    for p in powerups:
-        occupied.add(tuple(p["pos"]))
-    empty = [(x, y) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT) if (x, y) not in occupied]
-    if not empty:
-        return {"pos": (0, 0), "type": "speed"}
-    x, y = random.choice(empty)
-    ptype = random.choice(POWERUP_TYPES)
-    return {"pos": (x, y), "type": ptype["type"]}
-
-def random_food(snakes, foods, obstacles=None, portals=None, powerups=None, golden_food=None):
-    occupied = set()
-    for snake in snakes.values():
-        occupied.update(snake)
-    occupied.update(foods)
-    if golden_food:
-        if isinstance(golden_food, (list, tuple)) and len(golden_food) == 2:
-            occupied.add(tuple(golden_food))
-    if obstacles:
-        for obs in obstacles:
-            occupied.add(tuple(obs["pos"]))
-    if portals:
-        for portal in portals:
-            occupied.add(portal[0])
-            occupied.add(portal[1])
-    if powerups:
-        for pu in powerups:
-            occupied.add(tuple(pu["pos"]))
-    empty = [(x, y) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT) if (x, y) not in occupied]
-    if not empty:
-        return (0, 0)
-    return random.choice(empty)
-
-# --- Mermi sistemi ve ilgili alanlar kaldırıldı ---
-
-# --- OYUN DURUMU ---
-game_state = {
-    "snakes": {},
-    "directions": {},
-    "food": [(5, 5 + i*2) for i in range(INITIAL_FOOD_COUNT)],
-    "golden_food": None,
-    "active": {},
-    "colors": {},
-    "color_info": {},  # Her oyuncu için renk bilgisi
-    "obstacles": [],
-    "scores": {},
-    "portals": [],
-    "powerups": [],
-    "active_powerups": {},
-    "trails": {},  # İz bırakıcı power-up için: {client_id: [(x, y), ...]}
-    "boost_system": {},  # Boost sistemi: {client_id: {"active": bool, "start_time": float, "cooldown_end": float}}
-}
-
-# Chat sistemi değişkenleri
-chat_messages = []
-MAX_CHAT_MESSAGES = 50
-chat_throttle = {}  # {client_id: last_message_time}
-CHAT_THROTTLE_TIME = 1.0  # saniye
-
-def get_all_empty_cells():
-    occupied = set()
-    for snake in game_state["snakes"].values():
-        occupied.update(snake)
-    occupied.update(game_state["food"])
-    if "obstacles" in game_state:
-        for obs in game_state["obstacles"]:
-            occupied.add(tuple(obs["pos"]))
-    if "portals" in game_state:
-        for portal in game_state["portals"]:
-            occupied.add(portal[0])
-            occupied.add(portal[1])
-    if "powerups" in game_state:
-        for pu in game_state["powerups"]:
-            occupied.add(tuple(pu["pos"]))
-    empty = [(x, y) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT) if (x, y) not in occupied]
-    random.shuffle(empty)
-    return empty
-
-def place_obstacles():
-    obstacles = []
-    empty = [(x, y) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT)]
-    random.shuffle(empty)
-    idx = 0
-    for _ in range(15):  # Çimen (slow) - sayıyı artırdık
-        pos = empty[idx]; idx += 1
-        obstacles.append({"pos": pos, "type": "slow"})
-    for _ in range(7):  # Enemy (enemy)
-        pos = empty[idx]; idx += 1
-        obstacles.append({"pos": pos, "type": "enemy"})
-    for _ in range(7):  # Gizli duvar
-        pos = empty[idx]; idx += 1
-        obstacles.append({"pos": pos, "type": "hidden_wall"})
-    return obstacles
-
-def place_portals():
-    empty = get_all_empty_cells()
-    if len(empty) < 2:
-        return []
-    import random
-    min_dist = 8  # Minimum Manhattan mesafesi
-    tries = 20
-    for _ in range(tries):
-        a = random.choice(empty)
-        far_cells = [cell for cell in empty if abs(cell[0]-a[0]) + abs(cell[1]-a[1]) >= min_dist]
-        if far_cells:
-            b = random.choice(far_cells)
-            return [(a, b)]
-    # Eğer yeterince uzak hücre bulunamazsa, en uzak olanı seç
-    a = random.choice(empty)
-    b = max(empty, key=lambda cell: abs(cell[0]-a[0]) + abs(cell[1]-a[1]))
-    return [(a, b)]
-
-def reset_snake(client_id):
-    # Maksimum oyuncu kontrolü
-    if len(game_state["snakes"]) >= MAX_PLAYERS and client_id not in game_state["snakes"]:
-        return  # Yeni oyuncu kabul etme
-    x = random.randint(2, BOARD_WIDTH-3)
-    y = random.randint(6, BOARD_HEIGHT-1)  # Y koordinatı 6 ve üzeri, ilk 5 satırda doğmaz
-    snake = [(x, y)]
-    for i in range(1, 3): # START_LENGTH yerine 3 kullanıldı
-        snake.append((x, y+i))
-    game_state["snakes"][client_id] = snake
-    game_state["directions"][client_id] = "UP"
-    game_state["active"][client_id] = True
-    
-    # Gelişmiş renk sistemi - her oyuncuya özel renk bilgisi
-    color_info = get_snake_color_info(client_id)
-    game_state["colors"][client_id] = color_info["color"]
-    game_state["color_info"][client_id] = color_info  # Renk bilgilerini de sakla
-    
-    if client_id not in game_state["scores"]:
-        game_state["scores"][client_id] = 0
-    if client_id not in game_state["active_powerups"]:
-        game_state["active_powerups"][client_id] = []
-    # Boost sistemi başlatma
-    if client_id not in game_state["boost_system"]:
-        game_state["boost_system"][client_id] = {
-            "active": False,
-            "start_time": 0,
-            "cooldown_end": 0,
-            "space_pressed": False,
-            "remaining_time": BOOST_DURATION
-        }
-    if len(game_state["snakes"]) == 1:
-        game_state["obstacles"] = place_obstacles()  # Sadece ilk oyuncu girince engelleri yerleştir
-        game_state["portals"] = place_portals()      # Sadece ilk oyuncu girince portalları yerleştir
-
-# --- Power-up süreleri ---
-POWERUP_DURATIONS = {"speed": 10, "shield": 10, "invisible": 10, "reverse": 5, "freeze": 5, "giant": 10, "trail": 10, "magnet": 10}
-
-def has_powerup(cid, ptype):
-    now = time.time()
-    for p in game_state.get("active_powerups", {}).get(cid, []):
-        if p["type"] == ptype and now - p["tick"] < POWERUP_DURATIONS.get(ptype, 10):
-            return True
-    return False
-
-def has_powerup_time_attack(cid, ptype, ta_game_state):
-    now = time.time()
-    for p in ta_game_state.get("active_powerups", {}).get(cid, []):
-        if p["type"] == ptype and now - p["tick"] < time_attack_module.TIME_ATTACK_CONSTANTS["POWERUP_DURATION"]:
-            return True
-    return False
-
-def clear_expired_time_attack_powerups():
-    now = time.time()
-    for client_id in list(time_attack_module.time_attack_games.keys()):
-        ta_game_state = time_attack_module.time_attack_games[client_id]
-        if client_id in ta_game_state.get("active_powerups", {}):
-            expired = []
-            for p in ta_game_state["active_powerups"][client_id]:
-                if now - p["tick"] >= time_attack_module.TIME_ATTACK_CONSTANTS["POWERUP_DURATION"]:
-                    expired.append(p["type"])
-            for ptype in expired:
-                ta_game_state["active_powerups"][client_id] = [p for p in ta_game_state["active_powerups"][client_id] if p["type"] != ptype]
-
-def get_powerup_timeleft(cid, ptype):
-    now = time.time()
-    for p in game_state.get("active_powerups", {}).get(cid, []):
-        if p["type"] == ptype and now - p["tick"] < POWERUP_DURATIONS.get(ptype, 10):
-            return max(0, POWERUP_DURATIONS.get(ptype, 10) - (now - p["tick"]))
-    return 0
-
-def clear_expired_powerups():
-    now = time.time()
-    expired = []
-    for cid, powers in list(game_state.get("active_powerups", {}).items()):
-        for p in list(powers):
-            if now - p["tick"] >= POWERUP_DURATIONS.get(p["type"], 10):
-                expired.append((cid, p["type"]))
-    for cid, ptype in expired:
-        game_state["active_powerups"][cid] = [p for p in game_state["active_powerups"][cid] if p["type"] != ptype]
-        # Eğer biten power-up trail ise izleri de sil
-        if ptype == "trail" and cid in game_state["trails"]:
-            del game_state["trails"][cid]
-
-# --- Boost sistemi fonksiyonları ---
-BOOST_DURATION = 6.0  # Boost toplam kullanılabilir süresi (saniye)
-BOOST_COOLDOWN = 30.0  # Boost cooldown süresi (saniye)
-
-def activate_boost(client_id):
-    """Boost'u aktifleştir"""
-    now = time.time()
-    if client_id not in game_state["boost_system"]:
-        game_state["boost_system"][client_id] = {
-            "active": False,
-            "start_time": 0,
-            "cooldown_end": 0,
-            "space_pressed": False,
-            "remaining_time": BOOST_DURATION
-        }
-    boost_data = game_state["boost_system"][client_id]
-    boost_data["space_pressed"] = True
-    # Eğer cooldown'daysa, işlem yapma
-    if now < boost_data["cooldown_end"]:
-        return False
-    # Eğer boost süresi bittiyse, işlem yapma
-    if boost_data.get("remaining_time", BOOST_DURATION) <= 0:
-        return False
-    # Eğer boost zaten aktifse, sadece space_pressed'i güncelle
-    if boost_data["active"]:
-        return True
-    # Boost'u aktifleştir
-    boost_data["active"] = True
-    boost_data["start_time"] = now
-    boost_data["last_tick_time"] = now
-    return True
-
-def deactivate_boost(client_id):
-    """Boost'u deaktifleştir (space tuşu bırakıldığında)"""
-    if client_id not in game_state["boost_system"]:
-        return
-    boost_data = game_state["boost_system"][client_id]
-    boost_data["space_pressed"] = False
-    # Boost aktifse, kalan süreyi güncelle ve boost'u durdur
-    if boost_data["active"]:
-        now = time.time()
-        elapsed = now - boost_data.get("last_tick_time", now)
-        boost_data["remaining_time"] = max(0, boost_data.get("remaining_time", BOOST_DURATION) - elapsed)
-        boost_data["last_tick_time"] = now
-        if boost_data["remaining_time"] <= 0:
-            boost_data["active"] = False
-            boost_data["last_tick_time"] = now
-            boost_data["cooldown_end"] = now + BOOST_COOLDOWN
-
-def update_boost_system():
-    """Boost sistemini güncelle"""
-    now = time.time()
-    for client_id, boost_data in list(game_state["boost_system"].items()):
-        # Boost aktifse ve space basılıysa kalan süreyi azalt
-        if boost_data["active"] and boost_data["space_pressed"]:
-            elapsed = now - boost_data.get("last_tick_time", now)
-            boost_data["remaining_time"] = max(0, boost_data.get("remaining_time", BOOST_DURATION) - elapsed)
-            boost_data["last_tick_time"] = now
-            # Kalan süre bittiyse boost'u durdur ve cooldown başlat
-            if boost_data["remaining_time"] <= 0:
-                boost_data["active"] = False
-                boost_data["last_tick_time"] = now
-                boost_data["cooldown_end"] = now + BOOST_COOLDOWN
-        # Space bırakıldıysa boost'u durdur
-        elif boost_data["active"] and not boost_data["space_pressed"]:
-            elapsed = now - boost_data.get("last_tick_time", now)
-            boost_data["remaining_time"] = max(0, boost_data.get("remaining_time", BOOST_DURATION) - elapsed)
-            boost_data["active"] = False
-            boost_data["last_tick_time"] = now
-            if boost_data["remaining_time"] <= 0:
-                boost_data["cooldown_end"] = now + BOOST_COOLDOWN
-        # Cooldown bittiyse ve kalan süre 0 ise, boost'u tekrar doldur
-        if now >= boost_data["cooldown_end"] and boost_data["remaining_time"] <= 0:
-            boost_data["remaining_time"] = BOOST_DURATION
-    
-def is_boost_active(client_id):
-    """Boost aktif mi kontrol et"""
-    if client_id not in game_state["boost_system"]:
-        return False
-    return game_state["boost_system"][client_id]["active"]
-
-def get_boost_info(client_id):
-    """Boost bilgilerini döndür"""
-    if client_id not in game_state["boost_system"]:
-        return {"active": False, "progress": 0, "cooldown_progress": 0}
-    boost_data = game_state["boost_system"][client_id]
-    now = time.time()
-    # Boost aktifse veya space basılıysa kalan süre oranını göster
-    if boost_data.get("remaining_time", BOOST_DURATION) > 0:
-        progress = boost_data.get("remaining_time", BOOST_DURATION) / BOOST_DURATION
-    else:
-        progress = 0
-    # Cooldown'daysa cooldown_progress'u hesapla
-    if now < boost_data["cooldown_end"]:
-        cooldown_elapsed = now - (boost_data["cooldown_end"] - BOOST_COOLDOWN)
-        cooldown_progress = min(1.0, cooldown_elapsed / BOOST_COOLDOWN)
+# Odalar ve Time Attack oyunları GameHost'ta çalışır; burada sadece soket yönlendirmesi var.
+# ROOM_WORKERS > 0 ise GameHost'lar worker süreçlerindedir (room_worker.py).
+host = None if ROOM_WORKERS else GameHost(BOARD_WIDTH, BOARD_HEIGHT)
+worker_pool = None  # start_game_loop içinde başlatılır
+clients = {}  # sid: client_id
+sid_rooms = {}  # sid: room_id - klasik moda katılan istemcinin odası
+time_attack_sids = set()
+# Aynı makinedeki diğer server.py örnekleriyle paylaşılan varlık/sohbet/oda dizini
+bus = message_bus.create_bus()
+directory = message_bus.SessionDirectory(bus)
+atexit.register(bus.close)
+
+def dispatch(op, sid, data=None):
+    """Komutu odaları simüle eden GameHost'a (veya sid'in worker'ına) ilet"""
+    if worker_pool is None:
+        emit_messages(host.handle(op, sid, data))
     else:
-        cooldown_progress = 1.0
-    return {
-        "active": boost_data["active"],
-        "progress": progress,
-        "cooldown_progress": cooldown_progress
-    }
-
-def eliminate_snake(client_id):
-    game_state["active"][client_id] = False
-    # Elenince power-up'ları temizle
-    if "active_powerups" in game_state and client_id in game_state["active_powerups"]:
-        del game_state["active_powerups"][client_id]
-    # Skoru sıfırlama kaldırıldı
-    # Yılanı haritada tutmaya devam edelim ama hareket etmesin
-
-# --- Oyun döngüsünde power-up etkilerini uygula ---
-GAME_DURATION = 120  # saniye (2 dakika)
-game_timer = None
-waiting_for_restart = False
-winner_id = None
-# Klasik mod için altın elma çıkma olasılığı (varsayılan %0.5)
-GOLDEN_FOOD_CHANCE_CLASSIC = 0.003
-
-def all_players_ready():
-    # Tüm aktif olmayan oyuncular hazır komutu gönderdiyse True döner
-    if not game_state["snakes"]:
-        return False
-    for cid in game_state["snakes"]:
-        if not game_state["active"].get(cid, True):
-            if not game_state.get("ready", {}).get(cid, False):
-                return False
-    return True
+        worker_pool.send(sid, op, data)
 
-def reset_game():
-    global game_timer, waiting_for_restart, winner_id
-    # Tüm oyuncuları yeniden başlat
-    for cid in list(game_state["snakes"].keys()):
-        reset_snake(cid)
-        game_state["scores"][cid] = 0  # Skorları burada sıfırla
-    # --- YEMLERİ RASTGELE YERLEŞTİR ---
-    game_state["food"] = []
-    for _ in range(INITIAL_FOOD_COUNT):
-        pos = random_food(game_state["snakes"], game_state["food"], game_state["obstacles"], game_state["portals"], game_state["powerups"], game_state["golden_food"])
-        game_state["food"].append(pos)
-    game_state["ready"] = {}
-    game_timer = time.time()
-    waiting_for_restart = False
-    winner_id = None
-    # Chat mesajlarını temizle
-    clear_chat_messages()
-
-# --- Oyun döngüsünde süre ve bitiş kontrolü ---
-async def game_loop():
-    global game_timer, waiting_for_restart, winner_id
-    last_state_msg = None
-    powerup_spawn_chance = 0.05  # Geçici olarak artırıldı test için
-    max_powerups = 4
-    tick_count = 0
-    waiting_for_restart = False
-    winner_id = None
-    game_started = False
-    while True:
-        # Oyun hiç başlamadıysa ve en az bir oyuncu varsa, sadece bir kez başlat
-        if not game_started and game_timer is None and len(game_state["snakes"]) > 0:
-            reset_game()
-            game_started = True
-        # Oyun bittiğinde (tüm oyuncular elendiğinde veya süre bittiğinde) tekrar başlatmak için flag'i sıfırla
-        if game_timer is None:
-            game_started = False
-        clear_expired_powerups()
-        now = time.time()
-        # Oyun süresi kontrolü
-        if not waiting_for_restart and game_timer is not None and now - game_timer >= GAME_DURATION:
-            # Süre bitti, kazananı belirle
-            max_score = -1
-            winner_id = None
-            for cid, score in game_state["scores"].items():
-                if score > max_score:
-                    max_score = score
-                    winner_id = cid
-            waiting_for_restart = True
-            # Tüm oyuncuları pasif yap
-            for cid in game_state["snakes"]:
-                game_state["active"][cid] = False
-        # Oyuncular hazırsa oyunu tekrar başlat
-        if waiting_for_restart and all_players_ready():
-            reset_game()
-        # Normal oyun akışı
-        if not waiting_for_restart:
-            # Her oyuncu için buffer'daki komutları sırayla işle
-            for client_id in list(player_move_buffers.keys()):
-                if client_id not in player_move_buffers or not player_move_buffers[client_id]:
-                    continue
-                
-                # Buffer'dan bir komut al
-                msg = player_move_buffers[client_id].pop(0)
-                direction = msg["direction"]
-                
-                # Reverse power-up kontrolü
-                if has_powerup(client_id, "reverse"):
-                    OPP = {"UP":"DOWN","DOWN":"UP","LEFT":"RIGHT","RIGHT":"LEFT"}
-                    direction = OPP.get(direction, direction)
-                
-                # Ters yön kontrolü
-                current_dir = game_state["directions"].get(client_id)
-                OPPOSITE_DIRECTIONS = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
-                if current_dir and OPPOSITE_DIRECTIONS.get(current_dir) == direction:
-                    continue
-                
-                # Yönü güncelle
-                if client_id in game_state["snakes"]:
-                    game_state["directions"][client_id] = direction
-                else:
-                    reset_snake(client_id)
-            # Power-up, golden apple, yılan hareketi vs. aynı şekilde devam
-            if len(game_state["powerups"]) < max_powerups and random.random() < powerup_spawn_chance:
-                pu = random_powerup(
-                    game_state["snakes"],
-                    game_state["food"],
-                    game_state["obstacles"],
-                    game_state["portals"],
-                    game_state["powerups"]
-                )
-                # --- Aynı türden 2'den fazla power-up kontrolü ---
-                same_type_count = sum(1 for p in game_state["powerups"] if p["type"] == pu["type"])
-                if same_type_count < 2:
-                    game_state["powerups"].append(pu)
-            # Altın elma üretimi (klasik mod)
-            if game_state["golden_food"] is None and random.random() < GOLDEN_FOOD_CHANCE_CLASSIC:
-                game_state["golden_food"] = random_food(
-                    game_state["snakes"],
-                    game_state["food"],
-                    game_state["obstacles"],
-                    game_state["portals"],
-                    game_state["powerups"],
-                    None
-                )
-            for client_id in list(game_state["snakes"].keys()):
-                # Eğer oyuncu dondurulmuşsa hareket ettirme
-                if has_powerup(client_id, "frozen"):
-                    continue
-                if has_powerup(client_id, "speed"):
-                    move_snake(client_id)
-                else:
-                    if tick_count % 2 == 0:
-                        move_snake(client_id)
-        # --- Magnet power-up aktifse, yılanın başının 5 kare yakınındaki yemleri çekip yesin ---
-        magnet_effects = {}  # Magnet efektleri için
-        
-        # Mevcut magnet efektlerini güncelle
-        if "magnet_effects" in game_state:
-            for cid, effect in game_state["magnet_effects"].items():
-                if has_powerup(cid, "magnet") and len(game_state["snakes"].get(cid, [])) > 0:
-                    # Progress değerlerini artır
-                    updated_foods = []
-                    for food_effect in effect.get("attracted_foods", []):
-                        new_progress = food_effect.get("progress", 0) + 0.1  # Her frame'de %10 artır
-                        if new_progress < 1.0:
-                            updated_foods.append({
-                                "start_pos": food_effect["start_pos"],
-                                "end_pos": food_effect["end_pos"],
-                                "progress": new_progress
-                            })
-                    
-                    if updated_foods:
-                        magnet_effects[cid] = {
-                            "head_pos": game_state["snakes"][cid][0],
-                            "attracted_foods": updated_foods
-                        }
-        
-        # Yeni magnet efektleri ekle
-        for cid, snake in game_state["snakes"].items():
-            if has_powerup(cid, "magnet") and len(snake) > 0:
-                head = snake[0]
-                new_foods = []
-                foods_eaten = 0  # Yenen yem sayısını takip et
-                
-                # Eğer bu oyuncu için zaten magnet efekti varsa, yeni yemler ekle
-                if cid in magnet_effects:
-                    attracted_foods = magnet_effects[cid]["attracted_foods"]
-                else:
-                    attracted_foods = []
-                
-                for fx, fy in game_state["food"]:
-                    dist = abs(fx - head[0]) + abs(fy - head[1])
-                    if dist <= 5:  # 5 kare mesafede
-                        # Bu yem zaten çekiliyor mu kontrol et
-                        already_attracted = False
-                        for existing_food in attracted_foods:
-                            if existing_food["start_pos"] == [fx, fy]:
-                                already_attracted = True
-                                break
-                        
-                        if not already_attracted:
-                            # Yeni çekilen yem için efekt ekle
-                            attracted_foods.append({
-                                "start_pos": [fx, fy],
-                                "end_pos": head,
-                                "progress": 0.0
-                            })
-                        
-                        # Yemi yedik, yeni yem oluştur
-                        new_food = random_food(
-                            game_state["snakes"],
-                            new_foods,
-                            game_state["obstacles"],
-                            game_state["portals"],
-                            game_state["powerups"],
-                            game_state.get("golden_food")
-                        )
-                        if new_food:
-                            new_foods.append(new_food)
-                        # Yılanın boyunu artır (yemi yediği için)
-                        if len(snake) > 0:
-                            snake.append(snake[-1])  # Kuyruğu uzat
-                            foods_eaten += 1  # Yenen yem sayısını artır
-                    else:
-                        new_foods.append((fx, fy))
-                
-                # Magnet efekti verilerini kaydet
-                if attracted_foods:
-                    magnet_effects[cid] = {
-                        "head_pos": head,
-                        "attracted_foods": attracted_foods
-                    }
-                
-                # Yenen yem sayısı kadar puan ekle
-                if foods_eaten > 0:
-                    game_state["scores"][cid] = game_state["scores"].get(cid, 0) + foods_eaten
-                game_state["food"] = new_foods
-        # Altın elma için magnet etkisi yok!
-        # Her client için özel state gönder
-        for client_id in list(game_state["snakes"].keys()):
-            state_copy = copy.deepcopy(game_state)
-            if game_timer is not None and not waiting_for_restart:
-                state_copy["time_left"] = max(0, int(GAME_DURATION - (now - game_timer)))
-            else:
-                state_copy["time_left"] = 0
-            state_copy["winner_id"] = winner_id
-            state_copy["waiting_for_restart"] = waiting_for_restart
-            state_copy["powerup_timers"] = {}
-            for cid in state_copy["snakes"].keys():
-                timers = {}
-                for ptype in ["speed","shield","invisible","reverse","magnet"]:
-                    tleft = get_powerup_timeleft(cid, ptype)
-                    if tleft > 0:
-                        timers[ptype] = tleft
-                if timers:
-                    state_copy["powerup_timers"][cid] = timers
-            state_copy["golden_food"] = game_state["golden_food"]
-            # Magnet efektlerini ekle
-            if magnet_effects:
-                state_copy["magnet_effects"] = magnet_effects
-            for cid in list(state_copy["snakes"].keys()):
-                if has_powerup(cid, "invisible") and cid != client_id:
-                    state_copy["snakes"][cid] = []
-            state_msg = create_state_message(state_copy)
-            # Her client'a güncel state'i gönder
-            for ws, pid in list(clients.items()):
-                if pid == client_id:
-                    try:
-                        await ws.send(state_msg)
-                    except:
-                        pass
-
-        
-        tick_count += 1
-        await asyncio.sleep(TICK_RATE)
-
-# --- Zırh etkisi: move_snake içinde çarpışma kontrolünde uygula ---
-MAX_SNAKE_LENGTH = 10
-def move_snake(client_id):
-    shielded = has_powerup(client_id, "shield")
-    if not game_state["active"].get(client_id, True):
-        return
-    direction = game_state["directions"].get(client_id)
-    if not direction:
-        return  # Direction gelmeden yılanı hareket ettirme
-    snake = game_state["snakes"].get(client_id)
-    if not snake:
-        reset_snake(client_id)
-        snake = game_state["snakes"][client_id]
-    head_x, head_y = snake[0]
-    if direction == "UP":
-        head_y -= 1
-    elif direction == "DOWN":
-        head_y += 1
-    elif direction == "LEFT":
-        head_x -= 1
-    elif direction == "RIGHT":
-        head_x += 1
-    new_head = (head_x, head_y)
-    
-    # --- Kendine çarpma kontrolü - YENİ BAŞ POZİSYONU HESAPLANDIKTAN SONRA, VÜCUDA EKLENMEDEN ÖNCE ---
-    # Yeni baş pozisyonu yılanın mevcut vücuduyla çakışıyor mu kontrol et
-    if len(snake) > 1 and new_head in snake[1:]:  # Yeni baş, mevcut vücudun geri kalanında var mı?
-        if shielded or is_boost_active(client_id):
-            # Shield veya boost aktifken kendine çarpmadan geç, shield'i kaldırma
-            pass
-        else:
-            eliminate_snake(client_id)
-            return
-    
-    # --- Altın elma kontrolü ---
-    if game_state.get("golden_food") and new_head == tuple(game_state["golden_food"]):
-        snake.insert(0, new_head)
-        game_state["golden_food"] = None
-        game_state["scores"][client_id] = game_state["scores"].get(client_id, 0) + 5
-        return
-    # --- POWER-UP KONTROLÜ ---
-    # Magnet etkisi artık burada uygulanmıyor, sadece power-up'ı sil
-    for pu in list(game_state.get("powerups", [])):
-        if new_head == tuple(pu["pos"]):
-            if "active_powerups" not in game_state:
-                game_state["active_powerups"] = {}
-            if client_id not in game_state["active_powerups"]:
-                game_state["active_powerups"][client_id] = []
-            game_state["active_powerups"][client_id].append({"type": pu["type"], "tick": time.time()})
-            # Freeze ve giant etkileri burada kalacak
-            if pu["type"] == "freeze":
-                for other_id in game_state["snakes"]:
-                    if other_id != client_id:
-                        game_state["active_powerups"].setdefault(other_id, []).append({"type": "frozen", "tick": time.time()})
-            if pu["type"] == "giant":
-                snake = game_state["snakes"][client_id]
-                for _ in range(3): # START_LENGTH yerine 3 kullanıldı
-                    snake.append(snake[-1])
-            game_state["powerups"].remove(pu)
-    # --- PORTAL KONTROLÜ ---
-    for portal_a, portal_b in game_state.get("portals", []):
-        if new_head == portal_a:
-            new_head = portal_b
-            break
-        elif new_head == portal_b:
-            new_head = portal_a
-            break
-    # Engel kontrolü
-    shielded = has_powerup(client_id, "shield")
-    if not shielded and not is_boost_active(client_id):
-        for obs in game_state.get("obstacles", []):
-            if new_head == tuple(obs["pos"]):
-                if obs["type"] == "slow":
-                    # Çalı engelleri sadece yavaşlatma yapar, elenme yapmaz
-                    pass
-                elif obs["type"] == "enemy":
-                    # Enemy engeli puan eksiltir
-                    current_score = game_state["scores"].get(client_id, 0)
-                    if current_score > 0:
-                        game_state["scores"][client_id] = current_score - 1
-                    if len(snake) > 1:
-                        snake.pop()
-                    else:
-                        eliminate_snake(client_id)
-                        return
-                elif obs["type"] == "wall":
-                    eliminate_snake(client_id)
-                    return
-                elif obs["type"] == "hidden_wall":
-                    # Gizli duvarlar elenme yapar ve puan eksiltir
-                    current_score = game_state["scores"].get(client_id, 0)
-                    if current_score >= 2:
-                        game_state["scores"][client_id] = current_score - 2
-                    elif current_score == 1:
-                        game_state["scores"][client_id] = 0
-                    # Puan 0 ise değişiklik yapılmaz
-                    eliminate_snake(client_id)
-                    return
-                break
-    # Çarpışma kontrolü (zırh etkisi ve duvardan geçiş)
-    shielded = has_powerup(client_id, "shield")
-    out_of_bounds = not (0 <= new_head[0] < BOARD_WIDTH and 0 <= new_head[1] < BOARD_HEIGHT)
-    if out_of_bounds:
-        if shielded or is_boost_active(client_id):
-            # Shield veya boost aktifken duvardan geç, shield'i kaldırma
-            nx, ny = new_head
-            if nx < 0:
-                nx = BOARD_WIDTH - 1
-            elif nx >= BOARD_WIDTH:
-                nx = 0
-            if ny < 0:
-                ny = BOARD_HEIGHT - 1
-            elif ny >= BOARD_HEIGHT:
-                ny = 0
-            new_head = (nx, ny)
-        else:
-            eliminate_snake(client_id)
-            return
-    for other_id, other_snake in game_state["snakes"].items():
-        if other_id != client_id and new_head in other_snake:
-            if shielded:
-                # Shield aktifken diğer yılandan geç, shield'i kaldırma
-                break
-            else:
-                eliminate_snake(client_id)
-                return
-    # --- Hareketli yem kontrolü ---
-    # Büyüme kontrolü
-    ate_food = False
-    for i, food in enumerate(game_state["food"]):
-        if new_head == food:
-            snake.insert(0, new_head)
-            game_state["food"][i] = random_food(
-                game_state["snakes"],
-                game_state["food"],
-                game_state["obstacles"],
-                game_state["portals"],
-                game_state["powerups"],
-                game_state["golden_food"]
-            )
-            ate_food = True
-            game_state["scores"][client_id] = game_state["scores"].get(client_id, 0) + 1
-            break
-    if not ate_food:
-        snake.insert(0, new_head)
-        snake.pop()
-    
-    # Uzunluk sınırı uygula
-    if len(snake) > MAX_SNAKE_LENGTH:
-        snake = snake[:MAX_SNAKE_LENGTH]
-    
-    # Yılanı güncelle
-    game_state["snakes"][client_id] = snake
-    # --- TRAIL POWER-UP GÜNCELLEME ---
-    # Eğer oyuncuda trail power-up varsa, iz güncelle
-    if has_powerup(client_id, "trail"):
-        trail = game_state["trails"].setdefault(client_id, [])
-        # Yılanın son bloğu iz olarak eklenir
-        if len(snake) > 0:
-            trail.append(snake[-1])
-        # İz uzunluğu 6'yı geçmesin
-        if len(trail) > 6:
-            trail = trail[-6:]
-        game_state["trails"][client_id] = trail
+def apply_session(msg):
+    """Oda üyeliği değişikliğini Socket.IO odalarına uygula"""
+    sid = msg["to"]
+    if msg["room"] is None:
+        sid_rooms.pop(sid, None)
     else:
-        # Power-up yoksa izleri temizle
-        if client_id in game_state["trails"]:
-            del game_state["trails"][client_id]
-    # --- İZ ÇARPIŞMA KONTROLÜ ---
-    # Kendi izine veya başkasının izine çarparsa elenir
-    head = snake[0]
-    if not is_boost_active(client_id):
-        for trail_owner, trail_blocks in game_state["trails"].items():
-            if head in trail_blocks:
-                eliminate_snake(client_id)
-                return
-
-# Hareket buffer sistemi - her oyuncu için son hareket komutlarını sakla
-player_move_buffers = {}  # client_id: [move_commands]
-MAX_BUFFER_SIZE = 3  # Her oyuncu için maksimum 3 komut sakla
-clients = {}  # sid: client_id
-
-READY_MSG = "ready"
-
-def enqueue_move(msg):
-    client_id = msg["client_id"]
-    direction = msg["direction"]
-    
-    # Oyuncu için buffer yoksa oluştur
-    if client_id not in player_move_buffers:
-        player_move_buffers[client_id] = []
-    
-    # Buffer'a komut ekle
-    player_move_buffers[client_id].append({"client_id": client_id, "direction": direction})
-    
-    # Buffer boyutunu sınırla
-    if len(player_move_buffers[client_id]) > MAX_BUFFER_SIZE:
-        player_move_buffers[client_id] = player_move_buffers[client_id][-MAX_BUFFER_SIZE:]
-
-def enqueue_control(msg):
-    if msg.get("type") == MSG_RESTART:
-        client_id = msg["client_id"]
-        reset_snake(client_id)
-    elif msg.get("type") == 'disconnect':
-        client_id = msg["client_id"]
-        game_state["snakes"].pop(client_id, None)
-        game_state["directions"].pop(client_id, None)
-        game_state["active"].pop(client_id, None)
-        game_state["colors"].pop(client_id, None)
-        game_state["scores"].pop(client_id, None)
-        if "active_powerups" in game_state:
-            game_state["active_powerups"].pop(client_id, None)
-        # Oyuncu çıkınca buffer'ını temizle
-        if client_id in player_move_buffers:
-            del player_move_buffers[client_id]
-    elif msg.get("type") == READY_MSG:
-        client_id = msg["client_id"]
-        if "ready" not in game_state:
-            game_state["ready"] = {}
-        game_state["ready"][client_id] = True
-
-# ws_handler fonksiyonunun doğru tanımı:
-async def ws_handler(websocket):
-    print("ws_handler ÇAĞRILDI", websocket)
-    client_id = None
+        sid_rooms[sid] = msg["room"]
+    directory.set_room(sid, msg["room"])
+    if sid not in clients:
+        return  # bağlantı kopmuş, Socket.IO odalardan zaten çıkardı
+    for sio_room in msg["leave"]:
+        leave_room(sio_room, sid=sid, namespace='/')
+    for sio_room in msg["join"]:
+        join_room(sio_room, sid=sid, namespace='/')
+
+def emit_messages(messages):
+    """GameHost'un döndürdüğü mesajları gönder ve say"""
+    for msg in messages:
+        if msg["event"] is None:
+            apply_session(msg)
+            continue
+        if not directory.is_local(msg["to"]):
+            # Alıcı başka bir örneğe bağlı (ör. fısıltı): veri yolundan ilet
+            bus.publish("emit", msg)
+            continue
+        socketio.emit(msg["event"], msg["data"], room=msg["to"], skip_sid=msg["skip_sid"])
+        if msg["data"] is not None:
+            emit_stats.record(msg["event"], msg["data"], msg["recipients"])
+
+def on_bus_emit(msg, sender):
+    """Başka bir örneğin bu örnekteki istemciye gönderdiği mesaj"""
+    if sender != bus.instance_id and msg["to"] in clients:
+        socketio.emit(msg["event"], msg["data"], room=msg["to"])
+        emit_stats.record(msg["event"], msg["data"], msg["recipients"])
+
+bus.subscribe("emit", on_bus_emit)
+
+# Oyun döngüsünün sabit adımlı saati - sayaçları izleme için modül seviyesinde
+tick_clock = TickClock(TICK_RATE)
+# Faz süreleri ve event başına gönderilen bayt sayıları (/metrics)
+tick_profiler = metrics.TickProfiler()
+emit_stats = metrics.EmitStats()
+
+def transport_queue_depth(sid):
+    """sid'in Engine.IO gönderim kuyruğundaki paket sayısı (okunamazsa None, OutboundMonitor sayar)"""
+    server = socketio.server
     try:
-        async for message in websocket:
-            msg = json.loads(message)
-            if msg.get("type") == "join":
-                client_id = msg.get("client_id")
-                # Aynı isimle giriş engeli
-                if client_id in game_state["snakes"]:
-                    await websocket.send(json.dumps({"type": "error", "message": "Bu kullanıcı adı zaten oyunda!"}))
-                    break  # Bağlantıyı kapat
-                reset_snake(client_id)
-                clients[websocket] = client_id
-            elif msg.get("type") == MSG_MOVE:
-                enqueue_move(msg)
-                client_id = msg.get("client_id")
-                clients[websocket] = client_id
-            elif msg.get("type") in [MSG_RESTART, 'disconnect', READY_MSG]:
-                enqueue_control(msg)
-                client_id = msg.get("client_id")
-                clients[websocket] = client_id
-            elif msg.get("type") == "easteregg":
-                # Tüm oyuncuları elendir
-                for cid in list(game_state["snakes"].keys()):
-                    eliminate_snake(cid)
-                print("Easter egg triggered! All players eliminated.")
-    except Exception as e:
-        print("WebSocket bağlantı hatası:", e)
-    finally:
-        if client_id:
-            enqueue_control({"type": 'disconnect', "client_id": client_id})
-            # Oyuncu çıkınca buffer'ını temizle
-            if client_id in player_move_buffers:
-                del player_move_buffers[client_id]
-        if websocket in clients:
-            del clients[websocket]
+        manager = server.manager
+        eio_sid = manager.eio_sid_from_sid(sid, '/') if hasattr(manager, 'eio_sid_from_sid') else sid
+        return server.eio.sockets[eio_sid].queue.qsize()
+    except (AttributeError, KeyError):
+        return None
 
-# --- Oyun döngüsü ve oyuncu yönetimi ---
-# Hareket buffer sistemi - her oyuncu için son hareket komutlarını sakla
-player_move_buffers = {}  # client_id: [move_commands]
-MAX_BUFFER_SIZE = 3  # Her oyuncu için maksimum 3 komut sakla
-clients = {}  # sid: client_id
-import threading
+# Yavaş bağlantılar: kuyruğu dolan istemciye yeni çerçeve üretilmez, açılınca en yeni state gider
+outbound_monitor = backpressure.OutboundMonitor(transport_queue_depth)
 
 def game_loop():
-    global game_timer, waiting_for_restart, winner_id, game_state
-    last_state_msg = None
-    powerup_spawn_chance = 0.05  # Geçici olarak artırıldı test için
-    max_powerups = 4
-    tick_count = 0
-    waiting_for_restart = False
-    winner_id = None
-    game_started = False
+    """Tek süreçli modda tüm odaları tick'le, çok süreçli modda worker çıktılarını yayınla"""
     while True:
-        # Time Attack modülünü güncelle
-        time_attack_module.update_all_time_attack_games()
-        clear_expired_time_attack_powerups()
-        
-        # Klasik mod güncellemeleri
-        clear_expired_powerups()
-        update_boost_system()  # Boost sistemini güncelle
-        new_queue = []
-        now = time.time()
-        if not game_started and game_timer is None and len(game_state["snakes"]) > 0:
-            reset_game()
-            game_started = True
-        if game_timer is None:
-            game_started = False
-        if not waiting_for_restart and game_timer is not None and now - game_timer >= GAME_DURATION:
-            max_score = -1
-            winner_id = None
-            for cid, score in game_state["scores"].items():
-                if score > max_score:
-                    max_score = score
-                    winner_id = cid
-            waiting_for_restart = True
-            for cid in game_state["snakes"]:
-                game_state["active"][cid] = False
-        if waiting_for_restart and all_players_ready():
-            reset_game()
-        if not waiting_for_restart:
-            # Her oyuncu için buffer'daki komutları sırayla işle
-            for client_id in list(player_move_buffers.keys()):
-                if client_id not in player_move_buffers or not player_move_buffers[client_id]:
-                    continue
-                
-                # Buffer'dan bir komut al
-                msg = player_move_buffers[client_id].pop(0)
-                direction = msg["direction"]
-                
-                # Reverse power-up kontrolü
-                if has_powerup(client_id, "reverse"):
-                    OPP = {"UP":"DOWN","DOWN":"UP","LEFT":"RIGHT","RIGHT":"LEFT"}
-                    direction = OPP.get(direction, direction)
-                
-                # Ters yön kontrolü - yılanın mevcut yönü ile yeni yön ters mi?
-                current_dir = game_state["directions"].get(client_id)
-                OPPOSITE_DIRECTIONS = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
-                if current_dir and OPPOSITE_DIRECTIONS.get(current_dir) == direction:
-                    continue
-                
-                # Kendine çarpma kontrolü - yeni yön yılanın kendi vücuduna çarpar mı?
-                snake = game_state["snakes"].get(client_id)
-                if snake and len(snake) > 1:
-                    head_x, head_y = snake[0]
-                    if direction == "UP":
-                        new_head = (head_x, head_y - 1)
-                    elif direction == "DOWN":
-                        new_head = (head_x, head_y + 1)
-                    elif direction == "LEFT":
-                        new_head = (head_x - 1, head_y)
-                    elif direction == "RIGHT":
-                        new_head = (head_x + 1, head_y)
-                    
-                    # Yeni baş pozisyonu yılanın mevcut vücuduyla çakışıyor mu?
-                    if new_head in snake[1:]:
-                        continue  # Bu hareketi atla, yılan kendine çarpar
-                
-                # Yönü güncelle
-                if client_id in game_state["snakes"]:
-                    game_state["directions"][client_id] = direction
-                else:
-                    reset_snake(client_id)
-            if len(game_state["powerups"]) < max_powerups and random.random() < powerup_spawn_chance:
-                pu = random_powerup(
-                    game_state["snakes"],
-                    game_state["food"],
-                    game_state["obstacles"],
-                    game_state["portals"],
-                    game_state["powerups"]
-                )
-                same_type_count = sum(1 for p in game_state["powerups"] if p["type"] == pu["type"])
-                if same_type_count < 2:
-                    game_state["powerups"].append(pu)
-            if game_state["golden_food"] is None and random.random() < GOLDEN_FOOD_CHANCE_CLASSIC:
-                game_state["golden_food"] = random_food(
-                    game_state["snakes"],
-                    game_state["food"],
-                    game_state["obstacles"],
-                    game_state["portals"],
-                    game_state["powerups"],
-                    None
-                )
-            for client_id in list(game_state["snakes"].keys()):
-                if has_powerup(client_id, "frozen"):
-                    continue
-                # Boost aktifse veya speed power-up varsa her tick'te hareket et
-                if is_boost_active(client_id) or has_powerup(client_id, "speed"):
-                    move_snake(client_id)
-                else:
-                    if tick_count % 2 == 0:
-                        move_snake(client_id)
-        
-        # --- Magnet power-up aktifse, yılanın başının 5 kare yakınındaki yemleri çekip yesin ---
-        magnet_effects = {}  # Magnet efektleri için
-        
-        # Mevcut magnet efektlerini güncelle
-        if "magnet_effects" in game_state:
-            for cid, effect in game_state["magnet_effects"].items():
-                if has_powerup(cid, "magnet") and len(game_state["snakes"].get(cid, [])) > 0:
-                    # Progress değerlerini artır
-                    updated_foods = []
-                    for food_effect in effect.get("attracted_foods", []):
-                        new_progress = food_effect.get("progress", 0) + 0.1  # Her frame'de %10 artır
-                        if new_progress < 1.0:
-                            updated_foods.append({
-                                "start_pos": food_effect["start_pos"],
-                                "end_pos": food_effect["end_pos"],
-                                "progress": new_progress
-                            })
-                    
-                    if updated_foods:
-                        magnet_effects[cid] = {
-                            "head_pos": game_state["snakes"][cid][0],
-                            "attracted_foods": updated_foods
-                        }
-        
-        # Yeni magnet efektleri ekle
-        for cid, snake in game_state["snakes"].items():
-            if has_powerup(cid, "magnet") and len(snake) > 0:
-                head = snake[0]
-                new_foods = []
-                foods_eaten = 0  # Yenen yem sayısını takip et
-                
-                # Eğer bu oyuncu için zaten magnet efekti varsa, yeni yemler ekle
-                if cid in magnet_effects:
-                    attracted_foods = magnet_effects[cid]["attracted_foods"]
-                else:
-                    attracted_foods = []
-                
-                for fx, fy in game_state["food"]:
-                    dist = abs(fx - head[0]) + abs(fy - head[1])
-                    if dist <= 5:  # 5 kare mesafede
-                        # Bu yem zaten çekiliyor mu kontrol et
-                        already_attracted = False
-                        for existing_food in attracted_foods:
-                            if existing_food["start_pos"] == [fx, fy]:
-                                already_attracted = True
-                                break
-                        
-                        if not already_attracted:
-                            # Yeni çekilen yem için efekt ekle
-                            attracted_foods.append({
-                                "start_pos": [fx, fy],
-                                "end_pos": head,
-                                "progress": 0.0
-                            })
-                        
-                        # Yemi yedik, yeni yem oluştur
-                        new_food = random_food(
-                            game_state["snakes"],
-                            new_foods,
-                            game_state["obstacles"],
-                            game_state["portals"],
-                            game_state["powerups"],
-                            game_state.get("golden_food")
-                        )
-                        if new_food:
-                            new_foods.append(new_food)
-                        # Yılanın boyunu artır (yemi yediği için)
-                        if len(snake) > 0:
-                            snake.append(snake[-1])  # Kuyruğu uzat
-                            foods_eaten += 1  # Yenen yem sayısını artır
-                    else:
-                        new_foods.append((fx, fy))
-                
-                # Magnet efekti verilerini kaydet
-                if attracted_foods:
-                    magnet_effects[cid] = {
-                        "head_pos": head,
-                        "attracted_foods": attracted_foods
-                    }
-                
-                # Yenen yem sayısı kadar puan ekle
-                if foods_eaten > 0:
-                    game_state["scores"][cid] = game_state["scores"].get(cid, 0) + foods_eaten
-                game_state["food"] = new_foods
-        # Altın elma için magnet etkisi yok!
-        
-        # Time Attack yılanlarını hareket ettir
-        for client_id in list(time_attack_module.time_attack_games.keys()):
-            ta_game_state = time_attack_module.time_attack_games[client_id]
-            if ta_game_state["game_active"]:
-                # Yılan hız kontrolü - klasik moddaki gibi
-                if has_powerup_time_attack(client_id, "speed", ta_game_state):
-                    # Speed power-up varsa her tick'te hareket et
-                    pass
-                else:
-                    # Speed power-up yoksa her 2 tick'te bir hareket et
-                    if tick_count % 2 != 0:
-                        continue
-                # Yılan hareketi
-                head = ta_game_state["snake"][0]
-                direction = ta_game_state["direction"]
-                
-                # Yeni baş pozisyonu
-                if direction == "UP":
-                    new_head = (head[0], head[1] - 1)
-                elif direction == "DOWN":
-                    new_head = (head[0], head[1] + 1)
-                elif direction == "LEFT":
-                    new_head = (head[0] - 1, head[1])
-                elif direction == "RIGHT":
-                    new_head = (head[0] + 1, head[1])
-                else:
-                    continue
-                
-                # Çarpışma kontrolü (zırh etkisi ve duvardan geçiş)
-                shielded = has_powerup_time_attack(client_id, "shield", ta_game_state)
-                out_of_bounds = not (0 <= new_head[0] < BOARD_WIDTH and 0 <= new_head[1] < BOARD_HEIGHT)
-                if out_of_bounds:
-                    if shielded:
-                        # Shield aktifken duvardan geç, shield'i kaldırma
-                        nx, ny = new_head
-                        if nx < 0:
-                            nx = BOARD_WIDTH - 1
-                        elif nx >= BOARD_WIDTH:
-                            nx = 0
-                        if ny < 0:
-                            ny = BOARD_HEIGHT - 1
-                        elif ny >= BOARD_HEIGHT:
-                            ny = 0
-                        new_head = (nx, ny)
-                    else:
-                        # Zırh yoksa elen
-                        ta_game_state["game_active"] = False
-                        continue
-                
-                # Kendine çarpma kontrolü - yılanın kuyruğu hariç kontrol et
-                if new_head in ta_game_state["snake"][:-1]:  # Son eleman (kuyruk) hariç kontrol et
-                    if shielded:
-                        # Shield aktifken kendine çarpmadan geç, shield'i kaldırma
-                        pass
-                    else:
-                        # Zırh yoksa elen
-                        ta_game_state["game_active"] = False
-                        continue
-                
-                # Engel kontrolü
-                shielded = has_powerup_time_attack(client_id, "shield", ta_game_state)
-                if not shielded:
-                    for obs in ta_game_state["obstacles"]:
-                        if new_head == tuple(obs["pos"]):
-                            if obs["type"] == "hidden_wall":
-                                # Gizli duvar - elen
-                                ta_game_state["game_active"] = False
-                                continue
-                            elif obs["type"] == "grass":
-                                # Normal çalı - elen
-                                ta_game_state["game_active"] = False
-                                continue
-                
-                # Portal kontrolü
-                if ta_game_state.get("portals"):
-                    for portal in ta_game_state["portals"]:
-                        if new_head == portal[0]:
-                            # Portal A'dan B'ye ışınla
-                            new_head = portal[1]
-                            break
-                        elif new_head == portal[1]:
-                            # Portal B'den A'ya ışınla
-                            new_head = portal[0]
-                            break
-                
-                # Yem kontrolü
-                food_eaten = False
-                for i, food_pos in enumerate(ta_game_state["food"]):
-                    if new_head == food_pos:
-                        ta_game_state["score"] += 10
-                        ta_game_state["time_left"] += time_attack_module.TIME_ATTACK_CONSTANTS["FOOD_BONUS_TIME"]
-                        ta_game_state["food"].pop(i)
-                        food_eaten = True
-                        break
-                
-                # Altın elma kontrolü
-                if ta_game_state["golden_food"] and new_head == ta_game_state["golden_food"]:
-                    ta_game_state["score"] += 50
-                    ta_game_state["time_left"] += time_attack_module.TIME_ATTACK_CONSTANTS["GOLDEN_FOOD_BONUS_TIME"]
-                    ta_game_state["golden_food"] = None
-                
-                # Magnet power-up etkisi
-                if has_powerup_time_attack(client_id, "magnet", ta_game_state) and len(ta_game_state["snake"]) > 0:
-                    head = ta_game_state["snake"][0]
-                    # En yakın yemi bul ve çek
-                    closest_food = None
-                    min_dist = float('inf')
-                    for food_pos in ta_game_state["food"]:
-                        dist = abs(head[0] - food_pos[0]) + abs(head[1] - food_pos[1])
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_food = food_pos
-                    
-                    # En yakın yemi yılanın başına doğru hareket ettir
-                    if closest_food and min_dist > 1:
-                        dx = 0
-                        dy = 0
-                        if closest_food[0] > head[0]:
-                            dx = -1
-                        elif closest_food[0] < head[0]:
-                            dx = 1
-                        if closest_food[1] > head[1]:
-                            dy = -1
-                        elif closest_food[1] < head[1]:
-                            dy = 1
-                        
-                        new_food_pos = (closest_food[0] + dx, closest_food[1] + dy)
-                        # Yeni pozisyonun boş olduğunu kontrol et
-                        occupied = set()
-                        occupied.update(ta_game_state["snake"])
-                        occupied.update(ta_game_state["food"])
-                        for obs in ta_game_state["obstacles"]:
-                            occupied.add(tuple(obs["pos"]))
-                        for pu in ta_game_state["powerups"]:
-                            occupied.add(tuple(pu["pos"]))
-                        
-                        if new_food_pos not in occupied and 0 <= new_food_pos[0] < BOARD_WIDTH and 0 <= new_food_pos[1] < BOARD_HEIGHT:
-                            # Yemi yeni pozisyona taşı
-                            food_index = ta_game_state["food"].index(closest_food)
-                            ta_game_state["food"][food_index] = new_food_pos
-                
-                # Power-up kontrolü
-                for i, powerup in enumerate(ta_game_state["powerups"]):
-                    if new_head == tuple(powerup["pos"]):
-                        # Power-up aktivasyonu
-                        if client_id not in ta_game_state["active_powerups"]:
-                            ta_game_state["active_powerups"][client_id] = []
-                        ta_game_state["active_powerups"][client_id].append({"type": powerup["type"], "tick": time.time()})
-                        ta_game_state["powerups"].pop(i)
-                        ta_game_state["time_left"] += time_attack_module.TIME_ATTACK_CONSTANTS["POWERUP_BONUS_TIME"]
-                        break
-                
-                # Yılanı güncelle
-                ta_game_state["snake"].insert(0, new_head)
-                if not food_eaten:
-                    ta_game_state["snake"].pop()
-                
-                # Yılan uzunluğu kontrolü
-                if len(ta_game_state["snake"]) > time_attack_module.TIME_ATTACK_CONSTANTS["MAX_SNAKE_LENGTH"]:
-                    ta_game_state["snake"] = ta_game_state["snake"][:time_attack_module.TIME_ATTACK_CONSTANTS["MAX_SNAKE_LENGTH"]]
-                
-                # Yeni yem ekle
-                if food_eaten and len(ta_game_state["food"]) < time_attack_module.TIME_ATTACK_CONFIG["food_count"]:
-                    # Rastgele yem pozisyonu
-                    occupied = set()
-                    occupied.update(ta_game_state["snake"])
-                    occupied.update(ta_game_state["food"])
-                    for obs in ta_game_state["obstacles"]:
-                        occupied.add(tuple(obs["pos"]))
-                    for pu in ta_game_state["powerups"]:
-                        occupied.add(tuple(pu["pos"]))
-                    
-                    empty = [(x, y) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT) if (x, y) not in occupied]
-                    if empty:
-                        new_food = random.choice(empty)
-                        ta_game_state["food"].append(new_food)
-                
-                # Altın elma olasılığı
-                if random.random() < time_attack_module.TIME_ATTACK_CONFIG["golden_food_chance"] and not ta_game_state["golden_food"]:
-                    occupied = set()
-                    occupied.update(ta_game_state["snake"])
-                    occupied.update(ta_game_state["food"])
-                    for obs in ta_game_state["obstacles"]:
-                        occupied.add(tuple(obs["pos"]))
-                    for pu in ta_game_state["powerups"]:
-                        occupied.add(tuple(pu["pos"]))
-                    
-                    empty = [(x, y) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT) if (x, y) not in occupied]
-                    if empty:
-                        ta_game_state["golden_food"] = random.choice(empty)
-                
-                # Power-up olasılığı
-                if (len(ta_game_state["powerups"]) < time_attack_module.TIME_ATTACK_CONFIG["max_powerups"] and 
-                    random.random() < time_attack_module.TIME_ATTACK_CONSTANTS["POWERUP_SPAWN_CHANCE"]):  # %5 olasılık
-                    powerup_type = random.choice(time_attack_module.TIME_ATTACK_CONFIG["allowed_powerups"])
-                    occupied = set()
-                    occupied.update(ta_game_state["snake"])
-                    occupied.update(ta_game_state["food"])
-                    for obs in ta_game_state["obstacles"]:
-                        occupied.add(tuple(obs["pos"]))
-                    for pu in ta_game_state["powerups"]:
-                        occupied.add(tuple(pu["pos"]))
-                    
-                    empty = [(x, y) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT) if (x, y) not in occupied]
-                    if empty:
-                        powerup_pos = random.choice(empty)
-                        ta_game_state["powerups"].append({"pos": powerup_pos, "type": powerup_type})
-                    else:
-                        pass
-                else:
-                    if len(ta_game_state["powerups"]) >= time_attack_module.TIME_ATTACK_CONFIG["max_powerups"]:
-                        pass
-                    elif random.random() >= time_attack_module.TIME_ATTACK_CONSTANTS["POWERUP_SPAWN_CHANCE"]:
-                        pass
-        
-        # State'leri gönder
-        for sid, client_id in list(clients.items()):
-            # Klasik mod state'i
-            state_copy = copy.deepcopy(game_state)
-            # Geri sayım süresi her zaman set edilmeli
-            if game_timer is not None and not waiting_for_restart:
-                state_copy["time_left"] = max(0, int(GAME_DURATION - (now - game_timer)))
-            else:
-                state_copy["time_left"] = 0
-            state_copy["winner_id"] = winner_id
-            state_copy["waiting_for_restart"] = waiting_for_restart
-            state_copy["powerup_timers"] = {}
-            state_copy["boost_info"] = {}
-            for cid2 in state_copy["snakes"].keys():
-                timers = {}
-                for ptype in ["speed","shield","invisible","reverse"]:
-                    tleft = get_powerup_timeleft(cid2, ptype)
-                    if tleft > 0:
-                        timers[ptype] = tleft
-                if timers:
-                    state_copy["powerup_timers"][cid2] = timers
-                
-                # Boost bilgilerini ekle
-                boost_info = get_boost_info(cid2)
-                state_copy["boost_info"][cid2] = boost_info
-            state_copy["golden_food"] = game_state["golden_food"]
-            # Magnet efektlerini ekle
-            if magnet_effects:
-                state_copy["magnet_effects"] = magnet_effects
-            for cid2 in list(state_copy["snakes"].keys()):
-                if has_powerup(cid2, "invisible") and cid2 != client_id:
-                    state_copy["snakes"][cid2] = []
-            socketio.emit('state', state_copy, room=sid)
-            
-            # Time Attack state'i
-            if client_id in time_attack_module.time_attack_games:
-                ta_state = copy.deepcopy(time_attack_module.time_attack_games[client_id])
-                socketio.emit('time_attack_state', ta_state, room=sid)
-        
-        
-        
-        tick_count += 1
-        socketio.sleep(TICK_RATE)
+        tick_clock.begin_tick()
+        tick_profiler.start_tick()
+        bus.poll()
+        for sid, blocked in outbound_monitor.poll():
+            dispatch('backpressure', sid, {"blocked": blocked})
+        if worker_pool is None:
+            emit_messages(host.tick(tick_profiler))
+        else:
+            # Worker'lar kendi saatleriyle tick'ler; burada sadece hazır çerçeveler yayınlanır
+            for messages in worker_pool.poll(sid_rooms):
+                emit_messages(messages)
+        tick_profiler.mark("emit")
+
+        # Bir sonraki tick'in mutlak hedef zamanına kadar uyu (geride kalındıysa 0)
+        socketio.sleep(tick_clock.end_tick())
 
 # --- Flask ve SocketIO sunucu kurulumu ---
 app = Flask(__name__, static_folder='.', static_url_path='')
@@ -1319,66 +122,119 @@ def index():
 def send_assets(path):
     return send_from_directory('assets', path)
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Faz süreleri ve yayın istatistikleri (Prometheus metni, ?format=json ile JSON)"""
+    gauges = {
+        "connected_clients": len(clients),
+        "rooms": len(set(sid_rooms.values())),
+        "classic_viewers": len(sid_rooms),
+        "time_attack_games": len(time_attack_sids),
+        "room_workers": ROOM_WORKERS,
+        "cluster_clients": len(directory.sessions),
+    }
+    gauges.update(outbound_monitor.stats())
+    args = (tick_profiler, emit_stats, gauges, tick_clock.stats(), outbound_monitor.counters())
+    if request.args.get('format') == 'json':
+        # Bağlantı başına kuyruk derinliği ve birleştirilen çerçeve sayaçları sadece JSON'da
+        return jsonify(dict(metrics.render_json(*args), outbound=outbound_monitor.clients))
+    return Response(metrics.render_prometheus(*args), mimetype='text/plain; version=0.0.4')
+
+def requested_send_rate(data):
+    """İstemcinin istediği state gönderim hızı (Hz), geçersizse None"""
+    rate = data.get('send_rate')
+    if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 < rate <= 1 / TICK_RATE:
+        return None
+    return rate
+
+ROOM_ID_MAX_LENGTH = 32
+
+def normalize_room_id(room_id):
+    """İstemcinin istediği oda numarasını str'e çevir; kısa ASCII harf/rakam değilse None"""
+    if isinstance(room_id, bool) or not isinstance(room_id, (str, int)):
+        return None
+    room_id = str(room_id)
+    if not (room_id.isascii() and room_id.isalnum()) or len(room_id) > ROOM_ID_MAX_LENGTH:
+        return None
+    return room_id
+
 # --- Flask-SocketIO event handler'ları ---
 @socketio.on('join')
 def on_join(data):
     client_id = data.get('client_id')
     sid = request.sid
-    if client_id in game_state["snakes"]:
+    if directory.name_in_room(client_id, sid):
         emit('error', {"message": "Bu kullanıcı adı zaten oyunda!"})
         disconnect()
         return
-    reset_snake(client_id)
+    # Oda numarası worker yönlendirmesinde ve oda sözlüğünde anahtar olur: 5 ile "5" aynı oda
+    room_id = data.get('room')
+    if room_id is None or room_id == '':
+        room_id = None
+    else:
+        room_id = normalize_room_id(room_id)
+        if room_id is None:
+            emit('error', {"message": "Geçersiz oda numarası!"})
+            return
+    owner = directory.room_instance(room_id)
+    if owner is not None and owner != bus.instance_id:
+        emit('error', {"message": "Bu oda başka bir sunucuda!", "instance": owner})
+        return
+    previous_client_id = clients.get(sid)
     clients[sid] = client_id
-    # İlk oyuncu klasik moda girince süreyi başlat (sonraki oyuncularda sıfırlama yapma)
-    global game_timer
-    if game_timer is None:
-        reset_game()
+    directory.register(sid, client_id, sid_rooms.get(sid))
+    outbound_monitor.add(sid)
+    if worker_pool is not None:
+        # İstenen oda numarası her zaman aynı worker'a düşer; eski worker'daki oda, replay
+        # ve Time Attack oturumu bağlantı kopmuş gibi temizlenir
+        previous = worker_pool.sid_workers.get(sid)
+        if previous is not None and room_id and previous != worker_pool.worker_for_room(room_id):
+            worker_pool.send(sid, 'disconnect', {"client_id": previous_client_id})
+            time_attack_sids.discard(sid)
+        if previous is None or room_id:
+            worker_pool.assign(sid, room_id)
+    dispatch('join', sid, {"client_id": client_id, "binary": bool(data.get('binary')), "room": room_id,
+                           "arena": bool(data.get('arena')), "send_rate": requested_send_rate(data)})
 
 @socketio.on('move')
 def on_move(data):
-    client_id = data.get('client_id')
+    # Geçersiz yön baş hücreyi yerinde bırakıp kendi kendine çarpma sayılırdı: hamle yok sayılır
     direction = data.get('direction')
-    enqueue_move({"client_id": client_id, "direction": direction})
+    if not isinstance(direction, str) or direction not in OPPOSITE_DIRECTIONS:
+        return
+    # seq: istemci tahmini için sıra numarası; state'teki input_acks ile onaylanır
+    seq = data.get('seq')
+    if not isinstance(seq, int) or isinstance(seq, bool):
+        seq = None
+    dispatch('move', request.sid, {"client_id": data.get('client_id'), "direction": direction, "seq": seq})
+
+@socketio.on('request_map')
+def on_request_map(data=None):
+    dispatch('request_map', request.sid)
+
+@socketio.on('request_keyframe')
+def on_request_keyframe(data=None):
+    dispatch('request_keyframe', request.sid)
 
 @socketio.on('restart')
 def on_restart(data):
-    client_id = data.get('client_id')
-    reset_snake(client_id)
-    # Oyun durumunu hemen güncelle
-    if client_id in game_state["active"]:
-        game_state["active"][client_id] = True
+    dispatch('restart', request.sid, {"client_id": data.get('client_id')})
 
 @socketio.on('ready')
 def on_ready(data):
-    client_id = data.get('client_id')
-    if "ready" not in game_state:
-        game_state["ready"] = {}
-    game_state["ready"][client_id] = True
+    dispatch('ready', request.sid, {"client_id": data.get('client_id')})
 
 @socketio.on('activate_boost')
 def on_activate_boost(data):
-    client_id = data.get('client_id')
-    if client_id and client_id in game_state["snakes"]:
-        success = activate_boost(client_id)
-        if success:
-            emit('boost_activated', {"success": True})
-        else:
-            emit('boost_activated', {"success": False, "message": "Boost kullanılamıyor"})
+    dispatch('activate_boost', request.sid, {"client_id": data.get('client_id')})
 
 @socketio.on('deactivate_boost')
 def on_deactivate_boost(data):
-    client_id = data.get('client_id')
-    if client_id and client_id in game_state["snakes"]:
-        deactivate_boost(client_id)
-        emit('boost_deactivated', {"success": True})
+    dispatch('deactivate_boost', request.sid, {"client_id": data.get('client_id')})
 
 @socketio.on('easteregg')
 def on_easteregg(data):
-    for cid in list(game_state["snakes"].keys()):
-        eliminate_snake(cid)
-    # Tüm istemcilere eagle egg gösterme eventi gönder
-    socketio.emit('show_eagle_egg')
+    dispatch('easteregg', request.sid)
 
 # --- Time Attack Event Handler'ları ---
 @socketio.on('start_time_attack')
@@ -1386,131 +242,71 @@ def on_start_time_attack(data):
     client_id = data.get('client_id')
     difficulty = data.get('difficulty')
     sid = request.sid  # sid'yi burada tanımla
-    
+
     # Client ID kontrolü
     if not client_id or client_id == 'null' or client_id == '':
         emit('error', {"message": "Invalid username!"})
         return
-    
+
     if difficulty not in time_attack_module.TIME_ATTACK_CONFIG["difficulties"]:
         emit('error', {"message": "Invalid difficulty level!"})
         return
-    
-    # Time Attack oyunu oluştur
-    time_attack_module.create_time_attack_game(client_id, difficulty, BOARD_WIDTH, BOARD_HEIGHT)
+
     clients[sid] = client_id  # clients dictionary'sine ekle
-    emit('time_attack_started', {"difficulty": difficulty, "time": time_attack_module.TIME_ATTACK_CONFIG["difficulties"][difficulty]["time"]})
+    directory.register(sid, client_id, sid_rooms.get(sid))
+    outbound_monitor.add(sid)
+    time_attack_sids.add(sid)
+    if worker_pool is not None and sid not in worker_pool.sid_workers:
+        worker_pool.assign(sid)
+    # Time Attack oyunu oluştur
+    dispatch('start_time_attack', sid, {"client_id": client_id, "difficulty": difficulty, "binary": bool(data.get('binary'))})
 
 @socketio.on('time_attack_move')
 def on_time_attack_move(data):
-    client_id = data.get('client_id')
     direction = data.get('direction')
-    
-    if client_id not in time_attack_module.time_attack_games:
-        return
-    
-    game_state = time_attack_module.time_attack_games[client_id]
-    
-    # Ters kontrol power-up kontrolü
-    if has_powerup_time_attack(client_id, "reverse", game_state):
-        OPP = {"UP":"DOWN","DOWN":"UP","LEFT":"RIGHT","RIGHT":"LEFT"}
-        direction = OPP.get(direction, direction)
-    
-    # Yön kontrolü - ters yön kontrolü
-    current_dir = game_state["direction"]
-    OPPOSITE_DIRECTIONS = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
-    if OPPOSITE_DIRECTIONS.get(current_dir) == direction:
+    if not isinstance(direction, str) or direction not in OPPOSITE_DIRECTIONS:
         return
-    
-    # Kendine çarpma kontrolü - yeni yön yılanın kendi vücuduna çarpar mı?
-    snake = game_state["snake"]
-    if len(snake) > 1:
-        head_x, head_y = snake[0]
-        if direction == "UP":
-            new_head = (head_x, head_y - 1)
-        elif direction == "DOWN":
-            new_head = (head_x, head_y + 1)
-        elif direction == "LEFT":
-            new_head = (head_x - 1, head_y)
-        elif direction == "RIGHT":
-            new_head = (head_x + 1, head_y)
-        
-        # Yeni baş pozisyonu yılanın mevcut vücuduyla çakışıyor mu?
-        if new_head in snake[1:]:
-            return  # Bu hareketi atla, yılan kendine çarpar
-    
-    game_state["direction"] = direction
+    dispatch('time_attack_move', request.sid, {"client_id": data.get('client_id'), "direction": direction})
 
 @socketio.on('time_attack_respawn')
 def on_time_attack_respawn(data):
-    client_id = data.get('client_id')
-    
-    if client_id not in time_attack_module.time_attack_games:
+    dispatch('time_attack_respawn', request.sid, {"client_id": data.get('client_id')})
+
+# --- Maç kaydı izleme (REPLAY_DIR) ---
+@socketio.on('watch_replay')
+def on_watch_replay(data):
+    sid = request.sid
+    name = data.get('name')
+    tick = data.get('tick')
+    if not isinstance(name, str) or (tick is not None and not isinstance(tick, int)):
+        emit('error', {"message": "Geçersiz kayıt isteği!"})
         return
-    
-    game_state = time_attack_module.time_attack_games[client_id]
-    
-    # Canlanma - 3 blok uzunluğunda yılan
-    center_x = BOARD_WIDTH//2
-    center_y = BOARD_HEIGHT//2
-    game_state["snake"] = [
-        (center_x, center_y),
-        (center_x-1, center_y),
-        (center_x-2, center_y)
-    ]
-    game_state["direction"] = "RIGHT"
-    game_state["respawn_count"] += 1
-    game_state["game_active"] = True  # Oyunu tekrar aktif hale getir
+    client_id = data.get('client_id') or 'replay'
+    clients[sid] = client_id
+    directory.register(sid, client_id, sid_rooms.get(sid))
+    outbound_monitor.add(sid)
+    if worker_pool is not None and sid not in worker_pool.sid_workers:
+        worker_pool.assign(sid)
+    dispatch('watch_replay', sid, {"name": name, "tick": tick, "client_id": client_id, "binary": bool(data.get('binary')),
+                                   "send_rate": requested_send_rate(data)})
+
+@socketio.on('replay_control')
+def on_replay_control(data):
+    control = {}
+    if isinstance(data.get('tick'), int):
+        control["tick"] = data['tick']
+    if 'paused' in data:
+        control["paused"] = bool(data['paused'])
+    dispatch('replay_control', request.sid, control)
+
+@socketio.on('stop_replay')
+def on_stop_replay(data=None):
+    dispatch('stop_replay', request.sid)
 
 # --- Chat sistemi fonksiyonları ---
-def add_chat_message(player_id, player_name, message, message_type="global", target_player=None):
-    """Chat mesajı ekle ve spam koruması uygula"""
-    current_time = time.time()
-    
-    # Spam koruması
-    if player_id in chat_throttle:
-        if current_time - chat_throttle[player_id] < CHAT_THROTTLE_TIME:
-            return False, "Çok hızlı mesaj gönderiyorsunuz!"
-    
-    chat_throttle[player_id] = current_time
-    
-    # Oyuncu rengini al - socket ID'den client ID'ye çevir
-    client_id = clients.get(player_id)
-    player_color = game_state["colors"].get(client_id, "#ffffff") if client_id else "#ffffff"
-    
-    chat_data = {
-        "sender_id": player_id,
-        "sender_name": player_name,
-        "sender_color": player_color,
-        "message": message,
-        "type": message_type,
-        "timestamp": current_time
-    }
-    
-    if message_type == "whisper" and target_player:
-        chat_data["target_player"] = target_player
-    
-    chat_messages.append(chat_data)
-    
-    # Maksimum mesaj sayısını kontrol et
-    if len(chat_messages) > MAX_CHAT_MESSAGES:
-        chat_messages.pop(0)
-    
-    return True, chat_data
-
-def clear_chat_messages():
-    """Chat mesajlarını temizle"""
-    global chat_messages
-    chat_messages.clear()
-
 def get_player_by_name(player_name):
-    """İsim ile oyuncu socket ID'sini bul"""
-    for sid, nickname in clients.items():
-        if nickname == player_name:
-            return sid
-    return None
-
-# --- Capture the Flag Event Handler'ları ---
+    """İsim ile oyuncu socket ID'sini bul (diğer örnekler dahil)"""
+    return directory.find_by_name(player_name)
 
 # --- Chat Event Handler'ları ---
 @socketio.on('chat_message')
@@ -1519,11 +315,11 @@ def on_chat_message(data):
     sid = request.sid
     player_name = data.get('player_name')
     message = data.get('message', '').strip()
-    
+
     if not message or not player_name:
         emit('chat_error', {"message": "Invalid message!"})
         return
-    
+
     # Whisper kontrolü (/dm username message)
     if message.startswith('/dm '):
         parts = message.split(' ', 2)
@@ -1531,66 +327,50 @@ def on_chat_message(data):
             target_name = parts[1]
             whisper_message = parts[2]
             target_id = get_player_by_name(target_name)
-            
+
             if not target_id:
                 emit('chat_error', {"message": f"Player '{target_name}' not found!"})
                 return
-            
+
             if target_id == sid:
                 emit('chat_error', {"message": "Kendinize fısıldayamazsınız!"})
                 return
-            
-            success, chat_data = add_chat_message(sid, player_name, whisper_message, "whisper", target_id)
-            if success:
-                # Sadece gönderen ve alıcıya gönder
-                emit('chat_message', chat_data)
-                socketio.emit('chat_message', chat_data, room=target_id)
-            else:
-                emit('chat_error', {"message": chat_data})
+
+            # Sadece gönderen ve alıcıya gönderilir
+            dispatch('chat', sid, {"player_name": player_name, "message": whisper_message, "target": target_id})
         else:
             emit('chat_error', {"message": "Fısıldama formatı: /dm kullanıcı_adı mesaj"})
         return
-    
-    # Global mesaj
-    success, chat_data = add_chat_message(sid, player_name, message, "global")
-    if success:
-        socketio.emit('chat_message', chat_data)
-    else:
-        emit('chat_error', {"message": chat_data})
+
+    # Oda mesajı (odada değilse lobi)
+    dispatch('chat', sid, {"player_name": player_name, "message": message})
 
 @socketio.on('get_chat_history')
 def on_get_chat_history():
     """Chat geçmişini gönder"""
-    emit('chat_history', chat_messages)
+    dispatch('chat_history', request.sid)
 
 @socketio.on('disconnect')
 def on_disconnect():
     sid = request.sid
-    client_id = clients.get(sid)
-    if client_id:
-        # Klasik mod temizliği
-        game_state["snakes"].pop(client_id, None)
-        game_state["directions"].pop(client_id, None)
-        game_state["active"].pop(client_id, None)
-        game_state["colors"].pop(client_id, None)
-        game_state["scores"].pop(client_id, None)
-        if "active_powerups" in game_state:
-            game_state["active_powerups"].pop(client_id, None)
-        if "boost_system" in game_state:
-            game_state["boost_system"].pop(client_id, None)
-        
-        # Time Attack temizliği
-        time_attack_module.remove_time_attack_game(client_id)
-        
-
-    
-    clients.pop(sid, None)
+    client_id = clients.pop(sid, None)
+    # Klasik mod ve Time Attack temizliği
+    dispatch('disconnect', sid, {"client_id": client_id})
+    if worker_pool is not None:
+        worker_pool.release(sid)
+    sid_rooms.pop(sid, None)
+    time_attack_sids.discard(sid)
+    outbound_monitor.remove(sid)
+    directory.unregister(sid)
 
 # --- Oyun döngüsünü başlat ---
 def start_game_loop():
+    global worker_pool
+    if ROOM_WORKERS:
+        worker_pool = WorkerPool(ROOM_WORKERS, TICK_RATE)
     socketio.start_background_task(game_loop)
 
 if __name__ == "__main__":
     start_game_loop()
     port = int(os.environ.get("PORT", 8000))
-    socketio.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    socketio.run(app, host="0.0.0.0", port=port)
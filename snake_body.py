@@ -0,0 +1,105 @@
+# --- SNAKE BODY MODÜLÜ ---
+# Yılan gövdesi için deque + hücre çoklu kümesi (multiset) tabanlı tip.
+# Baş ekleme, kuyruk silme ve üyelik testi O(1); büyüme ve kırpma yalnızca
+# değişen hücre sayısı kadar iş yapar. Gövde bir BoardGrid'e bağlıysa her
+# değişiklik ızgaraya da yansıtılır, böylece çağıran taraf ayrıca
+# add_snake_cell/remove_snake_cell çağırmak zorunda kalmaz.
+from collections import Counter, deque
+
+
+class SnakeBody:
+    """Baştan kuyruğa sıralı yılan hücreleri"""
+    __slots__ = ("cells", "counts", "owner", "grid")
+
+    def __init__(self, cells=(), owner=None, grid=None):
+        self.cells = deque(tuple(cell) for cell in cells)
+        self.counts = Counter(self.cells)
+        self.owner = owner
+        self.grid = grid
+        if grid is not None:
+            grid.set_snake(owner, self.cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __contains__(self, cell):
+        return self.counts[tuple(cell)] > 0
+
+    def __getitem__(self, i):
+        # deque uçlarda O(1) indekslenir (snake[0], snake[-1])
+        return self.cells[i]
+
+    def __eq__(self, other):
+        if isinstance(other, SnakeBody):
+            return self.cells == other.cells
+        return list(self.cells) == list(other)
+
+    def __repr__(self):
+        return "SnakeBody(%r)" % list(self.cells)
+
+    def __deepcopy__(self, memo):
+        # Kopya ızgaraya bağlı değildir, sadece hücreleri taşır
+        return SnakeBody(self.cells)
+
+    @property
+    def head(self):
+        return self.cells[0]
+
+    @property
+    def tail(self):
+        return self.cells[-1]
+
+    def push_head(self, cell):
+        cell = tuple(cell)
+        self.cells.appendleft(cell)
+        self.counts[cell] += 1
+        if self.grid is not None:
+            self.grid.add_snake_cell(self.owner, cell)
+
+    def pop_tail(self):
+        cell = self.cells.pop()
+        self._forget(cell)
+        return cell
+
+    def set_head(self, cell):
+        """Baş hücresini yerinde değiştir"""
+        self._forget(self.cells.popleft())
+        self.push_head(cell)
+
+    def grow(self, n=1):
+        """Kuyruğu n hücre uzat (yeni hücreler kuyrukla aynı yerde başlar)"""
+        tail = self.cells[-1]
+        for _ in range(n):
+            self.cells.append(tail)
+            self.counts[tail] += 1
+            if self.grid is not None:
+                self.grid.add_snake_cell(self.owner, tail)
+
+    def truncate(self, max_length):
+        """Uzunluğu max_length'e indir"""
+        while len(self.cells) > max_length:
+            self.pop_tail()
+
+    def body_contains(self, cell):
+        """Hücre kuyruk hariç gövdede mi (kuyruk bu hamlede boşalacak)"""
+        cell = tuple(cell)
+        count = self.counts[cell]
+        if count and self.cells[-1] == cell:
+            count -= 1
+        return count > 0
+
+    def to_list(self):
+        """Tel formatı için hücre listesi"""
+        return list(self.cells)
+
+    def _forget(self, cell):
+        count = self.counts[cell] - 1
+        if count:
+            self.counts[cell] = count
+        else:
+            del self.counts[cell]
+        if self.grid is not None:
+            self.grid.remove_snake_cell(self.owner, cell)
@@ -0,0 +1,93 @@
+# --- STATE DELTA MODÜLÜ ---
+# Klasik mod state yayınını tam kopya yerine fark (delta) olarak göndermek için
+# yardımcı fonksiyonlar. İstemci tarafındaki karşılığı web_client.html içindeki
+# applyStateFrame fonksiyonudur. Çerçevelerdeki tick ve ts (sunucu zamanı, ms)
+# istemcinin interpolasyon tamponunu besler.
+
+# Oyuncu id'si ile anahtarlanan sözlük alanları - bunlar oyuncu bazında yamalanır
+PLAYER_KEYED_FIELDS = (
+    "snakes", "directions", "active", "colors", "color_info", "scores",
+    "active_powerups", "trails", "boost_system", "boost_info",
+    "powerup_timers", "ready", "magnet_effects", "input_acks", "snake_dots",
+)
+
+# Bir tick'te yılan başına en fazla bu kadar yeni baş hücresi yamalanır
+MAX_SNAKE_HEAD_PATCH = 2
+
+
+def diff_snake(old, new):
+    """Yılan için baş/kuyruk yaması döndür, mümkün değilse None"""
+    new_len = len(new)
+    for k in range(min(MAX_SNAKE_HEAD_PATCH, new_len) + 1):
+        kept = new_len - k
+        if kept <= len(old) and new[k:] == old[:kept]:
+            return {"h": new[:k], "n": new_len}
+    return None
+
+
+def _diff_player_map(old, new, patch_values=None):
+    """Oyuncu bazlı sözlükler için set/del yaması üret"""
+    changed = {}
+    patches = {}
+    for cid, value in new.items():
+        if cid not in old:
+            changed[cid] = value
+        elif old[cid] != value:
+            patch = patch_values(old[cid], value) if patch_values else None
+            if patch is not None:
+                patches[cid] = patch
+            else:
+                changed[cid] = value
+    removed = [cid for cid in old if cid not in new]
+    if not changed and not patches and not removed:
+        return None
+    result = {}
+    if changed:
+        result["set"] = changed
+    if patches:
+        result["patch"] = patches
+    if removed:
+        result["del"] = removed
+    return result
+
+
+def make_keyframe(tick, state, ts=None):
+    """Tam state içeren anahtar kare (ts: sunucu zaman damgası, ms)"""
+    frame = {"tick": tick, "keyframe": True, "state": state}
+    if ts is not None:
+        frame["ts"] = ts
+    return frame
+
+
+def is_empty(frame):
+    """Delta çerçevesi hiçbir değişiklik taşımıyor mu"""
+    return not frame["keyframe"] and not ("set" in frame or "players" in frame or "del" in frame)
+
+
+def make_delta(tick, base_tick, prev, curr, ts=None):
+    """İki state arasındaki farkı delta çerçevesi olarak döndür"""
+    frame = {"tick": tick, "base": base_tick, "keyframe": False}
+    if ts is not None:
+        frame["ts"] = ts
+    set_fields = {}
+    players = {}
+    for key, value in curr.items():
+        old = prev.get(key)
+        if old is value and key in prev:
+            continue  # Room.build_state değişmeyen alanları önceki tick'ten paylaşır
+        if key in PLAYER_KEYED_FIELDS and isinstance(value, dict) and isinstance(old, dict):
+            if old == value:
+                continue
+            patch = _diff_player_map(old, value, diff_snake if key == "snakes" else None)
+            if patch:
+                players[key] = patch
+        elif key not in prev or old != value:
+            set_fields[key] = value
+    removed = [key for key in prev if key not in curr]
+    if set_fields:
+        frame["set"] = set_fields
+    if players:
+        frame["players"] = players
+    if removed:
+        frame["del"] = removed
+    return frame
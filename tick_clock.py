@@ -0,0 +1,77 @@
+# --- TICK CLOCK MODÜLÜ ---
+# Oyun döngüsü için sabit adımlı zamanlayıcı. Her tick'in bitişten sonra
+# TICK_RATE kadar uyumak yerine monotonic saat üzerindeki mutlak bir hedef
+# zamana (deadline) göre uyunur; böylece simülasyon ve yayın süresi tick
+# periyoduna eklenmez. Geride kalınırsa en fazla max_catch_up tick beklemeden
+# arka arkaya çalıştırılır, daha fazlası atlanıp hedef ileri kaydırılır.
+import time
+
+# Bir gecikmede beklemeden yetişilmeye çalışılacak en fazla tick sayısı
+MAX_CATCH_UP_TICKS = 5
+
+
+class TickClock:
+    """Mutlak hedef zamanlı, gecikme ve taşma sayaçlı tick saati"""
+    def __init__(self, period, max_catch_up=MAX_CATCH_UP_TICKS, clock=time.monotonic):
+        self.period = period
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.deadline = None      # mevcut tick'in planlanan başlangıcı
+        self.tick_start = 0.0
+        # Sayaçlar
+        self.ticks = 0            # tamamlanan tick sayısı
+        self.overruns = 0         # süresi periyodu aşan tick sayısı
+        self.caught_up = 0        # beklemeden hemen çalıştırılan tick sayısı
+        self.skipped = 0          # hiç çalıştırılmadan atlanan tick sayısı
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_lateness = 0.0  # tick'in planlanan zamandan ne kadar geç başladığı
+        self.max_lateness = 0.0
+
+    def begin_tick(self):
+        """Tick başlangıcını kaydet"""
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+        self.tick_start = now
+        self.last_lateness = max(0.0, now - self.deadline)
+        if self.last_lateness > self.max_lateness:
+            self.max_lateness = self.last_lateness
+
+    def end_tick(self):
+        """Tick'i bitir ve bir sonraki tick'e kadar uyunacak süreyi döndür"""
+        now = self.clock()
+        duration = now - self.tick_start
+        self.ticks += 1
+        self.last_duration = duration
+        self.total_duration += duration
+        if duration > self.max_duration:
+            self.max_duration = duration
+        if duration > self.period:
+            self.overruns += 1
+        self.deadline += self.period
+        if now < self.deadline:
+            return self.deadline - now
+        # Geride kaldık: kaçırılan tick sayısı sınırı aşıyorsa fazlasını atla
+        behind = int((now - self.deadline) // self.period)
+        if behind >= self.max_catch_up:
+            skip = behind - self.max_catch_up + 1
+            self.skipped += skip
+            self.deadline += skip * self.period
+        self.caught_up += 1
+        return 0.0
+
+    def stats(self):
+        """Sayaçların anlık görüntüsü"""
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "caught_up": self.caught_up,
+            "skipped": self.skipped,
+            "last_duration": self.last_duration,
+            "max_duration": self.max_duration,
+            "avg_duration": self.total_duration / self.ticks if self.ticks else 0.0,
+            "last_lateness": self.last_lateness,
+            "max_lateness": self.max_lateness,
+        }
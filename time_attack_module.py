@@ -1,10 +1,12 @@
 # --- TIME ATTACK MODU MODÜLÜ ---
 import random
-import time
 import copy
 
 # Time Attack konfigürasyonu (common.py'dan alınacak)
-from common import TIME_ATTACK_DIFFICULTIES, TIME_ATTACK_CONSTANTS, TIME_ATTACK_ALLOWED_POWERUPS, get_snake_color_info
+from common import TICK_RATE, TIME_ATTACK_DIFFICULTIES, TIME_ATTACK_CONSTANTS, TIME_ATTACK_ALLOWED_POWERUPS, get_snake_color_info, seconds_to_ticks
+from board_grid import BoardGrid
+from snake_body import SnakeBody
+from effects import EffectScheduler
 
 TIME_ATTACK_CONFIG = {
     "difficulties": TIME_ATTACK_DIFFICULTIES,
@@ -17,9 +19,17 @@ TIME_ATTACK_CONFIG = {
 
 # Time Attack oyun durumları
 time_attack_games = {}  # {client_id: game_state}
+time_attack_grids = {}  # {client_id: BoardGrid} - doluluk ve boş hücre indeksi
+time_attack_effects = EffectScheduler()  # Tüm Time Attack oyunlarının süreli power-up'ları (bitiş tick'i)
+time_attack_rngs = {}  # {client_id: random.Random} - oyun başına seed'li rastgelelik
+time_attack_tick = 0  # update_all_time_attack_games her çağrıda bir artırır
+# Power-up süresi (tick)
+POWERUP_DURATION_TICKS = seconds_to_ticks(TIME_ATTACK_CONSTANTS["POWERUP_DURATION"])
 
 class TimeAttackGame:
-    def __init__(self, client_id, difficulty, board_width, board_height):
+    def __init__(self, client_id, difficulty, board_width, board_height, seed=None):
+        # Aynı seed aynı başlangıç pozisyonu, yem, engel ve portalları verir
+        self.rng = random.Random(seed)
         self.client_id = client_id
         self.difficulty = difficulty
         self.board_width = board_width
@@ -38,8 +48,10 @@ class TimeAttackGame:
             (start_pos[0]-2, start_pos[1])     # Üçüncü blok
         ]
         
+        self.grid = BoardGrid(board_width, board_height)
+        
         self.game_state = {
-            "snake": initial_snake,
+            "snake": SnakeBody(initial_snake, client_id, self.grid),
             "direction": "RIGHT",
             "food": [],
             "golden_food": None,
@@ -50,7 +62,7 @@ class TimeAttackGame:
             "score": 0,
             "time_left": self.config["time"],
             "difficulty": difficulty,
-            "start_time": time.time(),
+            "start_tick": time_attack_tick,
             "game_active": True,
             "high_score": 0,
             "respawn_count": 0,
@@ -65,6 +77,9 @@ class TimeAttackGame:
         self._place_obstacles()
         self._place_portals()
         time_attack_games[client_id] = self.game_state
+        time_attack_grids[client_id] = self.grid
+        time_attack_rngs[client_id] = self.rng
+        time_attack_effects.clear_player(client_id)
     
     def _find_safe_start_position(self):
         """Güvenli başlangıç pozisyonu bul"""
@@ -75,8 +90,8 @@ class TimeAttackGame:
         
         # Rastgele pozisyonlar dene
         for _ in range(50):  # 50 deneme
-            x = random.choice(safe_x_range)
-            y = random.choice(safe_y_range)
+            x = self.rng.choice(safe_x_range)
+            y = self.rng.choice(safe_y_range)
             
             # Bu pozisyon ve sağındaki 2 hücrenin boş olduğunu kontrol et
             positions = [(x, y), (x-1, y), (x-2, y)]
@@ -92,6 +107,7 @@ class TimeAttackGame:
         for _ in range(TIME_ATTACK_CONFIG["food_count"]):
             food_pos = self._random_food()
             self.game_state["food"].append(food_pos)
+            self.grid.add_food(food_pos)
     
     def _place_obstacles(self):
         """Engelleri yerleştir"""
@@ -101,43 +117,24 @@ class TimeAttackGame:
         
         # Çalı engelleri yerleştir
         for _ in range(slow_count):
-            occupied = set()
-            occupied.update(self.game_state["snake"])
-            occupied.update(self.game_state["food"])
-            for obs in self.game_state["obstacles"]:
-                occupied.add(tuple(obs["pos"]))
-            
-            empty = [(x, y) for x in range(self.board_width) for y in range(self.board_height) 
-                    if (x, y) not in occupied]
-            if empty:
-                pos = random.choice(empty)
-                self.game_state["obstacles"].append({"pos": pos, "type": "slow"})
+            self._place_obstacle("slow")
         
         # Enemy engelleri yerleştir
         for _ in range(enemy_count):
-            occupied = set()
-            occupied.update(self.game_state["snake"])
-            occupied.update(self.game_state["food"])
-            for obs in self.game_state["obstacles"]:
-                occupied.add(tuple(obs["pos"]))
-            
-            empty = [(x, y) for x in range(self.board_width) for y in range(self.board_height) 
-                    if (x, y) not in occupied]
-            if empty:
-                pos = random.choice(empty)
-                self.game_state["obstacles"].append({"pos": pos, "type": "enemy"})
+            self._place_obstacle("enemy")
+    
+    def _place_obstacle(self, obstacle_type):
+        """Boş bir hücreye engel koy"""
+        pos = self.grid.random_free_cell(self.rng)
+        if pos is not None:
+            obs = {"pos": pos, "type": obstacle_type}
+            self.game_state["obstacles"].append(obs)
+            self.grid.add_obstacle(obs)
     
     def _place_portals(self):
         """Portalları yerleştir"""
         # Boş hücreleri bul
-        occupied = set()
-        occupied.update(self.game_state["snake"])
-        occupied.update(self.game_state["food"])
-        for obs in self.game_state["obstacles"]:
-            occupied.add(tuple(obs["pos"]))
-        
-        empty = [(x, y) for x in range(self.board_width) for y in range(self.board_height) 
-                if (x, y) not in occupied]
+        empty = self.grid.free_cells()
         
         if len(empty) < 2:
             return
@@ -147,33 +144,26 @@ class TimeAttackGame:
         tries = 20
         
         for _ in range(tries):
-            a = random.choice(empty)
+            a = self.rng.choice(empty)
             far_cells = [cell for cell in empty if abs(cell[0]-a[0]) + abs(cell[1]-a[1]) >= min_dist]
             if far_cells:
-                b = random.choice(far_cells)
+                b = self.rng.choice(far_cells)
                 self.game_state["portals"] = [(a, b)]
+                self.grid.set_portals(self.game_state["portals"])
                 return
         
         # Eğer yeterince uzak hücre bulunamazsa, en uzak olanı seç
-        a = random.choice(empty)
+        a = self.rng.choice(empty)
         b = max(empty, key=lambda cell: abs(cell[0]-a[0]) + abs(cell[1]-a[1]))
         self.game_state["portals"] = [(a, b)]
+        self.grid.set_portals(self.game_state["portals"])
     
     def _random_food(self):
         """Rastgele yem pozisyonu"""
-        occupied = set()
-        occupied.update(self.game_state["snake"])
-        occupied.update(self.game_state["food"])
-        for obs in self.game_state["obstacles"]:
-            occupied.add(tuple(obs["pos"]))
-        for pu in self.game_state["powerups"]:
-            occupied.add(tuple(pu["pos"]))
-        
-        empty = [(x, y) for x in range(self.board_width) for y in range(self.board_height) 
-                if (x, y) not in occupied]
-        if not empty:
+        pos = self.grid.random_free_cell(self.rng)
+        if pos is None:
             return (0, 0)
-        return random.choice(empty)
+        return pos
     
     def move_snake(self):
         """Yılanı hareket ettir"""
@@ -217,7 +207,7 @@ class TimeAttackGame:
                 elif obs["type"] == "enemy":
                     # Enemy engelleri yılanı kısaltır
                     if len(self.game_state["snake"]) > 1:
-                        self.game_state["snake"].pop()
+                        self.game_state["snake"].pop_tail()
                     else:
                         self.eliminate_snake()
                         return
@@ -240,11 +230,11 @@ class TimeAttackGame:
             for portal in self.game_state["portals"]:
                 if new_head == portal[0]:
                     # Portal A'dan B'ye ışınla
-                    self.game_state["snake"][0] = portal[1]
+                    self.game_state["snake"].set_head(portal[1])
                     break
                 elif new_head == portal[1]:
                     # Portal B'den A'ya ışınla
-                    self.game_state["snake"][0] = portal[0]
+                    self.game_state["snake"].set_head(portal[0])
                     break
         
         # Yem kontrolü
@@ -254,6 +244,7 @@ class TimeAttackGame:
                 self.game_state["score"] += 10
                 self.game_state["time_left"] += TIME_ATTACK_CONSTANTS["FOOD_BONUS_TIME"]
                 self.game_state["food"].pop(i)
+                self.grid.remove_food(new_head)
                 food_eaten = True
                 break
         
@@ -262,12 +253,14 @@ class TimeAttackGame:
             self.game_state["score"] += 50
             self.game_state["time_left"] += TIME_ATTACK_CONSTANTS["GOLDEN_FOOD_BONUS_TIME"]
             self.game_state["golden_food"] = None
+            self.grid.set_golden(None)
         
         # Power-up kontrolü
         for i, powerup in enumerate(self.game_state["powerups"]):
             if new_head == tuple(powerup["pos"]):
                 self.activate_powerup(powerup["type"])
                 self.game_state["powerups"].pop(i)
+                self.grid.remove_powerup(powerup)
                 break
         
         # Trail sistemi (klasik moddaki gibi)
@@ -279,40 +272,44 @@ class TimeAttackGame:
             self.game_state["trails"].append(head)
         
         # Yeni başı ekle
-        self.game_state["snake"].insert(0, new_head)
+        self.game_state["snake"].push_head(new_head)
         
         # Yem yemediyse kuyruğu kısalt
         if not food_eaten:
-            self.game_state["snake"].pop()
+            self.game_state["snake"].pop_tail()
         
         # Yeni yem yerleştir
         if not food_eaten:
             new_food = self._random_food()
             if new_food:
                 self.game_state["food"].append(new_food)
+                self.grid.add_food(new_food)
         
         # Altın elma üretimi (klasik moddaki gibi)
         if (self.game_state["golden_food"] is None and 
-            random.random() < TIME_ATTACK_CONFIG["golden_food_chance"]):
+            self.rng.random() < TIME_ATTACK_CONFIG["golden_food_chance"]):
             self.game_state["golden_food"] = self._random_food()
+            self.grid.set_golden(self.game_state["golden_food"])
         
         # Power-up üretimi
         if (len(self.game_state["powerups"]) < TIME_ATTACK_CONFIG["max_powerups"] and 
-            random.random() < 0.01):  # %1 şans
+            self.rng.random() < 0.01):  # %1 şans
             powerup_pos = self._random_food()
             if powerup_pos:
-                powerup_type = random.choice(TIME_ATTACK_CONFIG["allowed_powerups"])
-                self.game_state["powerups"].append({
+                powerup_type = self.rng.choice(TIME_ATTACK_CONFIG["allowed_powerups"])
+                powerup = {
                     "pos": powerup_pos,
                     "type": powerup_type
-                })
+                }
+                self.game_state["powerups"].append(powerup)
+                self.grid.add_powerup(powerup)
     
     def eliminate_snake(self):
         """Yılanı ele"""
         if TIME_ATTACK_CONFIG["respawn_allowed"]:
             # Canlanma - rastgele güvenli pozisyonda
             start_pos = self._find_safe_start_position()
-            self.game_state["snake"] = [start_pos]
+            self.game_state["snake"] = SnakeBody([start_pos], self.client_id, self.grid)
             self.game_state["direction"] = "RIGHT"
             self.game_state["respawn_count"] += 1
             pass
@@ -321,11 +318,9 @@ class TimeAttackGame:
             self.game_state["game_active"] = False
     
     def activate_powerup(self, powerup_type):
-        """Power-up aktivasyonu"""
-        if self.client_id not in self.game_state["active_powerups"]:
-            self.game_state["active_powerups"][self.client_id] = {}
-        
-        self.game_state["active_powerups"][self.client_id][powerup_type] = time.time() + TIME_ATTACK_CONSTANTS["POWERUP_DURATION"]
+        """Power-up aktivasyonu; bitiş tick'i time_attack_effects zamanlayıcısındadır"""
+        self.game_state["active_powerups"].setdefault(self.client_id, []).append({"type": powerup_type, "tick": time_attack_tick})
+        time_attack_effects.add(self.client_id, powerup_type, time_attack_tick + POWERUP_DURATION_TICKS)
         
         # Trail power-up için özel işlem
         if powerup_type == "trail":
@@ -334,41 +329,7 @@ class TimeAttackGame:
     
     def has_powerup(self, powerup_type):
         """Power-up kontrolü"""
-        if self.client_id not in self.game_state["active_powerups"]:
-            return False
-        
-        if powerup_type not in self.game_state["active_powerups"][self.client_id]:
-            return False
-        
-        return time.time() < self.game_state["active_powerups"][self.client_id][powerup_type]
-    
-    def update_time(self):
-        """Update time"""
-        current_time = time.time()
-        elapsed = current_time - self.game_state["start_time"]
-        self.game_state["time_left"] = max(0, self.game_state["time_left"] - elapsed)
-        self.game_state["start_time"] = current_time
-        
-        # End game if time is up
-        if self.game_state["time_left"] <= 0:
-            self.game_state["game_active"] = False
-            # Update high score
-            if self.game_state["score"] > self.game_state["high_score"]:
-                self.game_state["high_score"] = self.game_state["score"]
-    
-    def clear_expired_powerups(self):
-        """Clear expired power-ups"""
-        current_time = time.time()
-        if self.client_id in self.game_state["active_powerups"]:
-            expired = []
-            for powerup_type, expiry_time in self.game_state["active_powerups"][self.client_id].items():
-                if current_time >= expiry_time:
-                    expired.append(powerup_type)
-            for powerup_type in expired:
-                del self.game_state["active_powerups"][self.client_id][powerup_type]
-                # Clear trail if trail power-up expired
-                if powerup_type == "trail":
-                    self.game_state["trails"] = []
+        return time_attack_effects.has(self.client_id, powerup_type)
     
     def set_direction(self, direction):
         """Set direction"""
@@ -397,7 +358,7 @@ class TimeAttackGame:
                 new_head = (head_x + 1, head_y)
             
             # Yeni baş pozisyonu yılanın mevcut vücuduyla çakışıyor mu?
-            if new_head in snake[1:]:
+            if new_head in snake:
                 return  # Bu hareketi atla, yılan kendine çarpar
         
         self.game_state["direction"] = direction
@@ -409,14 +370,14 @@ class TimeAttackGame:
         
         # Respawn at random safe position
         start_pos = self._find_safe_start_position()
-        self.game_state["snake"] = [start_pos]
+        self.game_state["snake"] = SnakeBody([start_pos], self.client_id, self.grid)
         self.game_state["direction"] = "RIGHT"
         self.game_state["respawn_count"] += 1
 
 # --- Modül fonksiyonları ---
-def create_time_attack_game(client_id, difficulty, board_width, board_height):
+def create_time_attack_game(client_id, difficulty, board_width, board_height, seed=None):
     """Create Time Attack game"""
-    return TimeAttackGame(client_id, difficulty, board_width, board_height)
+    return TimeAttackGame(client_id, difficulty, board_width, board_height, seed)
 
 def get_time_attack_game(client_id):
     """Get Time Attack game"""
@@ -429,16 +390,18 @@ def remove_time_attack_game(client_id):
     """Remove Time Attack game"""
     if client_id in time_attack_games:
         del time_attack_games[client_id]
+    time_attack_grids.pop(client_id, None)
+    time_attack_rngs.pop(client_id, None)
+    time_attack_effects.clear_player(client_id)
 
 def update_all_time_attack_games():
     """Update all Time Attack games"""
+    global time_attack_tick
+    time_attack_tick += 1
     for client_id, game_state in list(time_attack_games.items()):
         if game_state["game_active"]:
-            # Update time
-            current_time = time.time()
-            elapsed = current_time - game_state["start_time"]
-            game_state["time_left"] = max(0, game_state["time_left"] - elapsed)
-            game_state["start_time"] = current_time
+            # Süre duvar saatinden değil tick sayısından düşer
+            game_state["time_left"] = max(0, game_state["time_left"] - TICK_RATE)
             
             # End game if time is up
             if game_state["time_left"] <= 0:
@@ -447,14 +410,266 @@ def update_all_time_attack_games():
                 if game_state["score"] > game_state["high_score"]:
                     game_state["high_score"] = game_state["score"]
 
-def clear_expired_powerups_all():
-    """Clear all expired power-ups"""
-    current_time = time.time()
-    for client_id, game_state in time_attack_games.items():
-        if client_id in game_state["active_powerups"]:
-            expired = []
-            for powerup_type, expiry_time in game_state["active_powerups"][client_id].items():
-                if current_time >= expiry_time:
-                    expired.append(powerup_type)
-            for powerup_type in expired:
-                del game_state["active_powerups"][client_id][powerup_type] 
\ No newline at end of file
+def has_powerup_time_attack(cid, ptype, ta_game_state):
+    return time_attack_effects.has(cid, ptype)
+
+def clear_expired_time_attack_powerups():
+    """Süresi dolan Time Attack power-up'larını kaldır"""
+    for client_id, ptype in time_attack_effects.advance(time_attack_tick):
+        ta_game_state = time_attack_games.get(client_id)
+        if ta_game_state and client_id in ta_game_state.get("active_powerups", {}):
+            ta_game_state["active_powerups"][client_id] = [p for p in ta_game_state["active_powerups"][client_id] if p["type"] != ptype]
+
+def set_time_attack_direction(client_id, direction):
+    """Oyuncunun yön komutunu uygula"""
+    if client_id not in time_attack_games:
+        return
+    # Bilinmeyen yön yok sayılır (aşağıdaki yeni baş hesabı sadece dört yönü bilir)
+    if direction not in ("UP", "DOWN", "LEFT", "RIGHT"):
+        return
+    
+    game_state = time_attack_games[client_id]
+    
+    # Ters kontrol power-up kontrolü
+    if has_powerup_time_attack(client_id, "reverse", game_state):
+        OPP = {"UP":"DOWN","DOWN":"UP","LEFT":"RIGHT","RIGHT":"LEFT"}
+        direction = OPP.get(direction, direction)
+    
+    # Yön kontrolü - ters yön kontrolü
+    current_dir = game_state["direction"]
+    OPPOSITE_DIRECTIONS = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+    if OPPOSITE_DIRECTIONS.get(current_dir) == direction:
+        return
+    
+    # Kendine çarpma kontrolü - yeni yön yılanın kendi vücuduna çarpar mı?
+    snake = game_state["snake"]
+    if len(snake) > 1:
+        head_x, head_y = snake[0]
+        if direction == "UP":
+            new_head = (head_x, head_y - 1)
+        elif direction == "DOWN":
+            new_head = (head_x, head_y + 1)
+        elif direction == "LEFT":
+            new_head = (head_x - 1, head_y)
+        elif direction == "RIGHT":
+            new_head = (head_x + 1, head_y)
+        
+        # Yeni baş pozisyonu yılanın mevcut vücuduyla çakışıyor mu?
+        if new_head in snake:
+            return  # Bu hareketi atla, yılan kendine çarpar
+    
+    game_state["direction"] = direction
+
+def respawn_time_attack_snake(client_id, board_width, board_height):
+    """Elenen yılanı tahtanın ortasında yeniden başlat"""
+    if client_id not in time_attack_games:
+        return
+    
+    game_state = time_attack_games[client_id]
+    
+    # Canlanma - 3 blok uzunluğunda yılan
+    center_x = board_width//2
+    center_y = board_height//2
+    game_state["snake"] = SnakeBody([
+        (center_x, center_y),
+        (center_x-1, center_y),
+        (center_x-2, center_y)
+    ], client_id, time_attack_grids[client_id])
+    game_state["direction"] = "RIGHT"
+    game_state["respawn_count"] += 1
+    game_state["game_active"] = True  # Oyunu tekrar aktif hale getir
+
+def move_all_time_attack_snakes(board_width, board_height):
+    """Aktif tüm Time Attack yılanlarını bir adım ilerlet"""
+    tick_count = time_attack_tick
+    for client_id in list(time_attack_games.keys()):
+        ta_game_state = time_attack_games[client_id]
+        ta_grid = time_attack_grids[client_id]
+        rng = time_attack_rngs[client_id]
+        if ta_game_state["game_active"]:
+            # Yılan hız kontrolü - klasik moddaki gibi
+            if has_powerup_time_attack(client_id, "speed", ta_game_state):
+                # Speed power-up varsa her tick'te hareket et
+                pass
+            else:
+                # Speed power-up yoksa her 2 tick'te bir hareket et
+                if tick_count % 2 != 0:
+                    continue
+            # Yılan hareketi
+            head = ta_game_state["snake"][0]
+            direction = ta_game_state["direction"]
+            
+            # Yeni baş pozisyonu
+            if direction == "UP":
+                new_head = (head[0], head[1] - 1)
+            elif direction == "DOWN":
+                new_head = (head[0], head[1] + 1)
+            elif direction == "LEFT":
+                new_head = (head[0] - 1, head[1])
+            elif direction == "RIGHT":
+                new_head = (head[0] + 1, head[1])
+            else:
+                continue
+            
+            # Çarpışma kontrolü (zırh etkisi ve duvardan geçiş)
+            shielded = has_powerup_time_attack(client_id, "shield", ta_game_state)
+            out_of_bounds = not (0 <= new_head[0] < board_width and 0 <= new_head[1] < board_height)
+            if out_of_bounds:
+                if shielded:
+                    # Shield aktifken duvardan geç, shield'i kaldırma
+                    nx, ny = new_head
+                    if nx < 0:
+                        nx = board_width - 1
+                    elif nx >= board_width:
+                        nx = 0
+                    if ny < 0:
+                        ny = board_height - 1
+                    elif ny >= board_height:
+                        ny = 0
+                    new_head = (nx, ny)
+                else:
+                    # Zırh yoksa elen
+                    ta_game_state["game_active"] = False
+                    continue
+            
+            # Kendine çarpma kontrolü - yılanın kuyruğu hariç kontrol et
+            if ta_game_state["snake"].body_contains(new_head):  # Son eleman (kuyruk) hariç kontrol et
+                if shielded:
+                    # Shield aktifken kendine çarpmadan geç, shield'i kaldırma
+                    pass
+                else:
+                    # Zırh yoksa elen
+                    ta_game_state["game_active"] = False
+                    continue
+            
+            # Engel kontrolü
+            shielded = has_powerup_time_attack(client_id, "shield", ta_game_state)
+            if not shielded:
+                for obs in ta_game_state["obstacles"]:
+                    if new_head == tuple(obs["pos"]):
+                        if obs["type"] == "hidden_wall":
+                            # Gizli duvar - elen
+                            ta_game_state["game_active"] = False
+                            continue
+                        elif obs["type"] == "grass":
+                            # Normal çalı - elen
+                            ta_game_state["game_active"] = False
+                            continue
+            
+            # Portal kontrolü
+            if ta_game_state.get("portals"):
+                for portal in ta_game_state["portals"]:
+                    if new_head == portal[0]:
+                        # Portal A'dan B'ye ışınla
+                        new_head = portal[1]
+                        break
+                    elif new_head == portal[1]:
+                        # Portal B'den A'ya ışınla
+                        new_head = portal[0]
+                        break
+            
+            # Yem kontrolü
+            food_eaten = False
+            for i, food_pos in enumerate(ta_game_state["food"]):
+                if new_head == food_pos:
+                    ta_game_state["score"] += 10
+                    ta_game_state["time_left"] += TIME_ATTACK_CONSTANTS["FOOD_BONUS_TIME"]
+                    ta_game_state["food"].pop(i)
+                    ta_grid.remove_food(new_head)
+                    food_eaten = True
+                    break
+            
+            # Altın elma kontrolü
+            if ta_game_state["golden_food"] and new_head == ta_game_state["golden_food"]:
+                ta_game_state["score"] += 50
+                ta_game_state["time_left"] += TIME_ATTACK_CONSTANTS["GOLDEN_FOOD_BONUS_TIME"]
+                ta_game_state["golden_food"] = None
+                ta_grid.set_golden(None)
+            
+            # Magnet power-up etkisi
+            if has_powerup_time_attack(client_id, "magnet", ta_game_state) and len(ta_game_state["snake"]) > 0:
+                head = ta_game_state["snake"][0]
+                # En yakın yemi bul ve çek
+                closest_food = None
+                min_dist = float('inf')
+                for food_pos in ta_game_state["food"]:
+                    dist = abs(head[0] - food_pos[0]) + abs(head[1] - food_pos[1])
+                    if dist < min_dist:
+                        min_dist = dist
+                        closest_food = food_pos
+                
+                # En yakın yemi yılanın başına doğru hareket ettir
+                if closest_food and min_dist > 1:
+                    dx = 0
+                    dy = 0
+                    if closest_food[0] > head[0]:
+                        dx = -1
+                    elif closest_food[0] < head[0]:
+                        dx = 1
+                    if closest_food[1] > head[1]:
+                        dy = -1
+                    elif closest_food[1] < head[1]:
+                        dy = 1
+                    
+                    new_food_pos = (closest_food[0] + dx, closest_food[1] + dy)
+                    # Yeni pozisyonun boş olduğunu kontrol et
+                    if ta_grid.is_free(new_food_pos):
+                        # Yemi yeni pozisyona taşı
+                        food_index = ta_game_state["food"].index(closest_food)
+                        ta_game_state["food"][food_index] = new_food_pos
+                        ta_grid.remove_food(closest_food)
+                        ta_grid.add_food(new_food_pos)
+            
+            # Power-up kontrolü
+            for i, powerup in enumerate(ta_game_state["powerups"]):
+                if new_head == tuple(powerup["pos"]):
+                    # Power-up aktivasyonu
+                    if client_id not in ta_game_state["active_powerups"]:
+                        ta_game_state["active_powerups"][client_id] = []
+                    ta_game_state["active_powerups"][client_id].append({"type": powerup["type"], "tick": tick_count})
+                    time_attack_effects.add(client_id, powerup["type"], tick_count + POWERUP_DURATION_TICKS)
+                    ta_game_state["powerups"].pop(i)
+                    ta_grid.remove_powerup(powerup)
+                    ta_game_state["time_left"] += TIME_ATTACK_CONSTANTS["POWERUP_BONUS_TIME"]
+                    break
+            
+            # Yılanı güncelle
+            ta_game_state["snake"].push_head(new_head)
+            if not food_eaten:
+                ta_game_state["snake"].pop_tail()
+            
+            # Yılan uzunluğu kontrolü
+            ta_game_state["snake"].truncate(TIME_ATTACK_CONSTANTS["MAX_SNAKE_LENGTH"])
+            
+            # Yeni yem ekle
+            if food_eaten and len(ta_game_state["food"]) < TIME_ATTACK_CONFIG["food_count"]:
+                # Rastgele yem pozisyonu
+                new_food = ta_grid.random_free_cell(rng)
+                if new_food is not None:
+                    ta_game_state["food"].append(new_food)
+                    ta_grid.add_food(new_food)
+            
+            # Altın elma olasılığı
+            if rng.random() < TIME_ATTACK_CONFIG["golden_food_chance"] and not ta_game_state["golden_food"]:
+                golden_pos = ta_grid.random_free_cell(rng)
+                if golden_pos is not None:
+                    ta_game_state["golden_food"] = golden_pos
+                    ta_grid.set_golden(golden_pos)
+            
+            # Power-up olasılığı
+            if (len(ta_game_state["powerups"]) < TIME_ATTACK_CONFIG["max_powerups"] and 
+                rng.random() < TIME_ATTACK_CONSTANTS["POWERUP_SPAWN_CHANCE"]):  # %5 olasılık
+                powerup_type = rng.choice(TIME_ATTACK_CONFIG["allowed_powerups"])
+                powerup_pos = ta_grid.random_free_cell(rng)
+                if powerup_pos is not None:
+                    powerup = {"pos": powerup_pos, "type": powerup_type}
+                    ta_game_state["powerups"].append(powerup)
+                    ta_grid.add_powerup(powerup)
+                else:
+                    pass
+            else:
+                if len(ta_game_state["powerups"]) >= TIME_ATTACK_CONFIG["max_powerups"]:
+                    pass
+                elif rng.random() >= TIME_ATTACK_CONSTANTS["POWERUP_SPAWN_CHANCE"]:
+                    pass
+    
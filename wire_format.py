@@ -0,0 +1,115 @@
+# --- BINARY WIRE FORMAT MODÜLÜ ---
+# 'state' ve 'time_attack_state' eventleri için isteğe bağlı ikili kodlama.
+# Hücreler y * genişlik + x indeksine çevrilip uint16 olarak paketlenir
+# (60x35 = 2100 hücre tek bayta sığmaz; 65536 hücreden büyük arena haritalarında
+# FLAG_WIDE_CELLS ile uint32), oyuncu isimleri yerine 'map'
+# eventinde gönderilen küçük slot numaraları kullanılır. Geri kalan küçük
+# alanlar (skorlar, sayaçlar) çerçevenin sonunda kısa bir JSON olarak durur.
+# İstemci tarafındaki karşılığı web_client.html içindeki decodeBinaryFrame'dir.
+import json
+import struct
+import sys
+from array import array
+
+STATE_MAGIC = 0x53        # 'S' - klasik mod çerçevesi
+TIME_ATTACK_MAGIC = 0x54  # 'T' - Time Attack çerçevesi
+FLAG_KEYFRAME = 0x01
+FLAG_WIDE_CELLS = 0x02  # hücre indeksleri uint32
+NARROW_CELL_LIMIT = 0x10000  # uint16 ile adreslenebilen hücre sayısı
+
+# Yılan kaydı türleri
+SNAKE_FULL = 0
+SNAKE_PATCH = 1
+SNAKE_REMOVED = 2
+
+# magic u8, flags u8, board width u16, tick u32, base tick u32
+HEADER = struct.Struct("<BBHII")
+
+
+def pack_cells(cells, width, wide=False):
+    """Hücre listesini little-endian uint16 (wide ise uint32) indekslerine paketle"""
+    packed = array("I" if wide else "H", [y * width + x for x, y in cells])
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _pack_cell_list(cells, width, wide=False):
+    return struct.pack("<H", len(cells)) + pack_cells(cells, width, wide)
+
+
+def _pack_snakes(entries, width, wide=False):
+    """(slot, tür, veri) kayıtlarını yılan bloğuna paketle"""
+    parts = [struct.pack("<B", len(entries))]
+    for slot, kind, data in entries:
+        parts.append(struct.pack("<BB", slot, kind))
+        if kind == SNAKE_FULL:
+            parts.append(_pack_cell_list(data, width, wide))
+        elif kind == SNAKE_PATCH:
+            parts.append(struct.pack("<B", len(data["h"])))
+            parts.append(pack_cells(data["h"], width, wide))
+            parts.append(struct.pack("<H", data["n"]))
+    return b"".join(parts)
+
+
+def _pack_food(food, width, wide=False):
+    if food is None:
+        return b"\x00"
+    return b"\x01" + _pack_cell_list(food, width, wide)
+
+
+def _pack_tail(rest):
+    return json.dumps(rest, separators=(",", ":")).encode("utf-8")
+
+
+def encode_state_frame(frame, slots, width, height=0):
+    """state_delta çerçevesini ikili formata çevir"""
+    wide = width * height > NARROW_CELL_LIMIT
+    entries = []
+    if frame["keyframe"]:
+        state = dict(frame["state"])
+        for cid, cells in state.pop("snakes", {}).items():
+            if cid in slots:
+                entries.append((slots[cid], SNAKE_FULL, cells))
+        food = state.pop("food", None)
+        rest = {"state": state}
+        flags, base = FLAG_KEYFRAME, 0
+        if "ts" in frame:
+            rest["ts"] = frame["ts"]
+    else:
+        rest = {}
+        players = dict(frame.get("players", {}))
+        snake_patch = players.pop("snakes", {})
+        for cid, cells in snake_patch.get("set", {}).items():
+            if cid in slots:
+                entries.append((slots[cid], SNAKE_FULL, cells))
+        for cid, patch in snake_patch.get("patch", {}).items():
+            if cid in slots:
+                entries.append((slots[cid], SNAKE_PATCH, patch))
+        for cid in snake_patch.get("del", []):
+            if cid in slots:
+                entries.append((slots[cid], SNAKE_REMOVED, None))
+        set_fields = dict(frame.get("set", {}))
+        food = set_fields.pop("food", None)
+        if set_fields:
+            rest["set"] = set_fields
+        if players:
+            rest["players"] = players
+        if frame.get("del"):
+            rest["del"] = frame["del"]
+        if "ts" in frame:
+            rest["ts"] = frame["ts"]
+        flags, base = 0, frame["base"]
+    if wide:
+        flags |= FLAG_WIDE_CELLS
+    header = HEADER.pack(STATE_MAGIC, flags, width, frame["tick"], base)
+    return header + _pack_snakes(entries, width, wide) + _pack_food(food, width, wide) + _pack_tail(rest)
+
+
+def encode_time_attack_state(state, width, tick=0):
+    """Time Attack state'ini ikili formata çevir"""
+    rest = dict(state)
+    snake = rest.pop("snake", [])
+    food = rest.pop("food", None)
+    header = HEADER.pack(TIME_ATTACK_MAGIC, 0, width, tick, 0)
+    return header + _pack_cell_list(snake, width) + _pack_food(food, width) + _pack_tail(rest)